@@ -4,13 +4,23 @@ from pathlib import Path
 
 from sqlmodel import Field
 
+from graphemy.batch import batch_field
+from graphemy.computed import Computed
 from graphemy.dl import Dl
 from graphemy.models import Graphemy
 from graphemy.router import GraphemyRouter
 from graphemy.setup import Setup
 
 # Expose these names when doing `from graphemy import *`
-__all__ = ["Dl", "Field", "Graphemy", "GraphemyRouter", "Setup"]
+__all__ = [
+    "Computed",
+    "Dl",
+    "Field",
+    "Graphemy",
+    "GraphemyRouter",
+    "Setup",
+    "batch_field",
+]
 
 
 def import_files(path: Path) -> None:
@@ -0,0 +1,70 @@
+from collections.abc import Callable
+from typing import TYPE_CHECKING, get_args, get_origin
+
+import strawberry
+from strawberry.types import Info
+from strawberry.types.field import StrawberryField
+
+from .database.utils import get_primary_keys
+
+if TYPE_CHECKING:
+    from .models import Graphemy
+
+
+def batch_field(
+    func: Callable | None = None,
+    **kwargs: dict,
+) -> StrawberryField | Callable[[Callable], StrawberryField]:
+    """
+    Turn a function of a model's `Strawberry` class into a field resolved
+    once per DataLoader tick for all the rows selecting it, instead of once
+    per row.
+
+    The function receives the list of rows and the GraphQL context, and
+    returns one value per row, in the same order. It may be synchronous or
+    asynchronous, and its return annotation must be `list[<field type>]`:
+
+        class Strawberry:
+            @batch_field
+            async def order_count(users: list["User"], context: dict) -> list[int]:
+                ...
+
+    Its DataLoader, `batch_<Model>_<function name>`, is registered with the
+    others of the router (see set_schema).
+
+    Args:
+        func (Callable | None, optional): The batch function, when used
+            without arguments. Defaults to None.
+        **kwargs (dict): Additional keyword arguments for Strawberry field
+
+    Returns:
+        StrawberryField | Callable[[Callable], StrawberryField]: The field, or
+            a decorator building it when called with arguments.
+    """
+
+    def decorator(batch_function: Callable) -> StrawberryField:
+        name = batch_function.__name__
+        return_type = batch_function.__annotations__.get("return")
+        if get_origin(return_type) is not list:
+            error_text = f"The batch function {name} must be annotated to return a list."
+            raise TypeError(error_text)
+
+        async def batch_resolver(self: "Graphemy", info: Info) -> object:
+            """
+            Loads the value of the row with the other rows of the tick.
+            """
+            model = type(self)
+            key = tuple(getattr(self, k) for k in get_primary_keys(model))
+            # The loader finds the row back by its primary key
+            info.context["batch_rows"][(model, key)] = self
+            return await info.context[f"batch_{model.__name__}_{name}"].load(
+                list(key),
+            )
+
+        batch_resolver.__name__ = name
+        batch_resolver.__annotations__["return"] = get_args(return_type)[0]
+        field = strawberry.field(batch_resolver, **kwargs)
+        field.batch_function = batch_function
+        return field
+
+    return decorator(func) if func is not None else decorator
@@ -0,0 +1,63 @@
+from collections.abc import Callable
+from typing import TYPE_CHECKING
+
+from sqlalchemy.orm import column_property
+
+if TYPE_CHECKING:
+    from sqlalchemy.sql.elements import ColumnElement
+
+    from .models import Graphemy
+
+
+class Computed:
+    """
+    A read-only field computed by the database from a SQL expression over the
+    columns of its model, like a SQLAlchemy `column_property`.
+
+    The expression is only added to the statements loading the model when the
+    field is selected (or sorted on), and can be used in the model's
+    generated filters and sort inputs like any column.
+
+    Attributes:
+        expression (Callable[[type[Graphemy]], ColumnElement]): Builds the
+            SQL expression of the field from the model class.
+        type (type): The annotated type of the field, set by the model.
+        to_strawberry_kwargs (dict): Additional keyword arguments for Strawberry
+            field configuration, such as `description`, `deprecation_reason`, etc.
+    """
+
+    expression: Callable[["type[Graphemy]"], "ColumnElement"]
+    type: type = None
+    to_strawberry_kwargs: dict
+
+    def __init__(
+        self,
+        expression: Callable[["type[Graphemy]"], "ColumnElement"],
+        **kwargs: dict,
+    ) -> None:
+        """
+        Initialize a Computed field.
+
+        Args:
+            expression (Callable[[type[Graphemy]], ColumnElement]): A function
+                receiving the model class and returning the SQL expression
+                (e.g. `lambda cls: cls.price * cls.quantity`).
+            **kwargs (dict): Additional keyword arguments for Strawberry field
+        """
+        self.expression = expression
+        self.to_strawberry_kwargs = kwargs
+
+    def map(self, model: "type[Graphemy]", name: str) -> None:
+        """
+        Map the expression on the model as a deferred column, loaded only by
+        the statements undeferring it.
+
+        Args:
+            model (type[Graphemy]): The model owning the field.
+            name (str): The name of the field.
+        """
+        if name not in model.__mapper__.attrs:
+            model.__mapper__.add_property(
+                name,
+                column_property(self.expression(model), deferred=True),
+            )
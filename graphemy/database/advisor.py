@@ -0,0 +1,190 @@
+from dataclasses import dataclass
+from threading import Lock
+from time import perf_counter
+from typing import TYPE_CHECKING
+
+from sqlalchemy import Table
+
+from graphemy.setup import Setup
+
+from .utils import get_fields_metadata, get_sort_criteria
+
+if TYPE_CHECKING:
+    from graphemy.models import Graphemy
+
+
+@dataclass
+class ColumnUsage:
+    """
+    How often a column was filtered or sorted on, and how long those queries took.
+
+    Attributes:
+        queries (int): The number of statements using the column.
+        seconds (float): The total latency of those statements.
+    """
+
+    queries: int = 0
+    seconds: float = 0.0
+
+
+def is_indexed(source: Table, columns: list[str]) -> bool:
+    """
+    Check whether an index, the primary key or a unique constraint of a table
+    starts with the given columns, in any order.
+
+    Args:
+        source (Table): The table holding the columns.
+        columns (list[str]): The column names.
+
+    Returns:
+        bool: True if a lookup on the columns can use an index.
+    """
+    keys = [
+        [column.name for column in index.columns] for index in source.indexes
+    ]
+    keys.append([column.name for column in source.primary_key])
+    keys.extend(
+        [column.name for column in constraint.columns]
+        for constraint in source.constraints
+        if constraint.__visit_name__ == "unique_constraint"
+    )
+    keys.extend([column.name] for column in source.columns if column.unique)
+    return any(set(key[: len(columns)]) == set(columns) for key in keys)
+
+
+def get_filter_columns(
+    model: "Graphemy",
+    filters: dict | list | None,
+) -> set[str]:
+    """
+    Collect the columns of a model used by a filter, in any logical group.
+
+    Args:
+        model (Graphemy): The filtered model.
+        filters (dict | list | None): The filtering criteria.
+
+    Returns:
+        set[str]: The names of the filtered columns.
+    """
+    fields = get_fields_metadata(model)
+    columns = set()
+    for group in filters if isinstance(filters, list) else [filters or {}]:
+        for name, value in group.items():
+            if not value:
+                continue
+            if name in {"AND", "OR", "NOT"}:
+                columns |= get_filter_columns(model, value)
+            elif name in fields:
+                columns.add(name)
+    return columns
+
+
+def get_sort_columns(model: "Graphemy", sort: list | None) -> set[str]:
+    """
+    Collect the columns of a model used by sort instructions.
+
+    Args:
+        model (Graphemy): The sorted model.
+        sort (list | None): The sort instructions of the query.
+
+    Returns:
+        set[str]: The names of the sorted columns.
+    """
+    return {
+        field for field, _type, _order in get_sort_criteria(sort or [], model)
+    }
+
+
+def record_statement(
+    model: "Graphemy",
+    columns: set[str],
+    started: float,
+) -> None:
+    """
+    Record a statement in the index advisor, if it is enabled.
+
+    Args:
+        model (Graphemy): The queried model.
+        columns (set[str]): The columns the statement filtered or sorted on.
+        started (float): The `perf_counter` value when the statement started.
+    """
+    if Setup.index_advisor is not None and columns:
+        Setup.index_advisor.record(model, columns, perf_counter() - started)
+
+
+class IndexAdvisor:
+    """
+    Record the columns filtered and sorted on by the statements of each model,
+    with their latency, to report the ones without an index.
+    """
+
+    def __init__(self) -> None:
+        self.usage: dict[tuple[str, str], ColumnUsage] = {}
+        self.lock = Lock()
+
+    def record(
+        self,
+        model: "Graphemy",
+        columns: set[str],
+        seconds: float,
+    ) -> None:
+        """
+        Record a statement of a model.
+
+        Args:
+            model (Graphemy): The queried model.
+            columns (set[str]): The columns the statement filtered or sorted on.
+            seconds (float): The latency of the statement.
+        """
+        with self.lock:
+            for name in columns:
+                usage = self.usage.setdefault(
+                    (model.__name__, name),
+                    ColumnUsage(),
+                )
+                usage.queries += 1
+                usage.seconds += seconds
+
+    def report(self) -> list[dict]:
+        """
+        List the recorded columns without an index, slowest first.
+
+        Returns:
+            list[dict]: One entry per column, with its `model`, `column`,
+                number of `queries`, `total_ms` and `avg_ms` latency, and the
+                `CREATE INDEX` statement that would cover it.
+        """
+        entries = []
+        with self.lock:
+            usage = list(self.usage.items())
+        for (model_name, name), column_usage in usage:
+            model = Setup.classes.get(model_name)
+            if model is None:
+                continue
+            # Computed fields are not columns, they can't be indexed here
+            if name not in model.__table__.c or is_indexed(
+                model.__table__,
+                [name],
+            ):
+                continue
+            entries.append(
+                {
+                    "model": model_name,
+                    "column": name,
+                    "queries": column_usage.queries,
+                    "total_ms": column_usage.seconds * 1000,
+                    "avg_ms": column_usage.seconds
+                    * 1000
+                    / column_usage.queries,
+                    "statement": (
+                        f"CREATE INDEX ix_{model.__tablename__}_{name} "
+                        f"ON {model.__tablename__} ({name})"
+                    ),
+                },
+            )
+        return sorted(entries, key=lambda entry: -entry["total_ms"])
+
+    def clear(self) -> None:
+        """Forget the recorded statements."""
+        with self.lock:
+            self.usage.clear()
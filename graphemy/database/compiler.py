@@ -0,0 +1,260 @@
+import json
+from collections.abc import Callable
+from typing import TYPE_CHECKING
+
+from sqlalchemy import (
+    JSON,
+    Boolean,
+    String,
+    and_,
+    any_,
+    bindparam,
+    func,
+    literal,
+    select,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import aliased
+from sqlalchemy.sql.compiler import SQLCompiler
+from sqlalchemy.sql.elements import ColumnElement, _clone
+from sqlalchemy.sql.expression import tuple_
+
+if TYPE_CHECKING:
+    from graphemy.models import Graphemy
+    from graphemy.schemas.planner import TreePlan
+
+# Dialects whose JSON functions can build the whole selection tree
+json_dialects = {"sqlite", "postgresql"}
+
+
+def json_object(
+    dialect: str,
+    pairs: list[tuple[str, ColumnElement]],
+) -> ColumnElement:
+    """
+    Build a JSON object from (key, expression) pairs.
+
+    Args:
+        dialect (str): The SQLAlchemy dialect name of the engine.
+        pairs (list[tuple[str, ColumnElement]]): Keys and their SQL values.
+
+    Returns:
+        ColumnElement: A JSON-typed SQL expression.
+    """
+    build = func.json_object if dialect == "sqlite" else func.json_build_object
+    return build(
+        *[arg for key, value in pairs for arg in (literal(key), value)],
+        type_=JSON,
+    )
+
+
+def json_array(dialect: str, element: ColumnElement) -> ColumnElement:
+    """
+    Aggregate JSON elements into a JSON array, empty when there are no rows.
+
+    Args:
+        dialect (str): The SQLAlchemy dialect name of the engine.
+        element (ColumnElement): The JSON expression of each row.
+
+    Returns:
+        ColumnElement: A JSON-typed aggregate expression.
+    """
+    if dialect == "sqlite":
+        return func.json_group_array(element, type_=JSON)
+    return func.coalesce(
+        func.json_agg(element),
+        literal("[]").cast(JSON),
+        type_=JSON,
+    )
+
+
+def nested_json(dialect: str, subquery: ColumnElement) -> ColumnElement:
+    """
+    Embed the JSON returned by a scalar subquery into an enclosing object.
+
+    SQLite returns JSON as text, which must be parsed again to be nested as
+    JSON instead of as a string.
+
+    Args:
+        dialect (str): The SQLAlchemy dialect name of the engine.
+        subquery (ColumnElement): A scalar subquery returning JSON.
+
+    Returns:
+        ColumnElement: An expression usable as a JSON object value.
+    """
+    return func.json(subquery) if dialect == "sqlite" else subquery
+
+
+class ArrayIn(ColumnElement):
+    """
+    `(columns) IN (values)` binding each column's values as a single array
+    parameter, so the statement size doesn't grow with the number of values.
+
+    Dialects without array parameters fall back to one parameter per value.
+    """
+
+    type = Boolean()
+    _is_implicitly_boolean = True
+    # Not cached, since the values are only bound when compiled for a dialect
+    inherit_cache = False
+
+    def __init__(
+        self,
+        columns: list[ColumnElement],
+        values: list[tuple],
+    ) -> None:
+        """
+        Args:
+            columns (list[ColumnElement]): The compared column(s).
+            values (list[tuple]): One tuple of column values per matching row.
+        """
+        self.columns = [column.__clause_element__() for column in columns]
+        self.values = values
+
+    def get_children(self, **_kw: dict) -> list[ColumnElement]:
+        """
+        Returns:
+            list[ColumnElement]: The nested expressions, for traversals.
+        """
+        return self.columns
+
+    def _copy_internals(self, clone: Callable = _clone, **kw: dict) -> None:
+        # Adapted copies (e.g. of aliased entities) replace the nested expressions
+        self.columns = [clone(element, **kw) for element in self.columns]
+
+    def condition(self, dialect: str) -> ColumnElement:
+        """
+        Build the condition for a dialect.
+
+        - PostgreSQL: `column = ANY(:array)`, or `IN (SELECT * FROM unnest(...))`
+          for composite keys.
+        - SQLite: `IN (SELECT value FROM json_each(:json))`, joining one
+          `json_each` per column on the element index for composite keys.
+
+        Args:
+            dialect (str): The SQLAlchemy dialect name of the engine.
+
+        Returns:
+            ColumnElement: A SQLAlchemy boolean expression.
+        """
+        arrays = [list(column) for column in zip(*self.values, strict=True)]
+        if dialect == "postgresql":
+            params = [
+                bindparam(None, array, type_=ARRAY(column.type))
+                for column, array in zip(self.columns, arrays, strict=True)
+            ]
+            if len(params) == 1:
+                return self.columns[0] == any_(params[0])
+            rows = (
+                func.unnest(*params)
+                .table_valued(*[f"c{i}" for i in range(len(params))])
+                .render_derived()
+            )
+            return tuple_(*self.columns).in_(select(*rows.c))
+        if dialect == "sqlite":
+            elements = [
+                func.json_each(
+                    bindparam(None, json.dumps(array), type_=String()),
+                )
+                .table_valued("key", "value")
+                .alias(f"j{i}")
+                for i, array in enumerate(arrays)
+            ]
+            rows = select(*[element.c.value for element in elements])
+            for element in elements[1:]:
+                rows = rows.join_from(
+                    elements[0],
+                    element,
+                    element.c.key == elements[0].c.key,
+                )
+            if len(elements) == 1:
+                return self.columns[0].in_(rows)
+            return tuple_(*self.columns).in_(rows)
+        if len(self.columns) == 1:
+            return self.columns[0].in_([row[0] for row in self.values])
+        return tuple_(*self.columns).in_(self.values)
+
+
+@compiles(ArrayIn)
+def compile_array_in(
+    element: ArrayIn,
+    compiler: SQLCompiler,
+    **kw: dict,
+) -> str:
+    """
+    Compile an ArrayIn condition for the dialect of the compiler.
+
+    Args:
+        element (ArrayIn): The condition to compile.
+        compiler (SQLCompiler): The statement compiler.
+        **kw (dict): Compilation options.
+
+    Returns:
+        str: The SQL of the condition.
+    """
+    return compiler.process(element.condition(compiler.dialect.name), **kw)
+
+
+def compile_json_tree(
+    model: "Graphemy",
+    entity: object,
+    tree: list["TreePlan"],
+    dialect: str,
+) -> ColumnElement:
+    """
+    Compile a model row and its planned relationships into one JSON object.
+
+    Every column of the model is included, so the row can be rebuilt as a
+    model instance. Each relationship becomes a correlated subquery building
+    a JSON array (to-many) or a single JSON object (to-one), recursively.
+
+    Args:
+        model (Graphemy): The model of the row.
+        entity (object): The (aliased) entity of the model in the statement.
+        tree (list[TreePlan]): The relationships to nest under the row.
+        dialect (str): The SQLAlchemy dialect name of the engine.
+
+    Returns:
+        ColumnElement: A JSON-typed SQL expression.
+    """
+    pairs = [
+        (column.key, getattr(entity, column.key))
+        for column in model.__table__.columns
+    ]
+    for node in tree:
+        target_model = node.model
+        alias = aliased(target_model)
+        sources = (
+            node.field.source
+            if isinstance(node.field.source, list)
+            else [node.field.source]
+        )
+        targets = (
+            node.field.target
+            if isinstance(node.field.target, list)
+            else [node.field.target]
+        )
+        element = compile_json_tree(
+            target_model,
+            alias,
+            node.children,
+            dialect,
+        )
+        condition = and_(
+            *[
+                getattr(alias, target) == getattr(entity, source)
+                for source, target in zip(sources, targets, strict=True)
+            ],
+        )
+        if node.field.many:
+            subquery = select(json_array(dialect, element)).where(condition)
+        else:
+            subquery = select(element).where(condition).limit(1)
+        pairs.append(
+            (
+                node.field.__name__,
+                nested_json(dialect, subquery.scalar_subquery()),
+            ),
+        )
+    return json_object(dialect, pairs)
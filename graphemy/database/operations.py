@@ -1,24 +1,64 @@
+import asyncio
 import json
+from collections.abc import Callable
 from dataclasses import asdict
+from itertools import chain
+from operator import add
+from time import perf_counter
 from typing import TYPE_CHECKING
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import aliased, sessionmaker, undefer
+from sqlalchemy.sql import Select
 from sqlalchemy.sql.elements import AsBoolean
-from sqlmodel import Session, and_, func, or_, select
+from sqlalchemy.sql.util import ClauseAdapter
+from sqlmodel import (
+    Session,
+    and_,
+    func,
+    literal,
+    or_,
+    select,
+    tuple_,
+    union_all,
+)
 
 from graphemy.setup import Setup
 
-from .utils import get_query_filter, get_sort_criteria
+from .advisor import get_filter_columns, get_sort_columns, record_statement
+from .compiler import ArrayIn, compile_json_tree
+from .search import Search, SearchRank, get_search_terms, update_search_index
+from .utils import (
+    get_aggregate_fields,
+    get_fields_metadata,
+    get_identity,
+    get_primary_keys,
+    get_query_filter,
+    get_shard_index,
+    get_shard_names,
+    get_shard_values,
+    in_values,
+    is_array_bound,
+    multiple_sort,
+    nulls_last_dialects,
+)
 
 if TYPE_CHECKING:
     from graphemy.models import Graphemy
+    from graphemy.schemas.planner import TreePlan
+
+# Discriminator column telling which filter group a UNION ALL row belongs to
+GROUP_COLUMN = "graphemy_group"
 
 
 async def get_items(
     model: "Graphemy",
     parameters: list[tuple],
     key_id: str | list[str] = "id",
+    *,
+    context: dict | None = None,
+    root: Select | None = None,
+    conditions: list[AsBoolean] | None = None,
 ) -> list[list["Graphemy"] | None]:
     """
     Retrieve items from the database for multiple (filters, keys) parameter sets.
@@ -35,6 +75,13 @@ async def get_items(
             - A JSON-encoded string representing additional filter criteria
         key_id (str | list[str], optional): The primary key field name(s). Defaults to "id".
             If multiple keys are used, pass a list of field names.
+        context (dict | None, optional): The GraphQL context of the current request.
+        root (Select | None, optional): A statement selecting the key values of
+            every parent row. When given, rows are matched with
+            `key IN (<root>)` instead of sending the keys as parameters, so the
+            database can plan a semi-join. Defaults to None.
+        conditions (list[AsBoolean] | None, optional): Extra predicates added to
+            the WHERE clause of every statement. Defaults to None.
 
     Returns:
         list[list["Graphemy"] | None]: A nested list of results matching each parameter set.
@@ -50,55 +97,1006 @@ async def get_items(
         if p[0] not in groups[filters]:
             groups[filters][p[0]] = []
 
-    # For each unique filter string, create and execute a query
+    # Build one statement per unique filter string, for each shard
+    statements = {}
+    for filter_str, filter_value in groups.items():
+        # Decode the filter JSON string and build the SQLAlchemy conditions
+        query_filter = (
+            get_query_filter(
+                json.loads(filter_str),
+                model,
+                [],
+                context=context,
+            )
+            if filter_str
+            else [True]
+        ) + (conditions or [])
+
+        for name, keys in get_partitions(model, key_id, filter_value).items():
+            statements.setdefault(name, []).append(
+                (
+                    filter_str,
+                    select(model)
+                    .options(*get_computed_options(model, context))
+                    .where(
+                        get_key_condition(model, key_id, keys)
+                        if root is None
+                        else get_subquery_condition(model, key_id, root),
+                    )
+                    .where(*query_filter),
+                ),
+            )
+
+    # Execute the statements of each shard in one round trip, concurrently
+    # across shards
+    started = perf_counter()
+    results = await asyncio.gather(
+        *[
+            execute_groups(model, group_statements, name, context)
+            for name, group_statements in statements.items()
+        ],
+    )
+    if Setup.index_advisor is not None:
+        record_statement(
+            model,
+            set(key_id if isinstance(key_id, list) else [key_id]).union(
+                *[
+                    get_filter_columns(model, json.loads(filter_str))
+                    for filter_str in groups
+                    if filter_str
+                ],
+            ),
+            started,
+        )
+
+    # Rows already hydrated in this request are shared, not duplicated
+    identity_map = context.get("identity_map") if context else None
+
+    # Group each result by its filter string and key value. A root statement
+    # may match parents whose keys were not requested, skip their rows.
+    for filter_str, row in chain.from_iterable(results):
+        r = get_identity(row, identity_map)
+        key = (
+            tuple([getattr(r, i) for i in key_id])
+            if isinstance(key_id, list)
+            else getattr(r, key_id)
+        )
+        if key in groups[filter_str]:
+            groups[filter_str][key].append(r)
+
+    # Return the results in the same order as the requested parameters
+    return [groups[p[1]][p[0]] for p in parameters]
+
+
+async def get_tree_items(
+    model: "Graphemy",
+    parameters: list[tuple],
+    source: str,
+    target: str,
+    *,
+    max_depth: int | None = None,
+    context: dict | None = None,
+    conditions: list[AsBoolean] | None = None,
+) -> list[list["Graphemy"]]:
+    """
+    Retrieve the rows reachable through a recursive relationship for multiple
+    (key, filters) parameter sets, with one `WITH RECURSIVE` statement per
+    unique filter string and engine.
+
+    The first level holds the rows whose target matches a key, each next
+    level the rows whose target matches the source of a row of the previous
+    one (e.g. `source="id", target="parent_id"` loads the descendants of a
+    row, `source="parent_id", target="id"` its ancestors).
+
+    Args:
+        model (Graphemy): The Graphemy (SQLModel) class of the related rows.
+        parameters (list[tuple]): (key, filter JSON string) tuples, as for get_items.
+        source (str): The field followed from each loaded row.
+        target (str): The field matched by the keys and followed sources.
+        max_depth (int | None, optional): The maximum number of levels loaded.
+            Defaults to None (unbounded).
+        context (dict | None, optional): The GraphQL context of the current request.
+        conditions (list[AsBoolean] | None, optional): Extra predicates applied
+            to every traversed row. Defaults to None.
+
+    Returns:
+        list[list["Graphemy"]]: The reachable rows of each parameter set.
+    """
+    # Dictionary to group the keys by their filter string
+    groups = {}
+    for p in parameters:
+        groups.setdefault(p[1], {}).setdefault(p[0], [])
+
+    statements = []
+    for filter_str, filter_value in groups.items():
+        query_filter = (
+            get_query_filter(
+                json.loads(filter_str),
+                model,
+                [],
+                context=context,
+            )
+            if filter_str
+            else [True]
+        )
+        tree = get_tree_query(
+            model,
+            list(filter_value),
+            source,
+            target,
+            max_depth=max_depth,
+            conditions=conditions or [],
+            options=get_computed_options(model, context),
+        )
+        statements.extend(
+            (filter_str, tree.where(*query_filter), name)
+            for name in get_shard_names(model)
+        )
+
+    # Execute every statement concurrently, across filters and shards
+    started = perf_counter()
+    results = await asyncio.gather(
+        *[
+            Setup.execute_query(statement, name, context, scalars=False)
+            for _filter_str, statement, name in statements
+        ],
+    )
+    record_statement(model, {target}, started)
+
+    # Rows already hydrated in this request are shared, not duplicated
+    identity_map = context.get("identity_map") if context else None
+
+    # Group each row by the key its traversal started from
+    for (filter_str, _statement, _name), rows in zip(
+        statements,
+        results,
+        strict=True,
+    ):
+        for row, root_key in rows:
+            groups[filter_str][root_key].append(
+                get_identity(row, identity_map),
+            )
+
+    # Return the results in the same order as the requested parameters
+    return [groups[p[1]][p[0]] for p in parameters]
+
+
+def get_tree_query(
+    model: "Graphemy",
+    keys: list,
+    source: str,
+    target: str,
+    *,
+    max_depth: int | None,
+    conditions: list[AsBoolean],
+    options: list,
+) -> Select:
+    """
+    Build the statement selecting the rows reachable from a list of keys
+    through a recursive relationship, each with the key it was reached from.
+
+    Without `max_depth`, the levels are combined with UNION, which drops the
+    rows already visited, so cycles end the recursion. With it, a depth
+    column bounds the recursion.
+
+    Args:
+        model (Graphemy): The Graphemy (SQLModel) class of the related rows.
+        keys (list): The keys the traversals start from.
+        source (str): The field followed from each loaded row.
+        target (str): The field matched by the keys and followed sources.
+        max_depth (int | None): The maximum number of levels loaded.
+        conditions (list[AsBoolean]): Predicates applied to every traversed row.
+        options (list): Loader options of the selected rows.
+
+    Returns:
+        Select: A statement selecting (row, key) pairs.
+    """
+    source_column = getattr(model, source)
+    target_column = getattr(model, target)
+    primary_keys = [getattr(model, key) for key in get_primary_keys(model)]
+
+    # First level: the rows matching the keys
+    columns = [
+        target_column.label("graphemy_root"),
+        source_column.label("graphemy_next"),
+        *[
+            key.label(f"graphemy_key_{i}")
+            for i, key in enumerate(primary_keys)
+        ],
+    ]
+    if max_depth is not None:
+        columns.append(literal(1).label("graphemy_depth"))
+    tree = (
+        select(*columns)
+        .where(in_values(target_column, keys), *conditions)
+        .cte("graphemy_tree", recursive=True)
+    )
+
+    # Next levels: the rows matching the sources of the previous level
+    columns = [tree.c.graphemy_root, source_column, *primary_keys]
+    step = select(*columns).join(tree, target_column == tree.c.graphemy_next)
+    if max_depth is None:
+        tree = tree.union(step.where(*conditions))
+    else:
+        tree = tree.union_all(
+            step.add_columns(tree.c.graphemy_depth + 1).where(
+                tree.c.graphemy_depth < max_depth,
+                *conditions,
+            ),
+        )
+
+    return (
+        select(model, tree.c.graphemy_root)
+        .options(*options)
+        .join(
+            tree,
+            and_(
+                *[
+                    key == tree.c[f"graphemy_key_{i}"]
+                    for i, key in enumerate(primary_keys)
+                ],
+            ),
+        )
+    )
+
+
+async def get_through_items(
+    model: "Graphemy",
+    parameters: list[tuple],
+    field: Callable,
+    *,
+    context: dict | None = None,
+    conditions: list[AsBoolean] | None = None,
+) -> list[list["Graphemy"]]:
+    """
+    Retrieve the rows of a many-to-many relationship for multiple
+    (key, filters) parameter sets, joining the association model to the
+    target rows in one statement per unique filter string and engine. The
+    association rows are never loaded.
+
+    Args:
+        model (Graphemy): The Graphemy (SQLModel) class of the related rows.
+        parameters (list[tuple]): (key, filter JSON string) tuples, as for
+            get_items, the keys being matched with the association source.
+        field (Callable): The Dl resolver of the relationship, with its
+            `through`, `through_source`, `through_target` and `target`.
+        context (dict | None, optional): The GraphQL context of the current request.
+        conditions (list[AsBoolean] | None, optional): Extra predicates added to
+            the WHERE clause of every statement. Defaults to None.
+
+    Returns:
+        list[list["Graphemy"]]: The related rows of each parameter set.
+    """
+    link = Setup.classes[field.through]
+    link_source = getattr(link, field.through_source)
+
+    # Dictionary to group the keys by their filter string
+    groups = {}
+    for p in parameters:
+        groups.setdefault(p[1], {}).setdefault(p[0], [])
+
+    statements = []
+    for filter_str, filter_value in groups.items():
+        query_filter = (
+            get_query_filter(
+                json.loads(filter_str),
+                model,
+                [],
+                context=context,
+            )
+            if filter_str
+            else [True]
+        ) + (conditions or [])
+        statement = (
+            select(model, link_source)
+            .options(*get_computed_options(model, context))
+            .join(
+                link,
+                getattr(link, field.through_target)
+                == getattr(model, field.target),
+            )
+            .where(in_values(link_source, list(filter_value)))
+            .where(*query_filter)
+        )
+        statements.extend(
+            (filter_str, statement, name) for name in get_shard_names(model)
+        )
+
+    # Execute every statement concurrently, across filters and shards
+    started = perf_counter()
+    results = await asyncio.gather(
+        *[
+            Setup.execute_query(statement, name, context, scalars=False)
+            for _filter_str, statement, name in statements
+        ],
+    )
+    record_statement(link, {field.through_source}, started)
+
+    # Rows already hydrated in this request are shared, not duplicated
+    identity_map = context.get("identity_map") if context else None
+
+    # Group each row by the association source it was joined from
+    for (filter_str, _statement, _name), rows in zip(
+        statements,
+        results,
+        strict=True,
+    ):
+        for row, key in rows:
+            groups[filter_str][key].append(get_identity(row, identity_map))
+
+    # Return the results in the same order as the requested parameters
+    return [groups[p[1]][p[0]] for p in parameters]
+
+
+async def get_statement_items(
+    model: "Graphemy",
+    parameters: list[tuple],
+    statement: Callable[[list], Select],
+    key_id: str | list[str],
+    *,
+    context: dict | None = None,
+    conditions: list[AsBoolean] | None = None,
+) -> list[list["Graphemy"]]:
+    """
+    Retrieve the rows of a relationship loaded by a custom statement, for
+    multiple (key, filters) parameter sets, with one statement per unique
+    filter string.
+
+    The statement is built from the batched keys and runs on the model's
+    engine. Each of its rows is turned into a model instance (unless it
+    selects the model itself) and grouped by its key column(s).
+
+    Args:
+        model (Graphemy): The Graphemy (SQLModel) class of the related rows.
+        parameters (list[tuple]): (key, filter JSON string) tuples, as for get_items.
+        statement (Callable[[list], Select]): Builds the statement of a list of
+            keys.
+        key_id (str | list[str]): The name(s) of the key column(s) selected
+            by the statement.
+        context (dict | None, optional): The GraphQL context of the current request.
+        conditions (list[AsBoolean] | None, optional): Extra predicates on the
+            model's columns, matched by name with the statement's columns.
+            Defaults to None.
+
+    Returns:
+        list[list["Graphemy"]]: The related rows of each parameter set.
+    """
+    # Dictionary to group the keys by their filter string
+    groups = {}
+    for p in parameters:
+        groups.setdefault(p[1], {}).setdefault(p[0], [])
+
+    statements = []
     for filter_str, filter_value in groups.items():
-        query = select(model)
+        query = statement(list(filter_value))
+        query_filter = (
+            get_query_filter(
+                json.loads(filter_str),
+                model,
+                [],
+                context=context,
+            )
+            if filter_str
+            else []
+        ) + (conditions or [])
+        # Filters apply to the statement's columns named after the model's
+        if query_filter:
+            rows = query.subquery()
+            adapter = ClauseAdapter(rows, adapt_on_names=True)
+            query = rows.select().where(
+                *[adapter.traverse(condition) for condition in query_filter],
+            )
+        statements.append((filter_str, query))
+
+    # Execute every statement concurrently
+    results = await asyncio.gather(
+        *[
+            Setup.execute_query(
+                query,
+                model.__enginename__,
+                context,
+                scalars=False,
+            )
+            for _filter_str, query in statements
+        ],
+    )
+
+    # Rows already hydrated in this request are shared, not duplicated
+    identity_map = context.get("identity_map") if context else None
+
+    # Group each row by its key column(s)
+    for (filter_str, query), rows in zip(statements, results, strict=True):
+        names = [column["name"] for column in query.column_descriptions]
+        for row in rows:
+            values = dict(zip(names, row, strict=True))
+            # Statements may select the model itself. Rows built from other
+            # columns may be derived or partial and are never shared.
+            item = (
+                get_identity(row[0], identity_map)
+                if isinstance(row[0], model)
+                else model.model_validate(values)
+            )
+            # Key columns may also be read from a selected model
+            key = tuple(
+                values[k] if k in values else getattr(item, k)
+                for k in (key_id if isinstance(key_id, list) else [key_id])
+            )
+            key = key if isinstance(key_id, list) else key[0]
+            if key in groups[filter_str]:
+                groups[filter_str][key].append(item)
+
+    # Return the results in the same order as the requested parameters
+    return [groups[p[1]][p[0]] for p in parameters]
+
+
+def get_computed_options(
+    model: "Graphemy",
+    context: dict | None,
+    entity: object = None,
+) -> list:
+    """
+    Build the loader options projecting the Computed fields of a model
+    requested in the current request (see request_computed).
+
+    Args:
+        model (Graphemy): The Graphemy (SQLModel) class being loaded.
+        context (dict | None): The GraphQL context of the current request.
+        entity (object, optional): The selected entity, when it is an alias
+            of the model. Defaults to the model.
+
+    Returns:
+        list: `undefer` options of the requested fields.
+    """
+    computed_fields = context.get("computed_fields") if context else None
+    return [
+        undefer(getattr(entity or model, name))
+        for name in sorted((computed_fields or {}).get(model.__name__, ()))
+    ]
+
+
+async def get_computed_values(
+    model: "Graphemy",
+    name: str,
+    parameters: list[tuple],
+    context: dict | None = None,
+) -> list:
+    """
+    Select a Computed field of rows by primary key, for rows loaded without
+    it.
+
+    Args:
+        model (Graphemy): The Graphemy (SQLModel) class owning the field.
+        name (str): The name of the Computed field.
+        parameters (list[tuple]): (primary key, filter JSON string) tuples.
+        context (dict | None, optional): The GraphQL context of the current request.
+
+    Returns:
+        list: The value of each parameter set, None for missing rows.
+    """
+    key_id = list(get_primary_keys(model))
+    key_id = key_id if len(key_id) > 1 else key_id[0]
+    keys = list(dict.fromkeys(p[0] for p in parameters))
+    key_columns = [
+        getattr(model, k)
+        for k in (key_id if isinstance(key_id, list) else [key_id])
+    ]
+
+    # Select the values concurrently across shards
+    results = await asyncio.gather(
+        *[
+            Setup.execute_query(
+                select(*key_columns, getattr(model, name)).where(
+                    get_key_condition(model, key_id, shard_keys),
+                ),
+                shard,
+                context,
+                scalars=False,
+            )
+            for shard, shard_keys in get_partitions(
+                model,
+                key_id,
+                keys,
+            ).items()
+        ],
+    )
+    values = {}
+    for row in chain.from_iterable(results):
+        key = tuple(row[:-1]) if isinstance(key_id, list) else row[0]
+        values[key] = row[-1]
+    return [values.get(p[0]) for p in parameters]
+
+
+def get_partitions(
+    model: "Graphemy",
+    key_id: str | list[str],
+    keys: list,
+) -> dict[str, list]:
+    """
+    Split DataLoader keys by the engine holding their rows.
+
+    Keys are split by shard when the shard key is part of them, otherwise
+    every shard (or the single engine) gets all the keys.
+
+    Args:
+        model (Graphemy): The Graphemy (SQLModel) class being loaded.
+        key_id (str | list[str]): The key field name(s).
+        keys (list): Key values, tuples of values when key_id is a list.
+
+    Returns:
+        dict[str, list]: The keys to load, keyed by engine name.
+    """
+    # Position of the shard key within the loader keys, if the model is sharded
+    shard_index = get_shard_index(model, key_id)
+    if shard_index is None:
+        return {name: list(keys) for name in get_shard_names(model)}
+
+    partitions = {}
+    for key in keys:
+        value = key[shard_index] if isinstance(key_id, list) else key
+        partitions.setdefault(model.get_shard(value), []).append(key)
+    return partitions
+
+
+async def get_aggregates(
+    model: "Graphemy",
+    parameters: list[tuple],
+    *,
+    key_id: str | list[str] = "id",
+    context: dict | None = None,
+    conditions: list[AsBoolean] | None = None,
+) -> list[dict | None]:
+    """
+    Compute the aggregates of the rows related to each (key, filters) parameter
+    set, with one GROUP BY statement per unique filter string and engine.
+
+    Args:
+        model (Graphemy): The Graphemy (SQLModel) class of the aggregated rows.
+        parameters (list[tuple]): (key, filter JSON string) tuples, as for get_items.
+        key_id (str | list[str], optional): The key field name(s). Defaults to "id".
+        context (dict | None, optional): The GraphQL context of the current request.
+        conditions (list[AsBoolean] | None, optional): Extra predicates added to
+            the WHERE clause of every statement. Defaults to None.
+
+    Returns:
+        list[dict | None]: For each parameter set, a dict with the row "count"
+            and the "sum", "avg", "min" and "max" of each field (dicts keyed by
+            field name), or None if no row matched.
+    """
+    key_ids = key_id if isinstance(key_id, list) else [key_id]
+    key_columns = [getattr(model, k) for k in key_ids]
+    numeric, comparable = get_aggregate_fields(model)
+    columns = get_aggregate_columns(numeric, comparable)
+
+    # Dictionary to group the keys by their filter string
+    groups = {}
+    for p in parameters:
+        groups.setdefault(p[1], {})[p[0]] = None
+
+    for filter_str, filter_value in groups.items():
+        query_filter = (
+            get_query_filter(
+                json.loads(filter_str),
+                model,
+                [],
+                context=context,
+            )
+            if filter_str
+            else [True]
+        ) + (conditions or [])
+
+        # Aggregate concurrently across shards
+        results = await asyncio.gather(
+            *[
+                Setup.execute_query(
+                    select(*key_columns, *columns)
+                    .where(get_key_condition(model, key_id, keys))
+                    .where(*query_filter)
+                    .group_by(*key_columns),
+                    name,
+                    context,
+                    scalars=False,
+                )
+                for name, keys in get_partitions(
+                    model,
+                    key_id,
+                    list(filter_value),
+                ).items()
+            ],
+        )
+
+        # Merge the partial aggregates of every shard by key
+        for row in chain.from_iterable(results):
+            key = tuple(row[: len(key_ids)])
+            key = key if isinstance(key_id, list) else key[0]
+            filter_value[key] = merge_aggregates(
+                filter_value.get(key),
+                row[len(key_ids) :],
+                numeric,
+                comparable,
+            )
+
+    # Return the results in the same order as the requested parameters
+    return [
+        finish_aggregates(groups[p[1]].get(p[0]), numeric) for p in parameters
+    ]
+
+
+async def get_grouped_aggregates(
+    model: "Graphemy",
+    filters: "Graphemy",
+    query_filter: AsBoolean,
+    *,
+    group_by: list[str] | None = None,
+    context: dict | None = None,
+) -> list[tuple[dict, dict]]:
+    """
+    Compute the aggregates of a model's rows, optionally grouped by columns,
+    with a single GROUP BY statement (per shard).
+
+    Args:
+        model (Graphemy): The Graphemy (SQLModel) model class to aggregate.
+        filters (Graphemy): The filtering criteria of the rows.
+        query_filter (AsBoolean): A SQLAlchemy Boolean expression for additional filtering.
+        group_by (list[str] | None, optional): The field names to group by.
+            Defaults to None (a single group of every row).
+        context (dict | None, optional): The GraphQL context of the current request.
+
+    Returns:
+        list[tuple[dict, dict]]: (group values keyed by field name, aggregates)
+            pairs, sorted by group values. Aggregates are dicts as returned by
+            get_aggregates.
+    """
+    group_by = group_by or []
+    fields = get_fields_metadata(model)
+    group_columns = [fields[name].column for name in group_by]
+    numeric, comparable = get_aggregate_fields(model)
+
+    filters = asdict(filters) if filters else None
+    query = (
+        select(*group_columns, *get_aggregate_columns(numeric, comparable))
+        .where(*get_conditions(model, filters, query_filter, context))
+        .group_by(*group_columns)
+    )
+
+    # Aggregate concurrently across the shards that can hold matching rows
+    results = await asyncio.gather(
+        *[
+            Setup.execute_query(query, name, context, scalars=False)
+            for name in get_shard_names(
+                model,
+                get_shard_values(model, filters),
+            )
+        ],
+    )
+
+    # Merge the partial aggregates of every shard by group
+    groups = {}
+    for row in chain.from_iterable(results):
+        key = tuple(row[: len(group_by)])
+        groups[key] = merge_aggregates(
+            groups.get(key),
+            row[len(group_by) :],
+            numeric,
+            comparable,
+        )
+
+    # Without GROUP BY, no matching row still returns a row of empty aggregates
+    return [
+        (
+            dict(zip(group_by, key, strict=True)),
+            finish_aggregates(groups[key], numeric)
+            if groups[key]["count"]
+            else None,
+        )
+        for key in sorted(
+            groups,
+            key=lambda k: [(v is not None, v) for v in k],
+        )
+    ]
 
-        # If the primary key is a list, build AND conditions for each field
-        if isinstance(key_id, list):
-            conditions = [
+
+def get_aggregate_columns(numeric: list, comparable: list) -> list:
+    """
+    Build the aggregate columns selected by aggregate statements.
+
+    Args:
+        numeric (list): The metadata of the summed fields.
+        comparable (list): The metadata of the compared fields.
+
+    Returns:
+        list: The row count, the sums and non-null counts of numeric fields,
+            then the minimums and maximums of compared fields.
+    """
+    return [
+        func.count(),
+        *[func.sum(f.column) for f in numeric],
+        *[func.count(f.column) for f in numeric],
+        *[func.min(f.column) for f in comparable],
+        *[func.max(f.column) for f in comparable],
+    ]
+
+
+def merge_aggregates(
+    current: dict | None,
+    values: tuple,
+    numeric: list,
+    comparable: list,
+) -> dict:
+    """
+    Merge one row of partial aggregates into the aggregates of a key.
+
+    Args:
+        current (dict | None): The aggregates merged so far, if any.
+        values (tuple): The count, sums, non-null counts, minimums and
+            maximums of a row, in the order selected by get_aggregates.
+        numeric (list): The metadata of the summed fields.
+        comparable (list): The metadata of the compared fields.
+
+    Returns:
+        dict: The merged aggregates.
+    """
+    n, c = len(numeric), len(comparable)
+    sums = dict(zip([f.name for f in numeric], values[1 : 1 + n], strict=True))
+    counts = dict(
+        zip([f.name for f in numeric], values[1 + n : 1 + 2 * n], strict=True),
+    )
+    offset = 1 + 2 * n
+    mins = dict(
+        zip(
+            [f.name for f in comparable],
+            values[offset : offset + c],
+            strict=True,
+        ),
+    )
+    maxs = dict(
+        zip([f.name for f in comparable], values[offset + c :], strict=True),
+    )
+    if current is None:
+        return {
+            "count": values[0],
+            "sum": sums,
+            "counts": counts,
+            "min": mins,
+            "max": maxs,
+        }
+
+    current["count"] += values[0]
+    for name, value in sums.items():
+        current["sum"][name] = combine(current["sum"][name], value, add)
+        current["counts"][name] += counts[name]
+    for name, value in mins.items():
+        current["min"][name] = combine(current["min"][name], value, min)
+        current["max"][name] = combine(current["max"][name], maxs[name], max)
+    return current
+
+
+def combine(a: object, b: object, pick: Callable) -> object:
+    """
+    Combine two partial aggregates of a field, ignoring missing ones.
+
+    Args:
+        a (object): A partial aggregate, or None.
+        b (object): Another partial aggregate, or None.
+        pick (Callable): The function combining two present values.
+
+    Returns:
+        object: The combined aggregate.
+    """
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return pick(a, b)
+
+
+def finish_aggregates(aggregates: dict | None, numeric: list) -> dict | None:
+    """
+    Derive the averages of merged aggregates from their sums and counts.
+
+    Args:
+        aggregates (dict | None): The merged aggregates of a key, if any.
+        numeric (list): The metadata of the summed fields.
+
+    Returns:
+        dict | None: The aggregates with "avg", or None if no row matched.
+    """
+    if aggregates is None:
+        return None
+    counts = aggregates.pop("counts")
+    aggregates["avg"] = {
+        f.name: aggregates["sum"][f.name] / counts[f.name]
+        if counts[f.name]
+        else None
+        for f in numeric
+    }
+    return aggregates
+
+
+async def execute_groups(
+    model: "Graphemy",
+    statements: list[tuple[str | None, Select]],
+    engine: str,
+    context: dict | None = None,
+) -> list[tuple[str | None, "Graphemy"]]:
+    """
+    Execute the statements of several filter groups in a single round trip.
+
+    Several statements are combined with UNION ALL, each tagged with a
+    discriminator column holding its position, which is then used to give
+    every row back to its group.
+
+    Args:
+        model (Graphemy): The Graphemy (SQLModel) class selected by the statements.
+        statements (list[tuple[str | None, Select]]): (filter string, statement)
+            pairs, each statement selecting the model.
+        engine (str): The key name of the engine in the 'engine' dict.
+        context (dict | None, optional): The GraphQL context of the current request.
+
+    Returns:
+        list[tuple[str | None, Graphemy]]: (filter string, row) pairs.
+    """
+    if len(statements) == 1:
+        filter_str, statement = statements[0]
+        rows = await Setup.execute_query(statement, engine, context)
+        return [(filter_str, r) for r in rows]
+
+    union = union_all(
+        *[
+            statement.add_columns(literal(i).label(GROUP_COLUMN))
+            for i, (_, statement) in enumerate(statements)
+        ],
+    ).subquery()
+    entity = aliased(model, union)
+    rows = await Setup.execute_query(
+        select(entity, union.c[GROUP_COLUMN]).options(
+            *get_computed_options(model, context, entity),
+        ),
+        engine,
+        context,
+        scalars=False,
+    )
+    return [(statements[group][0], r) for r, group in rows]
+
+
+def get_key_condition(
+    model: "Graphemy",
+    key_id: str | list[str],
+    keys: list,
+) -> AsBoolean:
+    """
+    Build the condition matching rows whose key column(s) are in a list of keys.
+
+    Args:
+        model (Graphemy): The Graphemy (SQLModel) class representing the database table.
+        key_id (str | list[str]): The key field name(s).
+        keys (list): Key values, tuples of values when key_id is a list.
+
+    Returns:
+        AsBoolean: A SQLAlchemy boolean expression.
+    """
+    # Long lists of keys are bound as one array parameter per key field
+    if isinstance(key_id, list) and is_array_bound(keys):
+        return ArrayIn([getattr(model, column) for column in key_id], keys)
+    # If the key is a list, build AND conditions for each field
+    if isinstance(key_id, list):
+        return or_(
+            *[
                 and_(
                     *[
                         getattr(model, column) == key[i]
                         for i, column in enumerate(key_id)
                     ],
                 )
-                for key in filter_value
-            ]
-            query = query.where(or_(*conditions))
-        else:
-            # Otherwise, use the simple case: the key_id is a single field
-            query = query.where(
-                getattr(model, key_id).in_(filter_value.keys()),
-            )
+                for key in keys
+            ],
+        )
+    # Otherwise, use the simple case: the key_id is a single field
+    return in_values(getattr(model, key_id), keys)
 
-        # Decode the filter JSON string if provided
-        if filter_str:
-            query_filter = json.loads(filter_str)
-        # Build the actual SQLAlchemy filter conditions
-        query_filter = (
-            get_query_filter(query_filter, model, []) if filter_str else [True]
+
+def get_subquery_condition(
+    model: "Graphemy",
+    key_id: str | list[str],
+    root: Select,
+) -> AsBoolean:
+    """
+    Build the condition matching rows whose key column(s) are returned by a
+    statement, e.g. `author_id IN (SELECT id FROM author WHERE ...)`.
+
+    Args:
+        model (Graphemy): The Graphemy (SQLModel) class representing the database table.
+        key_id (str | list[str]): The key field name(s).
+        root (Select): A statement selecting one column per key field, in order.
+
+    Returns:
+        AsBoolean: A SQLAlchemy boolean expression.
+    """
+    if isinstance(key_id, list):
+        return tuple_(*[getattr(model, column) for column in key_id]).in_(
+            root,
         )
+    return getattr(model, key_id).in_(root)
+
 
-        # Execute the query with the given filters
-        results = await Setup.execute_query(
-            query.where(*query_filter),
-            model.__enginename__,
+def get_conditions(
+    model: "Graphemy",
+    filters: dict | None,
+    query_filter: AsBoolean,
+    context: dict | None = None,
+) -> list[AsBoolean]:
+    """
+    Build the WHERE conditions of a root query.
+
+    Args:
+        model (Graphemy): The Graphemy (SQLModel) model class to query.
+        filters (dict | None): The filtering criteria of the query.
+        query_filter (AsBoolean): A SQLAlchemy Boolean expression for additional filtering.
+        context (dict | None, optional): The GraphQL context of the current request.
+
+    Returns:
+        list[AsBoolean]: The conditions, to be combined with AND.
+    """
+    # Base conditions with the provided "query_filter"
+    conditions = [query_filter]
+
+    # If additional filters are provided, convert them to SQLAlchemy conditions
+    if filters:
+        conditions = get_query_filter(
+            filters,
+            model,
+            conditions,
+            context=context,
         )
+    return conditions
 
-        # Group each result by its corresponding key value
-        for r in results:
-            key = (
-                tuple([getattr(r, i) for i in key_id])
-                if isinstance(key_id, list)
-                else getattr(r, key_id)
-            )
-            filter_value[key].append(r)
 
-    # Flatten the nested structure into a single list of lists
-    final = []
-    [final.extend(value.values()) for value in groups.values()]
-    return final
+def get_root_query(
+    model: "Graphemy",
+    filters: "Graphemy",
+    query_filter: AsBoolean,
+    *,
+    sort: list["Graphemy"] | None = None,
+    offset: int | None = None,
+    limit: int | None = None,
+    context: dict | None = None,
+) -> Select:
+    """
+    Build the statement selecting the rows of a root query on a single engine,
+    so that the relationships of those rows can be loaded with a subquery
+    (see get_items).
+
+    Args:
+        model (Graphemy): The Graphemy (SQLModel) model class to query.
+        filters (Graphemy): The filtering criteria of the root query.
+        query_filter (AsBoolean): A SQLAlchemy Boolean expression for additional filtering.
+        sort (list["Graphemy"] | None, optional): The sort instructions of
+            the root query. Defaults to None.
+        offset (int | None, optional): The offset for pagination. Defaults to None.
+        limit (int | None, optional): The maximum number of items returned.
+            Defaults to None.
+        context (dict | None, optional): The GraphQL context of the current request.
+
+    Returns:
+        Select: A select of the model rows returned by the root query.
+    """
+    query = select(model).where(
+        *get_conditions(
+            model,
+            asdict(filters) if filters else None,
+            query_filter,
+            context,
+        ),
+    )
+    # Ordering only matters to pick the same page of parents
+    if offset or limit:
+        query = query.order_by(
+            *get_page_order(model, sort, asdict(filters) if filters else None),
+        )
+    if offset:
+        query = query.offset(offset)
+    if limit:
+        query = query.limit(limit)
+    return query
 
 
 async def get_all(
@@ -108,6 +1106,10 @@ async def get_all(
     sort: list["Graphemy"] | None,
     offset: int | None,
     limit: int | None,
+    *,
+    context: dict | None = None,
+    joins: list[tuple] | None = None,
+    tree: list["TreePlan"] | None = None,
 ) -> tuple[list["Graphemy"], int | None]:
     """
     Retrieve all items from the database for a given model, with optional filters, sorting, and pagination.
@@ -118,54 +1120,286 @@ async def get_all(
             filtering criteria. This is converted to SQLAlchemy conditions via get_query_filter.
         query_filter (AsBoolean): A SQLAlchemy Boolean expression for additional filtering.
         sort (list["Graphemy"] | None): A list of sort instructions, which are translated
-            into ORDER BY clauses via get_sort_criteria.
+            into ORDER BY clauses via get_order_by.
         offset (int | None): The offset for pagination. Defaults to None.
         limit (int | None): The maximum number of items to return. Defaults to None.
+        context (dict | None, optional): The GraphQL context of the current request.
+        joins (list[tuple] | None, optional): (entity, onclause) pairs LEFT JOINed
+            to the query and added to its columns, in order. When given, each
+            fetched row is a tuple of the model instance and the joined entities.
+        tree (list[TreePlan] | None, optional): Relationships compiled with the
+            rows into a single statement. When given, each fetched row is a
+            JSON object of the row's columns and its nested relationships.
 
     Returns:
         tuple[list["Graphemy"], int | None]: A tuple containing:
             - A list of fetched rows matching the filters/sorting.
             - The total count of rows (if pagination is used) or None.
     """
-    # Base query with the provided "query_filter" conditions
-    query = select(model).where(query_filter)
+    started = perf_counter()
+    filters = asdict(filters) if filters else None
+    conditions = get_conditions(model, filters, query_filter, context)
+    # Only the index advisor needs the filtered and sorted columns
+    columns = (
+        get_filter_columns(model, filters) | get_sort_columns(model, sort)
+        if Setup.index_advisor is not None
+        else set()
+    )
 
-    # If additional filters are provided, convert them to SQLAlchemy conditions
-    if filters:
-        query = query.where(*get_query_filter(asdict(filters), model, []))
+    # Only the shards that can hold matching rows are queried
+    shards = get_shard_names(model, get_shard_values(model, filters))
+    if not shards:
+        return [], 0 if offset or limit else None
 
-    # Handle offset/limit (pagination); if applied, we also get the total count
+    # The JSON functions of a compiled tree depend on the dialect
+    query = get_select(
+        model,
+        joins,
+        tree,
+        Setup.engine[shards[0]].dialect.name if tree else None,
+    ).where(*conditions)
+    if not tree:
+        query = query.options(*get_computed_options(model, context))
+
+    # Handle sorting instructions, deterministically when paginating
     if offset or limit:
-        count_query = select(func.count()).select_from(query)
-        count = await Setup.execute_query(count_query, model.__enginename__)
-        count = count[0]
+        query = query.order_by(*get_page_order(model, sort, filters))
+    elif sort:
+        query = query.order_by(*get_order_by(model, sort, filters))
+
+    # Handle offset/limit (pagination); if applied, we also get the total count
+    count = (
+        await count_rows(model, conditions, shards, context)
+        if offset or limit
+        else None
+    )
 
+    if len(shards) == 1:
         if offset:
             query = query.offset(offset)
         if limit:
             query = query.limit(limit)
-    else:
-        count = None
-
-    # Handle sorting instructions
-    if sort and len(sort) > 0:
-        criteria = get_sort_criteria(sort, model)
-        for c in criteria:
-            if c[2] == "asc":
-                query = query.order_by(getattr(model, c[0]).asc())
-            else:
-                query = query.order_by(getattr(model, c[0]).desc())
 
-    # Execute the final query
-    r = await Setup.execute_query(query, model.__enginename__)
+        # Execute the final query
+        r = await Setup.execute_query(
+            query,
+            shards[0],
+            context,
+            scalars=not joins,
+        )
+        # JSON rows of a compiled tree are hydrated later (see prime_tree)
+        if not tree:
+            r = get_identities(r, context, joined=bool(joins))
+        record_statement(model, columns, started)
+        return r, count
 
+    # Each shard returns enough rows to fill the requested page once merged
+    if limit:
+        query = query.limit((offset or 0) + limit)
+    results = await asyncio.gather(
+        *[Setup.execute_query(query, name, context) for name in shards],
+    )
+    record_statement(model, columns, started)
+    r = get_identities(list(chain.from_iterable(results)), context)
+    if sort:
+        r = multiple_sort(
+            model,
+            r,
+            sort,
+            nulls_last=Setup.engine[shards[0]].dialect.name
+            in nulls_last_dialects,
+        )
+    if offset:
+        r = r[offset:]
+    if limit:
+        r = r[:limit]
     return r, count
 
 
+async def count_rows(
+    model: "Graphemy",
+    conditions: list[AsBoolean],
+    shards: list[str],
+    context: dict | None = None,
+) -> int:
+    """
+    Count the rows of a model matching a root query's conditions, across the
+    given shards.
+
+    Args:
+        model (Graphemy): The Graphemy (SQLModel) model class to count.
+        conditions (list[AsBoolean]): The WHERE conditions of the root query.
+        shards (list[str]): The names of the engines holding matching rows.
+        context (dict | None, optional): The GraphQL context of the current request.
+
+    Returns:
+        int: The total row count.
+    """
+    count_query = select(func.count()).select_from(
+        select(model).where(*conditions).subquery(),
+    )
+    counts = await asyncio.gather(
+        *[Setup.execute_query(count_query, name, context) for name in shards],
+    )
+    return sum(c[0] for c in counts)
+
+
+def get_identities(
+    rows: list,
+    context: dict | None,
+    *,
+    joined: bool = False,
+) -> list:
+    """
+    Replace fetched rows by the instances already hydrated in the current
+    request for the same (model, primary key), if any.
+
+    Args:
+        rows (list): Model instances, or tuples of them for joined rows.
+        context (dict | None): The GraphQL context holding the identity map.
+        joined (bool, optional): Whether each row is a tuple of the root
+            instance and its joined instances. Defaults to False.
+
+    Returns:
+        list: The rows, sharing one instance per identity.
+    """
+    identity_map = context.get("identity_map") if context else None
+    if identity_map is None:
+        return rows
+    if joined:
+        return [
+            tuple(get_identity(entity, identity_map) for entity in row)
+            for row in rows
+        ]
+    return [get_identity(row, identity_map) for row in rows]
+
+
+def get_select(
+    model: "Graphemy",
+    joins: list[tuple] | None,
+    tree: list["TreePlan"] | None,
+    dialect: str | None,
+) -> Select:
+    """
+    Build the SELECT of a root query, before filtering and sorting.
+
+    Args:
+        model (Graphemy): The Graphemy (SQLModel) model class to query.
+        joins (list[tuple] | None): (entity, onclause) pairs to LEFT JOIN.
+        tree (list[TreePlan] | None): Relationships compiled as JSON.
+        dialect (str | None): The SQLAlchemy dialect name of the engine,
+            only needed for a tree.
+
+    Returns:
+        Select: A select of the model (and joined entities), or of a JSON
+            object per row when a tree is given.
+    """
+    # Build each row and its relationships as JSON in the database
+    if tree:
+        return select(compile_json_tree(model, model, tree, dialect))
+
+    # Otherwise select the model and the joined entities; joins never add rows
+    joins = joins or []
+    query = select(model, *[entity for entity, _ in joins])
+    for entity, onclause in joins:
+        query = query.outerjoin(entity, onclause)
+    return query
+
+
+def get_order_by(
+    model: "Graphemy",
+    sort: list["Graphemy"],
+    filters: dict | None = None,
+) -> list:
+    """
+    Translate sort instructions into SQLAlchemy ORDER BY clauses.
+
+    Args:
+        model (Graphemy): The Graphemy (SQLModel) model class being sorted.
+        sort (list["Graphemy"]): A list of sort instructions.
+        filters (dict | None, optional): The filtering criteria of the query,
+            whose `search` terms are ranked by `searchRank`.
+
+    Returns:
+        list: Ascending or descending column clauses, in order.
+    """
+    fields = get_fields_metadata(model)
+    searches = [
+        Search(fields[name].column, terms)
+        for name, terms in get_search_terms(filters)
+    ]
+    clauses = []
+    for s in sort:
+        for field, order in vars(s).items():
+            if order is None:
+                continue
+            if field in fields:
+                column = fields[field].column
+            elif field == "search_rank" and searches:
+                column = SearchRank(searches)
+            else:
+                continue
+            clauses.append(
+                column.asc() if order.value == "asc" else column.desc(),
+            )
+    return clauses
+
+
+def get_page_order(
+    model: "Graphemy",
+    sort: list["Graphemy"] | None,
+    filters: dict | None = None,
+) -> list:
+    """
+    Translate sort instructions into the ORDER BY clauses of a paginated
+    query, ending with the primary keys so that rows sorting equally always
+    fall on the same page.
+
+    Args:
+        model (Graphemy): The Graphemy (SQLModel) model class being sorted.
+        sort (list["Graphemy"] | None): A list of sort instructions.
+        filters (dict | None, optional): The filtering criteria of the query,
+            whose `search` terms are ranked by `searchRank`.
+
+    Returns:
+        list: Ascending or descending column clauses, in order.
+    """
+    return [
+        *get_order_by(model, sort or [], filters),
+        *[getattr(model, key).asc() for key in get_primary_keys(model)],
+    ]
+
+
+def get_write_engine_name(model: "Graphemy", values: dict) -> str:
+    """
+    Resolve the engine name an item must be written to.
+
+    Args:
+        model (Graphemy): The Graphemy (SQLModel) model class being written.
+        values (dict): The field values of the item.
+
+    Returns:
+        str: The model's engine name, or the shard owning the item.
+
+    Raises:
+        ValueError: If the model is sharded and the shard key is missing.
+    """
+    if not model.__shard_key__:
+        return model.__enginename__
+    value = values.get(model.__shard_key__)
+    if value is None:
+        error_text = (
+            f"Missing shard key '{model.__shard_key__}' for {model.__name__}."
+        )
+        raise ValueError(error_text)
+    return model.get_shard(value)
+
+
 async def put_item(
     model: "Graphemy",
     item: "Graphemy",
     key: list[str],
+    context: dict | None = None,
 ) -> "Graphemy":
     """
     Insert or update a single item in the database.
@@ -177,6 +1411,7 @@ async def put_item(
         model (Graphemy): The Graphemy (SQLModel) model class to insert/update.
         item (Graphemy): The item instance containing data to insert or update.
         key (list[str]): A list of field names representing the primary key.
+        context (dict | None, optional): The GraphQL context of the current request.
 
     Returns:
         Graphemy: The inserted or updated model instance.
@@ -187,11 +1422,14 @@ async def put_item(
     # Convert the item to a dictionary of field values
     kwargs = vars(item)
 
-    # Retrieve the engine from Setup
-    engine = Setup.engine[model.__enginename__]
+    # Sharded models are written to the shard owning the item's shard key
+    engine_name = get_write_engine_name(model, kwargs)
+
+    # Retrieve the primary engine from Setup
+    engine = Setup.get_engine(engine_name, context, write=True)
 
-    # If using async engine, handle insert/update with async session
-    if Setup.async_engine:
+    # If the model's engine is async, handle insert/update with async session
+    if Setup.is_async(engine):
         async_session = sessionmaker(
             engine,
             class_=AsyncSession,
@@ -211,6 +1449,7 @@ async def put_item(
 
             # Add the new or updated item to the session and commit
             session.add(new_item)
+            await session.run_sync(update_search_index, model, new_item)
             await session.commit()
             await session.refresh(new_item)
 
@@ -227,9 +1466,20 @@ async def put_item(
                     setattr(new_item, field_name, value)
 
             session.add(new_item)
+            # Keep the full-text index of the row in the same transaction
+            update_search_index(session, model, new_item)
             session.commit()
             session.refresh(new_item)
 
+    # Later reads in this request should see the write
+    Setup.mark_written(engine_name, context)
+    if context and "identity_map" in context:
+        context["identity_map"][
+            (
+                model,
+                tuple(getattr(new_item, k) for k in get_primary_keys(model)),
+            )
+        ] = new_item
     return new_item
 
 
@@ -237,6 +1487,7 @@ async def delete_item(
     model: "Graphemy",
     item: "Graphemy",
     key: list[str],
+    context: dict | None = None,
 ) -> "Graphemy":
     """
     Delete an item from the database using the provided model and primary key.
@@ -245,35 +1496,60 @@ async def delete_item(
         model (Graphemy): The Graphemy (SQLModel) model class to delete from.
         item (Graphemy): The instance containing the primary key values to identify the row.
         key (list[str]): The list of field names that form the primary key.
+        context (dict | None, optional): The GraphQL context of the current request.
 
     Returns:
         Graphemy: The deleted item. If no item was found, None is returned (runtime error if not handled).
     """
+    # Sharded models are deleted from the shard owning the item, or from
+    # every shard when the shard key is not part of the primary key
+    value = (
+        getattr(item, model.__shard_key__, None)
+        if model.__shard_key__
+        else None
+    )
+    engine_names = get_shard_names(model, None if value is None else [value])
+
     # Extract the primary key values
     key = [getattr(item, i) for i in key]
 
-    engine = Setup.engine[model.__enginename__]
+    deleted = None
+    for engine_name in engine_names:
+        engine = Setup.get_engine(engine_name, context, write=True)
 
-    # If using async engine, delete with async session
-    if Setup.async_engine:
-        async_session = sessionmaker(
-            engine,
-            class_=AsyncSession,
-            expire_on_commit=False,
-        )
-        async with async_session() as session:
-            item = await session.get(model, key)
-            # If item exists, delete it
-            if item:
-                await session.delete(item)
-                await session.commit()
+        # If the model's engine is async, delete with async session
+        if Setup.is_async(engine):
+            async_session = sessionmaker(
+                engine,
+                class_=AsyncSession,
+                expire_on_commit=False,
+            )
+            async with async_session() as session:
+                item = await session.get(model, key)
+                # If item exists, delete it
+                if item:
+                    await session.run_sync(
+                        update_search_index,
+                        model,
+                        item,
+                        remove=True,
+                    )
+                    await session.delete(item)
+                    await session.commit()
 
-    # Otherwise, handle deletion with a synchronous session
-    else:
-        with Session(engine) as session:
-            item = session.get(model, key)
-            if item:
-                session.delete(item)
-                session.commit()
+        # Otherwise, handle deletion with a synchronous session
+        else:
+            with Session(engine) as session:
+                item = session.get(model, key)
+                if item:
+                    update_search_index(session, model, item, remove=True)
+                    session.delete(item)
+                    session.commit()
+
+        Setup.mark_written(engine_name, context)
+        deleted = deleted or item
 
-    return item
+    # Deleted rows are no longer shared with later reads of this request
+    if context and "identity_map" in context:
+        context["identity_map"].pop((model, tuple(key)), None)
+    return deleted
@@ -0,0 +1,406 @@
+from collections.abc import Callable
+from typing import TYPE_CHECKING
+
+from sqlalchemy import (
+    Boolean,
+    Float,
+    Table,
+    column,
+    delete,
+    func,
+    literal,
+    literal_column,
+    select,
+    table,
+    tuple_,
+)
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.compiler import SQLCompiler
+from sqlalchemy.sql.elements import ColumnElement, _clone
+from sqlalchemy.sql.expression import TableClause
+
+from graphemy.setup import Setup
+
+if TYPE_CHECKING:
+    from graphemy.models import Graphemy
+
+# Text search configuration of PostgreSQL full-text functions
+SEARCH_CONFIG = "simple"
+
+
+def get_search_table(source: Table) -> TableClause:
+    """
+    Describe the SQLite FTS5 table indexing the searchable columns of a table.
+
+    It holds one column per searchable column plus the (unindexed) primary
+    key columns, used to match the indexed rows back to the table.
+
+    Args:
+        source (Table): The table of a model with searchable columns.
+
+    Returns:
+        TableClause: The `<table>_search` table, with its hidden `rank` column.
+    """
+    model = get_table_model(source)
+    names = dict.fromkeys(
+        [*model.__searchable__, *[key.name for key in source.primary_key]],
+    )
+    return table(
+        f"{source.name}_search",
+        *[column(name) for name in names],
+        column("rank"),
+    )
+
+
+def get_table_model(source: Table) -> "Graphemy":
+    """
+    Find the Graphemy model mapped to a table.
+
+    Args:
+        source (Table): A table of the Graphemy metadata.
+
+    Returns:
+        Graphemy: The model whose `__table__` is the table, or None.
+    """
+    return next(
+        (
+            model
+            for model in Setup.classes.values()
+            if getattr(model, "__table__", None) is source
+        ),
+        None,
+    )
+
+
+def get_tsvector(expression: ColumnElement) -> ColumnElement:
+    """
+    Build the PostgreSQL `tsvector` of a column, as indexed by its GIN index.
+
+    Args:
+        expression (ColumnElement): A searchable column.
+
+    Returns:
+        ColumnElement: The `to_tsvector` expression.
+    """
+    return func.to_tsvector(get_search_config(), expression)
+
+
+def get_search_config() -> ColumnElement:
+    """
+    Build the text search configuration argument of PostgreSQL functions.
+
+    It is rendered as a constant, not a parameter, so that queries match the
+    expression of the GIN indexes.
+
+    Returns:
+        ColumnElement: The `regconfig` constant.
+    """
+    return literal_column(f"'{SEARCH_CONFIG}'::regconfig")
+
+
+class Search(ColumnElement):
+    """
+    Full-text search of a searchable column, compiled for the engine dialect:
+
+    - SQLite: a lookup of the primary keys matching in the FTS5 table.
+    - PostgreSQL: `to_tsvector(column) @@ websearch_to_tsquery(query)`,
+      served by the GIN index of the column.
+    - Other dialects: a case-insensitive `LIKE '%query%'` scan.
+    """
+
+    type = Boolean()
+    _is_implicitly_boolean = True
+    # Not cached, since the values are only bound when compiled for a dialect
+    inherit_cache = False
+
+    def __init__(self, searched: ColumnElement, query: str) -> None:
+        """
+        Args:
+            searched (ColumnElement): The searchable column.
+            query (str): The search terms, in the syntax of the database.
+        """
+        searched = searched.__clause_element__()
+        # The primary keys of the row are kept to match the FTS5 table
+        self.columns = [
+            searched,
+            *[
+                searched.table.c[key.name]
+                for key in searched.table.primary_key
+            ],
+        ]
+        self.source = searched.table
+        self.query = query
+
+    def get_children(self, **_kw: dict) -> list[ColumnElement]:
+        """
+        Returns:
+            list[ColumnElement]: The nested expressions, for traversals.
+        """
+        return self.columns
+
+    def _copy_internals(self, clone: Callable = _clone, **kw: dict) -> None:
+        # Adapted copies (e.g. of aliased entities) replace the nested expressions
+        self.columns = [clone(element, **kw) for element in self.columns]
+
+    def condition(self, dialect: str) -> ColumnElement:
+        """
+        Build the search condition for a dialect.
+
+        Args:
+            dialect (str): The SQLAlchemy dialect name of the engine.
+
+        Returns:
+            ColumnElement: A SQLAlchemy boolean expression.
+        """
+        searched, *keys = self.columns
+        if dialect == "sqlite":
+            search = get_search_table(self.source)
+            return tuple_(*keys).in_(
+                select(*[search.c[key.name] for key in keys]).where(
+                    search.c[searched.name].match(self.query),
+                ),
+            )
+        if dialect == "postgresql":
+            return get_tsvector(searched).op("@@")(
+                func.websearch_to_tsquery(get_search_config(), self.query),
+            )
+        return searched.icontains(self.query, autoescape=True)
+
+    def rank(self, dialect: str) -> ColumnElement:
+        """
+        Build the relevance of the row for the search, higher being better.
+
+        Args:
+            dialect (str): The SQLAlchemy dialect name of the engine.
+
+        Returns:
+            ColumnElement: A numeric expression, 0 for unmatched rows.
+        """
+        searched, *keys = self.columns
+        if dialect == "sqlite":
+            # FTS5 ranks the best matches with the lowest (negative) scores
+            search = get_search_table(self.source)
+            rank = (
+                select(-search.c.rank)
+                .where(
+                    search.c[searched.name].match(self.query),
+                    *[search.c[key.name] == key for key in keys],
+                )
+                .scalar_subquery()
+            )
+        elif dialect == "postgresql":
+            rank = func.ts_rank(
+                get_tsvector(searched),
+                func.websearch_to_tsquery(get_search_config(), self.query),
+            )
+        else:
+            return literal(0)
+        return func.coalesce(rank, 0)
+
+
+class SearchRank(ColumnElement):
+    """The summed relevance of a row for the searches of a query."""
+
+    type = Float()
+    # Not cached, since the values are only bound when compiled for a dialect
+    inherit_cache = False
+
+    def __init__(self, searches: list[Search]) -> None:
+        """
+        Args:
+            searches (list[Search]): The searches of the query filter.
+        """
+        self.searches = searches
+
+    def get_children(self, **_kw: dict) -> list[ColumnElement]:
+        """
+        Returns:
+            list[ColumnElement]: The nested expressions, for traversals.
+        """
+        return self.searches
+
+    def _copy_internals(self, clone: Callable = _clone, **kw: dict) -> None:
+        # Adapted copies (e.g. of aliased entities) replace the nested expressions
+        self.searches = [clone(element, **kw) for element in self.searches]
+
+
+@compiles(Search)
+def compile_search(element: Search, compiler: SQLCompiler, **kw: dict) -> str:
+    """
+    Compile a Search condition for the dialect of the compiler.
+
+    Args:
+        element (Search): The condition to compile.
+        compiler (SQLCompiler): The statement compiler.
+        **kw (dict): Compilation options.
+
+    Returns:
+        str: The SQL of the condition.
+    """
+    return compiler.process(element.condition(compiler.dialect.name), **kw)
+
+
+@compiles(SearchRank)
+def compile_search_rank(
+    element: SearchRank,
+    compiler: SQLCompiler,
+    **kw: dict,
+) -> str:
+    """
+    Compile a SearchRank expression for the dialect of the compiler.
+
+    Args:
+        element (SearchRank): The expression to compile.
+        compiler (SQLCompiler): The statement compiler.
+        **kw (dict): Compilation options.
+
+    Returns:
+        str: The SQL of the expression.
+    """
+    dialect = compiler.dialect.name
+    ranks = [search.rank(dialect) for search in element.searches]
+    return compiler.process(sum(ranks[1:], ranks[0]), **kw)
+
+
+def get_search_terms(filters: dict | None) -> list[tuple[str, str]]:
+    """
+    Collect the `search` filters of a query, outside of OR and NOT groups.
+
+    Args:
+        filters (dict | None): The filtering criteria of the query.
+
+    Returns:
+        list[tuple[str, str]]: (field name, search terms) pairs.
+    """
+    terms = []
+    for group in filters if isinstance(filters, list) else [filters or {}]:
+        for name, value in group.items():
+            if name == "AND" and value:
+                terms.extend(get_search_terms(value))
+            elif isinstance(value, dict) and value.get("search"):
+                terms.append((name, value["search"]))
+    return terms
+
+
+def update_search_index(
+    session: Session,
+    model: "Graphemy",
+    item: "Graphemy",
+    *,
+    remove: bool = False,
+) -> None:
+    """
+    Keep the FTS5 table of a model in sync with a row being written or
+    deleted, in the session's transaction.
+
+    PostgreSQL expression indexes are maintained by the database, so only
+    SQLite engines run statements.
+
+    Args:
+        session (Session): The (synchronous) session writing the row.
+        model (Graphemy): The written model.
+        item (Graphemy): The written row.
+        remove (bool, optional): Whether the row is being deleted, instead of
+            inserted or updated. Defaults to False.
+    """
+    connection = session.connection()
+    if not model.__searchable__ or connection.dialect.name != "sqlite":
+        return
+    # New rows get their generated keys first
+    if not remove:
+        session.flush()
+    search = get_search_table(model.__table__)
+    keys = {
+        key.name: getattr(item, key.name)
+        for key in model.__table__.primary_key
+    }
+    connection.execute(
+        delete(search).where(
+            *[search.c[name] == value for name, value in keys.items()],
+        ),
+    )
+    if not remove:
+        names = [c.name for c in search.c if c.name != "rank"]
+        connection.execute(
+            search.insert().from_select(
+                names,
+                select(*[model.__table__.c[name] for name in names]).where(
+                    *[
+                        model.__table__.c[name] == value
+                        for name, value in keys.items()
+                    ],
+                ),
+            ),
+        )
+
+
+def rebuild_search_index(model: "Graphemy", connection: Connection) -> None:
+    """
+    Index again every row of a model, e.g. after rows were written without
+    Graphemy mutations. It does nothing outside SQLite.
+
+    Args:
+        model (Graphemy): A model with searchable columns.
+        connection (Connection): A connection to the model's database.
+    """
+    if not model.__searchable__ or connection.dialect.name != "sqlite":
+        return
+    search = get_search_table(model.__table__)
+    names = [c.name for c in search.c if c.name != "rank"]
+    connection.execute(delete(search))
+    connection.execute(
+        search.insert().from_select(
+            names,
+            select(*[model.__table__.c[name] for name in names]),
+        ),
+    )
+
+
+def create_search_indexes(
+    _metadata: object,
+    connection: Connection,
+    tables: list[Table] = (),
+    **_kw: dict,
+) -> None:
+    """
+    Create the full-text indexes of the searchable columns of the tables
+    created by `metadata.create_all`.
+
+    - SQLite: an FTS5 table, `<table>_search`, filled with the existing rows.
+    - PostgreSQL: a GIN index on the `tsvector` of each searchable column.
+
+    Args:
+        _metadata (object): The metadata creating the tables.
+        connection (Connection): The connection creating the tables.
+        tables (list[Table], optional): The created tables.
+        **_kw (dict): Other event arguments.
+    """
+    dialect = connection.dialect.name
+    for source in tables:
+        model = get_table_model(source)
+        if model is None or not model.__searchable__:
+            continue
+        if dialect == "sqlite":
+            search = get_search_table(source)
+            keys = {key.name for key in source.primary_key}
+            definition = ", ".join(
+                f'"{c.name}" UNINDEXED'
+                if c.name in keys and c.name not in model.__searchable__
+                else f'"{c.name}"'
+                for c in search.c
+                if c.name != "rank"
+            )
+            connection.exec_driver_sql(
+                f'CREATE VIRTUAL TABLE IF NOT EXISTS "{search.name}" '
+                f"USING fts5({definition})",
+            )
+            rebuild_search_index(model, connection)
+        elif dialect == "postgresql":
+            for name in model.__searchable__:
+                connection.exec_driver_sql(
+                    f'CREATE INDEX IF NOT EXISTS "ix_{source.name}_{name}_search" '
+                    f'ON "{source.name}" USING GIN '
+                    f"(to_tsvector('{SEARCH_CONFIG}', \"{name}\"))",
+                )
@@ -1,18 +1,256 @@
+from dataclasses import dataclass
+from decimal import Decimal
 from types import UnionType
-from typing import TYPE_CHECKING, get_args, get_origin
+from typing import TYPE_CHECKING, Any, get_args, get_origin
+from zlib import crc32
 
-from sqlalchemy import and_, not_, or_
+from sqlalchemy import and_, literal, not_, or_, select, true
+from sqlalchemy.inspection import inspect
+from sqlalchemy.orm import aliased
+from sqlalchemy.sql.util import ClauseAdapter
+
+from graphemy.setup import Setup
+
+from .compiler import ArrayIn
+from .search import Search
 
 if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from sqlalchemy.sql.elements import ColumnElement
     from strawberry.types.base import StrawberryType
 
     from graphemy.models import Graphemy
 
+# Dialects sorting NULLs as larger than any value
+nulls_last_dialects = {"postgresql", "oracle"}
+
+
+@dataclass(frozen=True)
+class FieldMetadata:
+    """
+    Precomputed information about a single annotated field of a Graphemy model.
+
+    Attributes:
+        name (str): The field name as declared on the model.
+        column (Any): The SQLAlchemy column (or expression) backing the field,
+            or None if the model is not mapped to a table.
+        type (type): The field's base type, with `None` stripped from unions.
+        type_name (str): The name of the base type (e.g. "int", "date").
+        nullable (bool): Whether the annotation allows None.
+        sortable (bool): Whether the field can be used in ORDER BY clauses.
+        filterable (bool): Whether the field can be used in WHERE clauses.
+    """
+
+    name: str
+    column: Any
+    type: type
+    type_name: str
+    nullable: bool
+    sortable: bool
+    filterable: bool
+
+
+def is_array_bound(values: list[tuple]) -> bool:
+    """
+    Check whether a list of values is bound as array parameters (see ArrayIn).
+
+    Lists longer than `Setup.array_in_threshold` are, as long as every value
+    can be serialized as JSON.
+
+    Args:
+        values (list[tuple]): One tuple of column values per matching row.
+
+    Returns:
+        bool: True if the values should be bound as arrays.
+    """
+    return (
+        Setup.array_in_threshold is not None
+        and len(values) > Setup.array_in_threshold
+        and all(
+            isinstance(v, (str, int, float)) for row in values for v in row
+        )
+    )
+
+
+def in_values(column: "ColumnElement", values: list) -> "ColumnElement":
+    """
+    Build the condition matching rows whose column is in a list of values,
+    bound as a single array parameter for long lists.
+
+    Args:
+        column (ColumnElement): The compared column.
+        values (list): The accepted values.
+
+    Returns:
+        ColumnElement: A SQLAlchemy boolean expression.
+    """
+    rows = [(value,) for value in values]
+    if is_array_bound(rows):
+        return ArrayIn([column], rows)
+    return column.in_(values)
+
+
+# Field operators used to translate filter inputs into SQLAlchemy expressions
+field_ops = {
+    "in_": in_values,
+    "like": lambda col, val: col.like(val),
+    "gt": lambda col, val: col > val,
+    "gte": lambda col, val: col >= val,
+    "lt": lambda col, val: col < val,
+    "lte": lambda col, val: col <= val,
+    "search": Search,
+}
+
+
+def get_fields_metadata(model: "Graphemy") -> dict[str, FieldMetadata]:
+    """
+    Return the precomputed field metadata of a model, building it on first use.
+
+    The metadata is stored on the model class itself (`__fields_metadata__`),
+    so union resolution and column lookups happen once per model instead of
+    on every filter, sort or resolver invocation.
+
+    Args:
+        model (Graphemy): The model whose annotated fields should be described.
+
+    Returns:
+        dict[str, FieldMetadata]: Field metadata keyed by field name, in
+            declaration order.
+    """
+    # Look only at the class's own namespace so subclasses never reuse
+    # metadata computed for a parent model
+    metadata = model.__dict__.get("__fields_metadata__")
+    if metadata is not None:
+        return metadata
+
+    # Computed fields are described like columns, once mapped
+    for name, computed in model.__computed__.items():
+        computed.map(model, name)
+    computed_types = {
+        name: computed.type for name, computed in model.__computed__.items()
+    }
+
+    metadata = {}
+    for field_name, field_type in {
+        **model.__annotations__,
+        **computed_types,
+    }.items():
+        nullable = False
+        base_type = field_type
+
+        # If the annotation is a union, strip None and keep the first other type
+        if get_origin(field_type) is UnionType:
+            args = get_args(field_type)
+            nullable = type(None) in args
+            base_type = next(t for t in args if t is not type(None))
+
+        column = getattr(model, field_name, None)
+        mapped = hasattr(column, "expression")
+        metadata[field_name] = FieldMetadata(
+            name=field_name,
+            column=column if mapped else None,
+            type=base_type,
+            type_name=getattr(base_type, "__name__", str(base_type)),
+            nullable=nullable,
+            sortable=mapped,
+            filterable=mapped,
+        )
+
+    model.__fields_metadata__ = metadata
+    return metadata
+
+
+def get_aggregate_fields(
+    model: "Graphemy",
+) -> tuple[list[FieldMetadata], list[FieldMetadata]]:
+    """
+    Return the fields of a model that can be aggregated.
+
+    Args:
+        model (Graphemy): The model whose fields should be aggregated.
+
+    Returns:
+        tuple[list[FieldMetadata], list[FieldMetadata]]: The numeric fields
+            (summed and averaged) and the column fields (compared with min
+            and max), in declaration order.
+    """
+    comparable = [f for f in get_fields_metadata(model).values() if f.sortable]
+    numeric = [f for f in comparable if f.type in {int, float, Decimal}]
+    return numeric, comparable
+
+
+def get_primary_keys(model: "Graphemy") -> tuple[str, ...]:
+    """
+    Return the primary key field names of a model, cached on the model class
+    (`__primary_keys__`).
+
+    Args:
+        model (Graphemy): The model whose primary key should be described.
+
+    Returns:
+        tuple[str, ...]: The primary key field names, in order.
+    """
+    primary_keys = model.__dict__.get("__primary_keys__")
+    if primary_keys is None:
+        primary_keys = tuple(key.name for key in inspect(model).primary_key)
+        model.__primary_keys__ = primary_keys
+    return primary_keys
+
+
+def get_identity(row: "Graphemy", identity_map: dict | None) -> "Graphemy":
+    """
+    Return the instance already hydrated in the current request for a row's
+    (model, primary key), registering the row if it is the first one.
+
+    Args:
+        row (Graphemy): A model instance just fetched from the database.
+        identity_map (dict | None): The identity map of the current request,
+            or None to keep the row as it is.
+
+    Returns:
+        Graphemy: The shared instance for the row's identity.
+    """
+    if identity_map is None or row is None:
+        return row
+    model = type(row)
+    identity = (
+        model,
+        tuple(getattr(row, key) for key in get_primary_keys(model)),
+    )
+    return identity_map.setdefault(identity, row)
+
+
+def get_loader_conditions(model: "Graphemy", context: dict | None) -> list:
+    """
+    Build the predicates added to every DataLoader statement of a model, so
+    filtered rows are never fetched.
+
+    Args:
+        model (Graphemy): The Graphemy model being loaded.
+        context (dict | None): The GraphQL context of the current request.
+
+    Returns:
+        list: SQLAlchemy predicates from the query filter and `dl_sql_filter`.
+    """
+    conditions = []
+    if Setup.query_filter_loads:
+        predicate = Setup.get_query_filter(model, context)
+        if predicate is not True:
+            conditions.append(predicate)
+    if Setup.dl_sql_filter:
+        predicate = Setup.dl_sql_filter(model, context)
+        if predicate is not None:
+            conditions.append(predicate)
+    return conditions
+
 
 def get_query_filter(
     filters_obj: "Graphemy",
     model: "Graphemy",
     query: list,
+    *,
+    context: dict | None = None,
 ) -> list:
     """
     Build a list of SQLAlchemy boolean expressions (filters) from a nested structure
@@ -20,6 +258,7 @@ def get_query_filter(
 
     This function handles both logical operators (AND, OR, NOT) and field operators
     (in_, like, gt, gte, lt, lte), supporting multiple nested filter groups.
+    Relationship names hold some/none/every filters (see get_relation_filter).
 
     Args:
         filters_obj (Graphemy | list[Graphemy]): A filter specification, which can
@@ -29,6 +268,9 @@ def get_query_filter(
         model (Graphemy): The SQLModel-based class whose columns are being filtered.
         query (list): A list of SQLAlchemy filter expressions to which new expressions
             will be appended.
+        context (dict | None, optional): The GraphQL context of the current
+            request, restricting the related rows of relationship filters.
+            Defaults to None.
 
     Returns:
         list: The updated list of SQLAlchemy filter expressions.
@@ -40,20 +282,16 @@ def get_query_filter(
 
     # Define mappings for logical operators
     logical_ops = {
-        "AND": lambda f: and_(*get_query_filter(f, model, [])),
-        "OR": lambda f: or_(*get_query_filter(f, model, [])),
-        "NOT": lambda f: not_(and_(*get_query_filter(f, model, []))),
+        "AND": lambda f: and_(
+            *get_query_filter(f, model, [], context=context),
+        ),
+        "OR": lambda f: or_(*get_query_filter(f, model, [], context=context)),
+        "NOT": lambda f: not_(
+            and_(*get_query_filter(f, model, [], context=context)),
+        ),
     }
 
-    # Define mappings for field-level operators
-    field_ops = {
-        "in_": lambda col, val: col.in_(val),
-        "like": lambda col, val: col.like(val),
-        "gt": lambda col, val: col > val,
-        "gte": lambda col, val: col >= val,
-        "lt": lambda col, val: col < val,
-        "lte": lambda col, val: col <= val,
-    }
+    fields = get_fields_metadata(model)
 
     for group in filters_list:
         for op_name, op_value in group.items():
@@ -64,11 +302,21 @@ def get_query_filter(
             # If it's a logical operator (AND, OR, NOT)
             if op_name in logical_ops:
                 query.append(logical_ops[op_name](op_value))
+            # If it's a relationship, filter on the existence of related rows
+            elif op_name not in fields:
+                query.extend(
+                    get_relation_filter(
+                        model,
+                        getattr(model, op_name),
+                        op_value,
+                        context=context,
+                    ),
+                )
             else:
                 # It's a field filter with sub-operations
+                column = fields[op_name].column
                 for field_op, field_val in op_value.items():
                     if field_val is not None:
-                        column = getattr(model, op_name)
                         query_op = field_ops.get(field_op)
                         if query_op:
                             query.append(query_op(column, field_val))
@@ -76,6 +324,101 @@ def get_query_filter(
     return query
 
 
+def get_relation_filter(
+    model: "Graphemy",
+    field: "Callable",
+    relation_filter: dict,
+    *,
+    context: dict | None = None,
+) -> list:
+    """
+    Build correlated EXISTS conditions filtering rows by their related rows.
+
+    - `some`: at least one related row matches the sub-filter.
+    - `none`: no related row matches the sub-filter.
+    - `every`: all related rows match the sub-filter (true without rows).
+
+    Only the related rows the request's loaders would return are considered
+    (see get_loader_conditions), and relationships the request may not read
+    can't be filtered on.
+
+    Args:
+        model (Graphemy): The model whose rows are filtered.
+        field (Callable): The Dl resolver of the relationship.
+        relation_filter (dict): The some/none/every sub-filters.
+        context (dict | None, optional): The GraphQL context of the current
+            request. Defaults to None.
+
+    Returns:
+        list: SQLAlchemy boolean expressions.
+
+    Raises:
+        PermissionError: If the request may not read the related model.
+    """
+    loader = context.get(field.dl_name) if context else None
+    if loader is not None and loader.denied:
+        error_text = f"Filtering on {field.__name__} is not allowed."
+        raise PermissionError(error_text)
+
+    # The related rows are aliased so self-referencing relationships still
+    # correlate to the outer row, adapting the sub-filters to the alias
+    target_model = Setup.classes[field.dl]
+    target = aliased(target_model)
+    adapter = ClauseAdapter(inspect(target).selectable)
+    sources = (
+        field.source if isinstance(field.source, list) else [field.source]
+    )
+    targets = (
+        field.target if isinstance(field.target, list) else [field.target]
+    )
+    correlation = [
+        getattr(target, t)
+        == (
+            literal(s)
+            if isinstance(s, int)
+            else literal(s[1:])
+            if s.startswith("_")
+            else getattr(model, s)
+        )
+        for s, t in zip(sources, targets, strict=True)
+    ]
+
+    # The related rows hidden from the request's loaders are never matched
+    visible = [
+        adapter.traverse(condition)
+        for condition in (
+            get_loader_conditions(target_model, context) if context else []
+        )
+    ]
+
+    def related(sub_filter: dict, *, every: bool = False) -> object:
+        conditions = get_query_filter(
+            sub_filter,
+            target_model,
+            [true()],
+            context=context,
+        )
+        condition = adapter.traverse(and_(*conditions))
+        return (
+            select(target)
+            .where(
+                *correlation,
+                *visible,
+                not_(condition) if every else condition,
+            )
+            .exists()
+        )
+
+    conditions = []
+    if relation_filter.get("some") is not None:
+        conditions.append(related(relation_filter["some"]))
+    if relation_filter.get("none") is not None:
+        conditions.append(~related(relation_filter["none"]))
+    if relation_filter.get("every") is not None:
+        conditions.append(~related(relation_filter["every"], every=True))
+    return conditions
+
+
 def get_sort_criteria(
     sort: list["StrawberryType"],
     model: "Graphemy",
@@ -95,26 +438,16 @@ def get_sort_criteria(
         list[tuple[str, str, str]]: A list of sorting directives:
             (field_name, field_type_name, "asc"/"desc").
     """
+    fields = get_fields_metadata(model)
     criteria = []
     for s in sort:
-        # Iterate over all annotated fields in the model
-        for field in model.__annotations__:
-            # If the sort object doesn't specify this field, skip
-            if getattr(s, field, None) is None:
+        # Only look at the fields actually set on the sort object
+        for field, order in vars(s).items():
+            if order is None or field not in fields:
                 continue
 
-            attr_type = model.__annotations__[field]
-
-            # If the field's annotation is a UnionType, strip out None or other union components
-            if get_origin(attr_type) is UnionType:
-                attr_type = next(
-                    t for t in get_args(attr_type) if t is not type(None)
-                )
-
             # The 'value' attribute typically holds "asc" or "desc"
-            criteria.append(
-                (field, attr_type.__name__, getattr(s, field).value),
-            )
+            criteria.append((field, fields[field].type_name, order.value))
     return criteria
 
 
@@ -122,44 +455,122 @@ def multiple_sort(
     model: "Graphemy",
     items: list["Graphemy"],
     sort: list["StrawberryType"],
+    *,
+    nulls_last: bool = False,
 ) -> list["Graphemy"]:
     """
     Sort a list of Graphemy model instances in Python using multiple criteria.
 
-    This is a pure Python fallback or alternative to SQL-level ordering. It can handle
-    mixed field types (strings, numbers, dates/datetimes), applying ascending or descending
-    orders as specified. Descending order for numeric and date-like fields is performed
-    by negating the value or converting it to an inverse string.
+    This is a pure Python fallback or alternative to SQL-level ordering. Values
+    are compared as they are (full datetimes included), one stable sort per
+    criterion from the last to the first, and NULLs are placed like the
+    database would (see nulls_last_dialects).
 
     Args:
         model (Graphemy): The model class for the items being sorted.
         items (list[Graphemy]): A list of model instances to be sorted.
         sort (list[StrawberryType]): A list of objects indicating how sorting
             should be performed, e.g. [UserSort(field="name", order="desc")].
+        nulls_last (bool, optional): Whether NULLs sort as larger than any
+            value, as in PostgreSQL, instead of smaller, as in SQLite and MySQL.
+            Defaults to False.
 
     Returns:
         list[Graphemy]: A new list of items sorted according to the specified criteria.
     """
-    criteria = get_sort_criteria(sort, model)
+    result = list(items)
+    for field, _, order in reversed(get_sort_criteria(sort, model)):
 
-    def sort_key(item: "Graphemy") -> tuple:
-        key = []
-        for field, field_type, order in criteria:
+        def sort_key(item: "Graphemy", field: str = field) -> tuple:
             value = getattr(item, field)
+            # NULLs compare on their own flag, never against values
+            return ((value is None) == nulls_last, value)
 
-            # Convert date/datetime values to ordinal for numeric comparison
-            if field_type in ["date", "datetime"]:
-                value = value.toordinal()
+        result.sort(key=sort_key, reverse=order == "desc")
+    return result
 
-            # Invert the value if descending
-            if order == "desc":
-                value = (
-                    -value
-                    if field_type in ["int", "float", "date", "datetime"]
-                    else "".join(chr(255 - ord(c)) for c in value)
-                )
-            key.append(value)
-        return tuple(key)
 
-    # Sort the items using the constructed sort_key
-    return sorted(items, key=sort_key)
+def get_shard_names(
+    model: "Graphemy",
+    values: list | None = None,
+) -> list[str]:
+    """
+    List the engine names that must be queried for a model.
+
+    Non-sharded models always use their `__enginename__`. Sharded models use
+    the shards owning the given shard key values, or every shard when the
+    values are unknown.
+
+    Args:
+        model (Graphemy): The model being queried.
+        values (list | None, optional): Known shard key values of the rows
+            being looked up. Defaults to None (any value).
+
+    Returns:
+        list[str]: Engine names, without duplicates.
+    """
+    if not model.__shard_key__:
+        return [model.__enginename__]
+    if values is None:
+        return list(model.__shards__)
+    return list(dict.fromkeys(model.get_shard(v) for v in values))
+
+
+def get_shard_index(
+    model: "Graphemy",
+    key_id: str | list[str],
+) -> int | None:
+    """
+    Find the position of a model's shard key within DataLoader key columns.
+
+    Args:
+        model (Graphemy): The model being loaded.
+        key_id (str | list[str]): The key field name(s) used by the loader.
+
+    Returns:
+        int | None: The index of the shard key in key_id (0 for a single key),
+            or None if the model isn't sharded or the shard key isn't a key.
+    """
+    if not model.__shard_key__:
+        return None
+    if isinstance(key_id, list):
+        return (
+            key_id.index(model.__shard_key__)
+            if model.__shard_key__ in key_id
+            else None
+        )
+    return 0 if key_id == model.__shard_key__ else None
+
+
+def get_shard_values(model: "Graphemy", filters: dict | None) -> list | None:
+    """
+    Extract the shard key values a root filter restricts the query to.
+
+    Only a top-level `in` filter on the shard key narrows the shards; any
+    other filter may match rows on every shard.
+
+    Args:
+        model (Graphemy): The model being queried.
+        filters (dict | None): The filter input converted to a dictionary.
+
+    Returns:
+        list | None: The shard key values, or None if any value may match.
+    """
+    if not model.__shard_key__ or not filters:
+        return None
+    shard_filter = filters.get(model.__shard_key__) or {}
+    return shard_filter.get("in_")
+
+
+def hash_shard(value: object, shards: list[str]) -> str:
+    """
+    Pick a shard for a value using a hash that is stable across processes.
+
+    Args:
+        value (object): The shard key value.
+        shards (list[str]): The available shard engine names.
+
+    Returns:
+        str: The engine name owning the value.
+    """
+    return shards[crc32(str(value).encode()) % len(shards)]
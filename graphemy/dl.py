@@ -1,11 +1,17 @@
-from collections.abc import Callable
+import asyncio
+import re
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
 from dataclasses import asdict
+from itertools import chain
 from typing import TYPE_CHECKING, Annotated, TypeVar
 
-from strawberry.dataloader import DataLoader
+from strawberry.dataloader import AbstractCache, DataLoader
 from strawberry.types.base import StrawberryType
 
 if TYPE_CHECKING:
+    from sqlalchemy.sql import Select
+
     from .models import Graphemy
 
 import json
@@ -23,6 +29,31 @@ class Dl:
         source (str | list[str]): The name or list of names of the source fields.
         target (str | list[str]): The name or list of names of the target fields.
         foreign_key (bool | None): Indicates if this mapping involves a foreign key.
+        prefetch (bool | None): Whether root queries eagerly load this relationship
+            in one batch and join it in memory. If None, will fallback to the
+            router's `prefetch_joins` flag for cross-engine relationships.
+        max_batch_size (int | None): The maximum number of keys loaded by one batch.
+            If None, will fallback to the router's `dl_max_batch_size`.
+        cache (bool | None): Whether loaded values are cached for the rest of the
+            request. If None, will fallback to the router's `dl_cache` flag.
+        cache_size (int | None): The maximum number of cached keys, the least
+            recently used being evicted first. If None, will fallback to the
+            router's `dl_cache_size`.
+        recursive (bool): Whether the relationship is followed again from each
+            loaded row, loading the whole subtree (e.g. descendants or
+            ancestors) with one `WITH RECURSIVE` statement per batch.
+        max_depth (int | None): The maximum number of levels loaded by a
+            recursive relationship. If None, every level is loaded.
+        through (type[Graphemy] | str | None): The association model (or its
+            name) of a many-to-many relationship. The target rows are loaded
+            with one JOIN through it, without loading the association rows.
+        through_source (str | None): The field of the association model
+            matching the source.
+        through_target (str | None): The field of the association model
+            matching the target.
+        statement (Callable[[list], Select] | None): A function receiving the
+            batched source values and returning the statement loading the
+            related rows, grouped by the target column(s) it selects.
         to_strawberry_kwargs (dict): Additional keyword arguments for Strawberry
             field configuration, such as `description`, `deprecation_reason`, etc.
     """
@@ -30,6 +61,16 @@ class Dl:
     source: str | list[str]
     target: str | list[str]
     foreign_key: bool | None = None
+    prefetch: bool | None = None
+    max_batch_size: int | None = None
+    cache: bool | None = None
+    cache_size: int | None = None
+    recursive: bool = False
+    max_depth: int | None = None
+    through: "type[Graphemy] | str | None" = None
+    through_source: str | None = None
+    through_target: str | None = None
+    statement: "Callable[[list], Select] | None" = None
     to_strawberry_kwargs: dict
 
     def __init__(
@@ -37,6 +78,17 @@ class Dl:
         source: str | list[str],
         target: str | list[str],
         foreign_key: bool | None = None,
+        *,
+        prefetch: bool | None = None,
+        max_batch_size: int | None = None,
+        cache: bool | None = None,
+        cache_size: int | None = None,
+        recursive: bool = False,
+        max_depth: int | None = None,
+        through: "type[Graphemy] | str | None" = None,
+        through_source: str | None = None,
+        through_target: str | None = None,
+        statement: "Callable[[list], Select] | None" = None,
         **kwargs: dict,
     ) -> None:
         """
@@ -48,11 +100,35 @@ class Dl:
             target (str | list[str]): The target field(s) name(s).
             foreign_key (bool | None, optional): Specifies if the mapping
                 is a foreign key relationship. Defaults to None.
+            prefetch (bool | None, optional): Whether root queries prefetch this
+                relationship and join it in memory. Defaults to None.
+            max_batch_size (int | None, optional): The maximum number of keys
+                loaded by one batch. Defaults to None.
+            cache (bool | None, optional): Whether loaded values are cached for
+                the rest of the request. Defaults to None.
+            cache_size (int | None, optional): The maximum number of cached keys.
+                Defaults to None.
+            recursive (bool, optional): Whether the relationship is followed
+                recursively, loading every reachable row. Defaults to False.
+            max_depth (int | None, optional): The maximum number of levels of a
+                recursive relationship. Defaults to None (unbounded).
+            through (type[Graphemy] | str | None, optional): The association
+                model of a many-to-many relationship. Defaults to None.
+            through_source (str | None, optional): The association field
+                matching the source. Defaults to None.
+            through_target (str | None, optional): The association field
+                matching the target. Defaults to None.
+            statement (Callable[[list], Select] | None, optional): A function
+                building the statement of a batch of source values, selecting
+                the target column(s). Defaults to None.
             **kwargs (dict): Additional keyword arguments for Strawberry field
 
         Raises:
             ValueError: If source and target types differ (one is a list while the other
-                is a string) or if both are lists of unequal length.
+                is a string), if both are lists of unequal length, if a recursive
+                relationship links several columns, or if an association model
+                is given without its fields, with several columns or with
+                `recursive`, or if a statement is combined with either.
         """
         if type(source) is not type(target):
             error_text = (
@@ -79,11 +155,105 @@ class Dl:
             target.sort()
             source = [ids[key] for key in target]
 
+        if recursive and isinstance(source, list):
+            error_text = "Recursive relationships must link a single column."
+            raise ValueError(error_text)
+
+        if through is not None and (
+            not through_source
+            or not through_target
+            or isinstance(source, list)
+            or recursive
+        ):
+            error_text = (
+                "Relationships through an association model need "
+                "through_source and through_target, link a single column "
+                "and can't be recursive."
+            )
+            raise ValueError(error_text)
+
+        if statement is not None and (recursive or through is not None):
+            error_text = (
+                "Relationships loaded by a statement can't be recursive or "
+                "through an association model."
+            )
+            raise ValueError(error_text)
+
         self.source = source
         self.target = target
         self.foreign_key = foreign_key
+        self.prefetch = prefetch
+        self.max_batch_size = max_batch_size
+        self.cache = cache
+        self.cache_size = cache_size
+        self.recursive = recursive
+        self.max_depth = max_depth
+        self.through = (
+            through
+            if through is None or isinstance(through, str)
+            else through.__name__
+        )
+        self.through_source = through_source
+        self.through_target = through_target
+        self.statement = statement
         self.to_strawberry_kwargs = kwargs
 
+    @property
+    def direct(self) -> bool:
+        """
+        Whether the related rows are looked up by their target columns, the
+        relationship being neither recursive, through an association model
+        nor loaded by a custom statement.
+
+        Returns:
+            bool: True for plain relationships.
+        """
+        return not (
+            self.recursive
+            or self.through is not None
+            or self.statement is not None
+        )
+
+    def get_loader_suffix(self, field_name: str) -> str:
+        """
+        Build the end of the DataLoader name of a relationship that is not
+        direct, telling it apart from the direct relationships to the same
+        target.
+
+        Statements are named after their qualified name and the field, so the
+        name is stable across processes and two lambdas of a model don't share
+        a loader.
+
+        Args:
+            field_name (str): The name of the relationship field.
+
+        Returns:
+            str: The suffix, empty for direct relationships.
+        """
+        if self.recursive:
+            return f"_recursive_{self.max_depth}"
+        if self.through is not None:
+            return f"_through_{self.through}_{self.through_source}"
+        if self.statement is not None:
+            statement_name = re.sub(r"\W+", "_", self.statement.__qualname__)
+            return f"_statement_{statement_name.strip('_')}_{field_name}"
+        return ""
+
+    @property
+    def loader_options(self) -> dict:
+        """
+        The DataLoader options set on this relationship, without the unset ones.
+
+        Returns:
+            dict: Keyword arguments for GraphemyDataLoader.
+        """
+        options = {
+            "max_batch_size": self.max_batch_size,
+            "cache": self.cache,
+            "cache_size": self.cache_size,
+        }
+        return {k: v for k, v in options.items() if v is not None}
+
 
 ReturnType: TypeVar = (
     list["Graphemy"] | Annotated["Graphemy", ".models"] | None
@@ -111,6 +281,9 @@ class GraphemyDataLoader(DataLoader):
         filter_method: Callable[[ReturnType, dict | None], ReturnType]
         | None = None,
         context: dict | None = None,
+        *,
+        denied: bool = False,
+        cache_size: int | None = None,
         **kwargs: dict,
     ) -> None:
         """
@@ -123,10 +296,25 @@ class GraphemyDataLoader(DataLoader):
                 Defaults to None.
             context (dict | None, optional): A dictionary representing the current
                 GraphQL context (e.g., request info, user details, etc.). Defaults to None.
+            denied (bool, optional): Whether the request lacks permission to read
+                the loaded model, in which case the load function returns empty
+                results and the cache must not be primed with real rows.
+                Defaults to False.
+            cache_size (int | None, optional): The maximum number of cached keys.
+                When set, the least recently used keys are evicted from a bounded
+                cache instead of being kept until the request ends.
+                Defaults to None (unbounded).
             **kwargs: Additional keyword arguments passed to Strawberry's DataLoader.
         """
         self.filter_method = filter_method
         self.context = context
+        self.denied = denied
+        # Keys whose values were primed instead of loaded by this loader, and
+        # the number of loads they answered without a new batch
+        self.primed_keys = set()
+        self.saved_loads = 0
+        if cache_size:
+            kwargs["cache_map"] = LRUCache(cache_size)
         super().__init__(**kwargs)
 
     async def load(
@@ -154,6 +342,40 @@ class GraphemyDataLoader(DataLoader):
             ReturnType: The loaded data, optionally filtered by filter_method and
                 typically in the form of Graphemy instances or None.
         """
+        key = self.get_key(keys, where, order_by, offset, limit)
+        if key in self.primed_keys and self.cache_map.get(key) is not None:
+            self.saved_loads += 1
+
+        # Use the parent load method, passing extra parameters serialized by class_to_string
+        data = await super().load(key)
+
+        # If a filter method is defined, apply it to the resulting data
+        if self.filter_method:
+            data = self.filter_method(data, self.context)
+        return data
+
+    @staticmethod
+    def get_key(
+        keys: list | str | int,
+        where: StrawberryType | None = None,
+        order_by: StrawberryType | None = None,
+        offset: int | None = None,
+        limit: int | None = None,
+    ) -> tuple:
+        """
+        Build the cache/batch key used for a load, normalizing the key values
+        and serializing the extra parameters.
+
+        Args:
+            keys (list | str | int): The source value(s) of the relationship.
+            where (StrawberryType | None, optional): A 'where' clause object.
+            order_by (StrawberryType | None, optional): An 'order_by' clause object.
+            offset (int | None, optional): The pagination offset.
+            limit (int | None, optional): The pagination limit.
+
+        Returns:
+            tuple: The key passed to the load function.
+        """
         # Normalize keys for the load function
         if isinstance(keys, list):
             normalized_keys = tuple(keys)
@@ -162,21 +384,135 @@ class GraphemyDataLoader(DataLoader):
         else:
             normalized_keys = keys
 
-        # Use the parent load method, passing extra parameters serialized by class_to_string
-        data = await super().load(
-            (
-                normalized_keys,
-                class_to_string(where),
-                class_to_string(order_by),
-                offset,
-                limit,
-            ),
+        return (
+            normalized_keys,
+            class_to_string(where),
+            class_to_string(order_by),
+            offset,
+            limit,
         )
 
-        # If a filter method is defined, apply it to the resulting data
-        if self.filter_method:
-            data = self.filter_method(data, self.context)
-        return data
+    def prime_many(self, data: dict, *, force: bool = False) -> None:
+        """
+        Prime the cache with the given values, keeping track of the primed keys
+        so that the loads they answer are counted in `saved_loads`.
+
+        Args:
+            data (dict): Values keyed by load key.
+            force (bool, optional): Whether to replace keys already cached.
+                Defaults to False.
+        """
+        if self.cache:
+            self.primed_keys.update(
+                key for key in data if force or not self.cache_map.get(key)
+            )
+        super().prime_many(data, force=force)
+
+    async def prefetch(self, keys: list, **kwargs: dict) -> list:
+        """
+        Load many unfiltered keys with a single call to the load function and
+        prime the cache with the results, so later `load` calls for those keys
+        resolve immediately without a new batch.
+
+        Keys already in the cache are skipped, and the others are split into
+        calls of at most `max_batch_size` keys, like `load` batches, unless a
+        `root` statement selects them in the database.
+
+        Args:
+            keys (list): The source value(s) of each relationship to load.
+            **kwargs: Additional keyword arguments passed to the load function
+                (e.g. the `root` statement of the parent rows).
+
+        Returns:
+            list: The values loaded for the keys that were not cached yet.
+        """
+        if not self.cache:
+            return []
+
+        cache_keys = [
+            key
+            for key in dict.fromkeys(self.get_key(k) for k in keys)
+            if not self.cache_map.get(key)
+        ]
+        if not cache_keys:
+            return []
+
+        size = (
+            len(cache_keys)
+            if kwargs.get("root") is not None
+            else self.max_batch_size or len(cache_keys)
+        )
+        results = await asyncio.gather(
+            *[
+                self.load_fn(cache_keys[start : start + size], **kwargs)
+                for start in range(0, len(cache_keys), size)
+            ],
+        )
+        values = list(chain.from_iterable(results))
+        self.prime_many(dict(zip(cache_keys, values, strict=True)))
+        return values
+
+
+class LRUCache(AbstractCache):
+    """
+    A DataLoader cache holding at most `maxsize` keys, evicting the least
+    recently used one when full.
+
+    Attributes:
+        maxsize (int): The maximum number of cached keys.
+        cache_map (OrderedDict): Cached futures, least recently used first.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        """
+        Initialize an empty LRUCache.
+
+        Args:
+            maxsize (int): The maximum number of cached keys.
+        """
+        self.maxsize = maxsize
+        self.cache_map = OrderedDict()
+
+    def get(self, key: Hashable) -> object | None:
+        """Return the cached future of a key, marking it as recently used."""
+        value = self.cache_map.get(key)
+        if value is not None:
+            self.cache_map.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: object) -> None:
+        """Cache the future of a key, evicting the least recently used key if full."""
+        self.cache_map[key] = value
+        self.cache_map.move_to_end(key)
+        if len(self.cache_map) > self.maxsize:
+            self.cache_map.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        """Remove a key from the cache."""
+        self.cache_map.pop(key, None)
+
+    def clear(self) -> None:
+        """Remove every key from the cache."""
+        self.cache_map.clear()
+
+
+def get_saved_loads(context: dict) -> dict[str, int]:
+    """
+    Report how many loads of the current request were answered by primed
+    cache entries instead of database queries, per DataLoader.
+
+    Args:
+        context (dict): The GraphQL context holding the request's loaders.
+
+    Returns:
+        dict[str, int]: Saved loads keyed by DataLoader name, for the loaders
+            that saved any.
+    """
+    return {
+        name: loader.saved_loads
+        for name, loader in context.items()
+        if isinstance(loader, GraphemyDataLoader) and loader.saved_loads
+    }
 
 
 def class_to_string(cls: StrawberryType | None) -> str | None:
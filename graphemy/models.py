@@ -1,8 +1,13 @@
 import re
+from typing import ClassVar
 
+from sqlalchemy import event
 from sqlmodel import SQLModel
 from strawberry.types.base import StrawberryType
 
+from .computed import Computed
+from .database.search import create_search_indexes
+from .database.utils import hash_shard
 from .dl import Dl
 from .schemas.generators import get_dl_function
 from .setup import Setup
@@ -31,6 +36,15 @@ class Graphemy(SQLModel):
             (e.g., "users" for a "User" model). Defaults to the table name + "s".
         __enginename__ (str): The name of the configured engine from Setup's
             engine dict to use for database operations. Defaults to "default".
+        __shard_key__ (str | None): The column used to split the table's rows
+            across several databases. Defaults to None (not sharded).
+        __shards__ (list[str]): The engine names holding the shards of a
+            sharded model. Rows are assigned by `get_shard`.
+        __searchable__ (list[str]): String columns indexed for full-text
+            `search` filters (an FTS5 table on SQLite, GIN indexes on
+            PostgreSQL, created with the tables).
+        __computed__ (dict[str, Computed]): The fields declared as Computed,
+            by name.
     """
 
     __strawberry_schema__: StrawberryType = None
@@ -39,6 +53,10 @@ class Graphemy(SQLModel):
     __enable_query__: bool | None = None
     __queryname__: str = ""
     __enginename__: str = "default"
+    __shard_key__: str | None = None
+    __shards__: ClassVar[list[str]] = []
+    __searchable__: ClassVar[list[str]] = []
+    __computed__: ClassVar[dict[str, Computed]] = {}
 
     class Strawberry:
         """
@@ -54,8 +72,9 @@ class Graphemy(SQLModel):
         - Registers the class in `Setup.classes`.
         - Converts any attributes defined as a Dl instance into a GraphQL-compatible
           field using `get_dl_function`.
-        - Removes these Dl attributes from the class annotations to prevent
-          SQLModel from interpreting them as standard columns.
+        - Collects the attributes defined as a Computed instance in `__computed__`.
+        - Removes these Dl and Computed attributes from the class annotations to
+          prevent SQLModel from interpreting them as standard columns.
         """
 
         # Auto-generate a table name by inserting underscores before capital letters
@@ -77,6 +96,7 @@ class Graphemy(SQLModel):
         # Prepare a list for attributes that are Dl instances,
         # so we can convert them into GraphQL DataLoader functions.
         to_remove = []
+        cls.__computed__ = {}
 
         # Loop through annotated attributes
         for attr_name, attr_type in cls.__annotations__.items():
@@ -92,11 +112,34 @@ class Graphemy(SQLModel):
                     )
                     # Replace the Dl instance with the generated GraphQL field
                     setattr(cls, attr_name, dl_field)
+                # Computed fields are mapped once the table is (see Computed.map)
+                elif isinstance(attr_value, Computed):
+                    to_remove.append(attr_name)
+                    attr_value.type = attr_type
+                    cls.__computed__[attr_name] = attr_value
+                    delattr(cls, attr_name)
 
-        # Remove the Dl attributes from the annotations to avoid issues with SQLModel
+        # Remove the Dl and Computed attributes from the annotations to avoid issues with SQLModel
         for attr in to_remove:
             del cls.__annotations__[attr]
 
+    @classmethod
+    def get_shard(cls, value: object) -> str:
+        """
+        Resolve the engine name of the shard owning a shard key value.
+
+        Override this method in subclasses to implement another strategy
+        (e.g. a lookup table of tenants). By default a stable hash of the
+        value picks one of `__shards__`.
+
+        Args:
+            value (object): The value of the `__shard_key__` column.
+
+        Returns:
+            str: The engine name of the shard.
+        """
+        return hash_shard(value, cls.__shards__)
+
     async def permission_getter(self: dict, request_type: str) -> bool:
         """
         Placeholder async method for checking permissions at the model level.
@@ -111,3 +154,7 @@ class Graphemy(SQLModel):
         Returns:
             bool: True if the request is allowed, False otherwise.
         """
+
+
+# Full-text indexes are created along with the tables of searchable models
+event.listen(Graphemy.metadata, "after_create", create_search_indexes)
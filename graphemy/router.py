@@ -1,5 +1,6 @@
 import sys
 from collections.abc import Callable
+from functools import partial
 
 import strawberry
 import strawberry.tools
@@ -13,8 +14,11 @@ from strawberry.fastapi import GraphQLRouter
 from strawberry.http import GraphQLHTTPResponse
 from strawberry.types import ExecutionResult
 
+from .database.advisor import IndexAdvisor
 from .dl import GraphemyDataLoader
 from .schemas.generators import (
+    get_aggregate_query,
+    get_aggregate_type,
     get_delete_mutation,
     get_put_mutation,
     get_query,
@@ -106,13 +110,56 @@ class GraphemyRouter(GraphQLRouter):
         context_getter (Callable, optional): A function to get additional context for each request.
         permission_getter (Callable, optional): A function to determine permissions for operations.
         dl_filter (Callable, optional): A function to apply filters to data loaders.
+        dl_batch_filter (Callable, optional): A function receiving (model, rows, context)
+            once per data loader batch and returning the rows to keep.
+        dl_sql_filter (Callable, optional): A function receiving (model, context) and
+            returning a SQLAlchemy predicate added to the WHERE clause of every data
+            loader statement, so filtered rows are never fetched.
         query_filter (Callable, optional): A function to apply filters to queries.
+        query_filter_loads (bool): Flag to also apply `query_filter` to the statements of the
+            data loaders, so relationships follow the same row-level rules as root queries.
+            Defaults to True.
+        array_in_threshold (int | None): Length above which `in` filter lists and data
+            loader keys are bound as a single array parameter (`= ANY(:keys)` on
+            PostgreSQL, `json_each(:keys)` on SQLite). None disables it. Defaults to 1000.
         engine (Engine | Dict[str, Engine], optional): Database engine(s) used for SQL operations.
+        replicas (list[Engine] | Dict[str, list[Engine]], optional): Read replicas for the
+            named engine(s). Queries are routed to replicas, mutations to the primary.
+        replica_strategy (str): How a replica is chosen, "round_robin" or
+            "least_connections". Defaults to "round_robin".
         extensions (list, optional): List of Strawberry extensions to be applied to the schema.
         enable_queries (bool): Flag to enable query generation. Defaults to True.
         enable_put_mutations (bool): Flag to enable PUT mutations. Defaults to False.
         enable_delete_mutations (bool): Flag to enable DELETE mutations. Defaults to False.
         auto_foreign_keys (bool): Flag to automatically handle foreign keys. Defaults to False.
+        auto_indexes (bool): Flag to add an index on the target columns of each `Dl` (one
+            composite index for list targets) unless one already covers them. Defaults to False.
+        index_advisor (bool): Flag to record the columns filtered and sorted on by each
+            statement, with its latency, reported by `Setup.index_advisor.report()` for
+            columns without an index. Defaults to False.
+        sticky_reads (bool): Flag to read from the primary for the rest of a request
+            after a mutation wrote to it. Defaults to True.
+        prefetch_joins (bool): Flag to let root queries load selected cross-engine
+            relationships in one concurrent batch per engine and join them in memory.
+            Defaults to False.
+        join_to_one (bool): Flag to fold to-one relationships selected by root queries into
+            the root statement as LEFT JOINs instead of separate loads. Defaults to False.
+        single_statement (bool): Experimental flag to compile each root query and its selected
+            relationships into one SQL statement built with JSON functions (SQLite and
+            PostgreSQL). Defaults to False.
+        subquery_loads (bool): Flag to load the relationships of root query rows with
+            `target IN (SELECT source FROM <root query>)` instead of sending every parent
+            key back to the database. Defaults to False.
+        identity_map (bool): Flag to share one instance per (model, primary key) between the
+            rows loaded by every path of a request. Defaults to False.
+        dl_max_batch_size (int | None): Default maximum number of keys loaded by one
+            DataLoader batch, overridden by `Dl(max_batch_size=...)`. Defaults to None
+            (unlimited).
+        dl_cache (bool): Default flag to cache DataLoader results for the rest of the
+            request, overridden by `Dl(cache=...)`. Defaults to True.
+        dl_cache_size (int | None): Default maximum number of keys cached by each
+            DataLoader (least recently used first out), overridden by
+            `Dl(cache_size=...)`. Defaults to None (unbounded).
         **kwargs: Additional keyword arguments passed to the base GraphQLRouter.
     """
 
@@ -127,10 +174,27 @@ class GraphemyRouter(GraphQLRouter):
         engine: Engine | dict[str, Engine] = None,
         extensions: list | None = None,
         *,
+        replicas: list[Engine] | dict[str, list[Engine]] | None = None,
+        replica_strategy: str = "round_robin",
         enable_queries: bool = True,
         enable_put_mutations: bool = False,
         enable_delete_mutations: bool = False,
         auto_foreign_keys: bool = False,
+        auto_indexes: bool = False,
+        index_advisor: bool = False,
+        sticky_reads: bool = True,
+        prefetch_joins: bool = False,
+        join_to_one: bool = False,
+        single_statement: bool = False,
+        subquery_loads: bool = False,
+        identity_map: bool = False,
+        dl_max_batch_size: int | None = None,
+        dl_cache: bool = True,
+        dl_cache_size: int | None = None,
+        dl_batch_filter: Callable | None = None,
+        dl_sql_filter: Callable | None = None,
+        query_filter_loads: bool = True,
+        array_in_threshold: int | None = 1000,
         **kwargs: dict,
     ) -> None:
         # If no extensions are specified, initialize with an empty list
@@ -148,11 +212,30 @@ class GraphemyRouter(GraphQLRouter):
         # Dictionary to hold references to "dataloader" creation functions
         functions: dict[str, tuple] = {}
 
+        # DataLoader options used when a Dl doesn't set its own
+        loader_defaults = {
+            "max_batch_size": dl_max_batch_size,
+            "cache": dl_cache,
+            "cache_size": dl_cache_size,
+        }
+
         # Configure the Setup class with engine, permission_getter, and query_filter
         Setup.setup(
             engine=engine,
             permission_getter=permission_getter,
             query_filter=query_filter,
+            replicas=replicas,
+            replica_strategy=replica_strategy,
+            sticky_reads=sticky_reads,
+            prefetch_joins=prefetch_joins,
+            join_to_one=join_to_one,
+            single_statement=single_statement,
+            subquery_loads=subquery_loads,
+            dl_batch_filter=dl_batch_filter,
+            dl_sql_filter=dl_sql_filter,
+            query_filter_loads=query_filter_loads,
+            array_in_threshold=array_in_threshold,
+            index_advisor=IndexAdvisor() if index_advisor else None,
         )
 
         # Flags to determine if we need fallback query and/or mutation fields
@@ -163,7 +246,12 @@ class GraphemyRouter(GraphQLRouter):
         for cls in Setup.classes.values():
             # Set up the schema for each class (query, mutation, etc.)
             # This function registers fields for the generated schema.
-            set_schema(cls, functions, auto_foreign_keys=auto_foreign_keys)
+            set_schema(
+                cls,
+                functions,
+                auto_foreign_keys=auto_foreign_keys,
+                auto_indexes=auto_indexes,
+            )
 
             # Determine whether to enable queries/mutations for this class,
             # falling back to the flags passed to GraphemyRouter if None.
@@ -175,7 +263,11 @@ class GraphemyRouter(GraphQLRouter):
                 cls.__enable_delete_mutation__ = enable_delete_mutations
 
             # Generate query, filter, and order-by structures from the class
-            cls_query, cls_filter, cls_order_by = get_query(cls)
+            cls_query, cls_filter, cls_order_by, cls_relation_filter = (
+                get_query(
+                    cls,
+                )
+            )
 
             # Dynamically set references in the current module for convenience
             setattr(
@@ -193,6 +285,16 @@ class GraphemyRouter(GraphQLRouter):
                 cls.__name__ + "OrderBy",
                 cls_order_by,
             )
+            setattr(
+                sys.modules[__name__],
+                cls.__name__ + "RelationFilter",
+                cls_relation_filter,
+            )
+            setattr(
+                sys.modules[__name__],
+                cls.__name__ + "Aggregate",
+                get_aggregate_type(cls),
+            )
 
             # If queries are enabled for this class, attach the resolver to the query container
             if cls.__enable_query__:
@@ -202,6 +304,11 @@ class GraphemyRouter(GraphQLRouter):
                     cls.__queryname__,
                     cls_query,
                 )
+                setattr(
+                    query,
+                    cls.__queryname__ + "_aggregate",
+                    get_aggregate_query(cls, cls_filter),
+                )
 
             # If PUT mutations are enabled for this class, attach them to the mutation container
             if cls.__enable_put_mutation__:
@@ -246,21 +353,44 @@ class GraphemyRouter(GraphQLRouter):
                 else {}
             )
 
+            # Engines written to during this request. Strawberry copies the
+            # context dict, so shared per-request state must be mutable.
+            context["written_engines"] = set()
+
+            # Instances hydrated during this request, keyed by (model, primary
+            # key), so rows loaded by several paths share one object.
+            if identity_map:
+                context["identity_map"] = {}
+
+            # Rows selecting a batch field, keyed by (model, primary key)
+            context["batch_rows"] = {}
+
+            # Query filter predicates of this request, keyed by model
+            context["query_filters"] = {}
+
+            # Computed fields projected by the statements of this request,
+            # keyed by model name (see request_computed)
+            context["computed_fields"] = {}
+
             # For each function in 'functions', create a GraphemyDataLoader.
             # If permission is denied for "query" type, use fake_dl instead.
-            for k, (func, return_class) in functions.items():
+            for k, (func, return_class, options) in functions.items():
+                allowed = await Setup.permission_getter(
+                    return_class,
+                    context,
+                    "query",
+                )
                 context[k] = GraphemyDataLoader(
-                    load_fn=(
-                        func
-                        if await Setup.permission_getter(
-                            return_class,
-                            context,
-                            "query",
-                        )
-                        else fake_dl
-                    ),
-                    filter_method=dl_filter,
+                    load_fn=partial(func, context=context)
+                    if allowed
+                    else fake_dl,
                     context=context,
+                    denied=not allowed,
+                    **{
+                        "filter_method": dl_filter,
+                        **loader_defaults,
+                        **options,
+                    },
                 )
             return context
 
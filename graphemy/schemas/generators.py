@@ -1,5 +1,6 @@
 from collections.abc import Callable
-from types import UnionType
+from enum import Enum
+from inspect import isawaitable
 from typing import (
     TYPE_CHECKING,
     Annotated,
@@ -10,25 +11,53 @@ from typing import (
 )
 
 import strawberry
-from sqlalchemy import ForeignKeyConstraint
+from sqlalchemy import ForeignKeyConstraint, Index
 from sqlalchemy.inspection import inspect
 from strawberry.tools import merge_types
 from strawberry.types import Info
 from strawberry.types.field import StrawberryField
+from strawberry.utils.str_converters import to_camel_case
 
+from graphemy.database.advisor import is_indexed
 from graphemy.database.operations import (
     delete_item,
+    get_aggregates,
     get_all,
+    get_computed_values,
+    get_grouped_aggregates,
     get_items,
+    get_root_query,
+    get_statement_items,
+    get_through_items,
+    get_tree_items,
     put_item,
 )
-from graphemy.database.utils import multiple_sort
+from graphemy.database.utils import (
+    get_aggregate_fields,
+    get_fields_metadata,
+    get_loader_conditions,
+    get_primary_keys,
+    multiple_sort,
+    nulls_last_dialects,
+)
 from graphemy.setup import Setup
 
-from .models import Order, filter_models
+from .models import Order, SearchStringFilter, filter_models
+from .planner import (
+    get_selections,
+    plan_joins,
+    plan_tree,
+    prefetch_relationships,
+    prime_joins,
+    prime_loaders,
+    prime_tree,
+    request_computed,
+    subquery_relationships,
+)
 
 if TYPE_CHECKING:
     from graphql.pyutils.path import Path
+    from sqlalchemy.sql import Select
 
     from graphemy.dl import Dl
     from graphemy.models import Graphemy
@@ -39,9 +68,10 @@ ModelType = TypeVar("ModelType")
 
 def set_schema(
     cls: "Graphemy",
-    functions: dict[str, tuple[Callable, "Graphemy"]],
+    functions: dict[str, tuple[Callable, "Graphemy", dict]],
     *,
     auto_foreign_keys: bool = False,
+    auto_indexes: bool = False,
 ) -> None:
     """
     Sets up a Strawberry schema for a Graphemy class, linking model fields to
@@ -50,11 +80,15 @@ def set_schema(
 
     Args:
         cls (Graphemy): The Graphemy model class to be annotated with Strawberry fields.
-        functions (dict[str, tuple[Callable, Graphemy]]): A dictionary mapping field names
-            to tuples of (DataLoader function, Graphemy model).
+        functions (dict[str, tuple[Callable, Graphemy, dict]]): A dictionary mapping
+            DataLoader names to tuples of (DataLoader function, Graphemy model,
+            DataLoader options).
         auto_foreign_keys (bool, optional): Whether to automatically detect and generate
             foreign key constraints for fields that do not explicitly declare them.
             Defaults to False.
+        auto_indexes (bool, optional): Whether to add an index on the target
+            columns of each relationship, queried with `IN` lists by the
+            DataLoaders, unless one already covers them. Defaults to False.
 
     Returns:
         None
@@ -64,15 +98,41 @@ def set_schema(
     class GraphemySchemaWrapper:
         """Wrapper class to dynamically attach Strawberry fields."""
 
+    # Precompute column, type and nullability information for the model,
+    # reused by filters and sorting on every request
+    get_fields_metadata(cls)
+
     # Keep track of foreign key constraints we've added
     foreign_keys_added = []
 
+    # Batch and computed fields are resolved by their own DataLoaders
+    add_field_loaders(cls, GraphemySchemaWrapper, functions)
+
     # Process each attribute in the class dict that has a `dl` attribute
     for field_attribute in [
         attr for attr in cls.__dict__.values() if hasattr(attr, "dl")
     ]:
         returned_graphemy_model: Graphemy = Setup.classes[field_attribute.dl]
 
+        # Relationships whose sides live on different engines (or shards)
+        # can't be joined in SQL
+        field_attribute.cross_engine = (
+            cls.__enginename__ != returned_graphemy_model.__enginename__
+            or bool(cls.__shard_key__ or returned_graphemy_model.__shard_key__)
+        )
+
+        # Association models are joined to the target rows
+        if field_attribute.through and (
+            Setup.classes[field_attribute.through].__enginename__
+            != returned_graphemy_model.__enginename__
+        ):
+            error_text = (
+                f"The association model of {cls.__name__}."
+                f"{field_attribute.__name__} must use the engine of "
+                f"{returned_graphemy_model.__name__}."
+            )
+            raise ValueError(error_text)
+
         # Create a Strawberry field with permission checks
         setattr(
             GraphemySchemaWrapper,
@@ -86,11 +146,23 @@ def set_schema(
             ),
         )
 
+        # List relationships also get batched count and aggregate fields
+        if field_attribute.many and field_attribute.direct:
+            add_aggregate_fields(
+                GraphemySchemaWrapper,
+                field_attribute,
+                returned_graphemy_model,
+                functions,
+            )
+
         # Handle foreign key constraints
-        if field_attribute.foreign_key or (
-            field_attribute.foreign_key is None
-            and auto_foreign_keys
-            and not field_attribute.many
+        if field_attribute.direct and (
+            field_attribute.foreign_key
+            or (
+                field_attribute.foreign_key is None
+                and auto_foreign_keys
+                and not field_attribute.many
+            )
         ):
             # Ensure we always have lists for source and target
             foreign_key_source = (
@@ -129,12 +201,22 @@ def set_schema(
                     (foreign_key_source, foreign_key_target),
                 )
 
+        # Index the columns the DataLoader looks rows up by, composite for
+        # list targets. Custom statements look rows up their own way.
+        if auto_indexes and field_attribute.statement is None:
+            add_target_index(field_attribute, returned_graphemy_model)
+
         # Build a DataLoader function if one doesn't exist in the provided dictionary
         if field_attribute.dl_name not in functions:
             functions[field_attribute.dl_name] = (
                 get_dl_field(field_attribute, field_attribute.dl),
                 returned_graphemy_model,
+                dict(field_attribute.loader_options),
             )
+        else:
+            # Fields sharing a DataLoader share its options, the first set wins
+            for option, value in field_attribute.loader_options.items():
+                functions[field_attribute.dl_name][2].setdefault(option, value)
 
     # If the class doesn't yet have a Strawberry schema, construct one.
     if not cls.__strawberry_schema__:
@@ -161,6 +243,117 @@ def set_schema(
         cls.__strawberry_schema__ = strawberry_schema
 
 
+def add_field_loaders(
+    cls: "Graphemy",
+    wrapper: type,
+    functions: dict[str, tuple[Callable, "Graphemy", dict]],
+) -> None:
+    """
+    Register the DataLoaders of the batch fields (see batch_field) and
+    Computed fields of a model, adding the Computed fields to its schema.
+
+    Args:
+        cls (Graphemy): The Graphemy model owning the fields.
+        wrapper (type): The class holding the Strawberry fields of the schema.
+        functions (dict[str, tuple[Callable, Graphemy, dict]]): The DataLoader
+            functions of the router.
+    """
+    # Batch fields of the Strawberry class are resolved by a DataLoader
+    for attribute in vars(cls.Strawberry).values():
+        batch_function = getattr(attribute, "batch_function", None)
+        if batch_function is not None:
+            name = f"batch_{cls.__name__}_{batch_function.__name__}"
+            # Batch results are not rows, dl_filter doesn't apply to them
+            functions[name] = (
+                get_batch_dl(cls.__name__, name, batch_function),
+                cls,
+                {"filter_method": None},
+            )
+
+    # Computed fields resolve the value loaded with the row, or load it
+    for name, computed in cls.__computed__.items():
+        setattr(
+            wrapper,
+            name,
+            strawberry.field(
+                get_computed_function(cls.__name__, name, computed.type),
+                **computed.to_strawberry_kwargs,
+            ),
+        )
+        functions[f"cmp_{cls.__name__}_{name}"] = (
+            get_computed_dl(cls.__name__, name),
+            cls,
+            {"filter_method": None},
+        )
+
+
+def add_aggregate_fields(
+    wrapper: type,
+    field: Callable,
+    target_model: "Graphemy",
+    functions: dict[str, tuple[Callable, "Graphemy", dict]],
+) -> None:
+    """
+    Add the count and aggregate fields of a list relationship to a schema,
+    registering the DataLoader computing them.
+
+    Args:
+        wrapper (type): The class holding the Strawberry fields of the schema.
+        field (Callable): The Dl resolver of the relationship.
+        target_model (Graphemy): The model the relationship loads.
+        functions (dict[str, tuple[Callable, Graphemy, dict]]): The DataLoader
+            functions of the router.
+    """
+    graphql_name = field.to_strawberry_kwargs.get("name") or to_camel_case(
+        field.__name__,
+    )
+    for suffix, resolver in zip(
+        ("Count", "Aggregate"),
+        get_aggregate_resolvers(field),
+        strict=True,
+    ):
+        setattr(
+            wrapper,
+            resolver.__name__,
+            strawberry.field(
+                resolver,
+                name=graphql_name + suffix,
+                permission_classes=[Setup.get_auth(target_model, "query")],
+            ),
+        )
+    if field.aggregate_name not in functions:
+        # Aggregates are not rows, dl_filter doesn't apply to them
+        functions[field.aggregate_name] = (
+            get_aggregate_dl(field, field.dl),
+            target_model,
+            {"filter_method": None},
+        )
+
+
+def add_target_index(field: Callable, target_model: "Graphemy") -> None:
+    """
+    Add an index on the target columns of a relationship to the target table,
+    composite for list targets, unless an index already starts with them.
+    Relationships through an association model index its source column.
+
+    Args:
+        field (Callable): The Dl resolver of the relationship.
+        target_model (Graphemy): The model the relationship loads.
+    """
+    targets = (
+        field.target if isinstance(field.target, list) else [field.target]
+    )
+    if field.through:
+        target_model = Setup.classes[field.through]
+        targets = [field.through_source]
+    target_table = target_model.__table__
+    if not is_indexed(target_table, targets):
+        Index(
+            f"ix_{target_table.name}_{'_'.join(targets)}",
+            *[target_table.c[target] for target in targets],
+        )
+
+
 def get_dl_field(
     field_attribute: Callable,
     returned_class_name: "str",
@@ -191,21 +384,387 @@ def get_dl_field(
         # Else, it can be either the single schema or None
         related_schema: ModelType = related_schema | None
 
-    async def dataloader_func(keys: list[tuple]) -> related_schema:
+    async def dataloader_func(
+        keys: list[tuple],
+        context: dict | None = None,
+        root: "Select | None" = None,
+    ) -> related_schema:
         """
         The underlying DataLoader function that will fetch records based on
         the `keys` which map to the source/target relationship fields.
         """
-        return await get_items(
-            Setup.classes[returned_class_name],
-            keys,
-            field_attribute.target,
-        )
+        model = Setup.classes[returned_class_name]
+        if field_attribute.statement is not None:
+            results = await get_statement_items(
+                model,
+                keys,
+                field_attribute.statement,
+                field_attribute.target,
+                context=context,
+                conditions=get_loader_conditions(model, context),
+            )
+        elif field_attribute.through:
+            results = await get_through_items(
+                model,
+                keys,
+                field_attribute,
+                context=context,
+                conditions=get_loader_conditions(model, context)
+                + get_loader_conditions(
+                    Setup.classes[field_attribute.through],
+                    context,
+                ),
+            )
+        elif field_attribute.recursive:
+            results = await get_tree_items(
+                model,
+                keys,
+                field_attribute.source,
+                field_attribute.target,
+                max_depth=field_attribute.max_depth,
+                context=context,
+                conditions=get_loader_conditions(model, context),
+            )
+        else:
+            results = await get_items(
+                model,
+                keys,
+                field_attribute.target,
+                context=context,
+                root=root,
+                conditions=get_loader_conditions(model, context),
+            )
+
+        # Filter the whole batch at once, keeping the rows the hook returned
+        if Setup.dl_batch_filter:
+            kept = {
+                id(row)
+                for row in Setup.dl_batch_filter(
+                    model,
+                    [row for rows in results for row in rows],
+                    context,
+                )
+            }
+            results = [
+                [row for row in rows if id(row) in kept] for rows in results
+            ]
+
+        # Share the loaded rows with the loaders keyed on their unique keys.
+        # Rows built by a custom statement may hold derived or partial
+        # columns, so they are not shared.
+        if field_attribute.statement is None:
+            prime_loaders(
+                model,
+                [row for rows in results for row in rows],
+                context,
+            )
+        return results
 
     dataloader_func.__name__ = field_attribute.dl_name
     return dataloader_func
 
 
+def get_aggregate_type(cls: "Graphemy") -> type:
+    """
+    Build the Strawberry type holding aggregates of a model's rows: their
+    `count`, the `sum` and `avg` of numeric fields and the `min` and `max`
+    of every column.
+
+    The types are cached on the model class (`__aggregate_types__`).
+
+    Args:
+        cls (Graphemy): The aggregated Graphemy model.
+
+    Returns:
+        type: The `<Model>Aggregate` Strawberry type.
+    """
+    types = cls.__dict__.get("__aggregate_types__")
+    if types:
+        return types[0]
+
+    numeric, comparable = get_aggregate_fields(cls)
+
+    class Numbers:
+        """Dynamic type for the sums and averages of numeric fields."""
+
+    class Values:
+        """Dynamic type for the minimums and maximums of columns."""
+
+    class Aggregate:
+        """Dynamic type for the aggregates of a set of rows."""
+
+    for field in numeric:
+        setattr(
+            Numbers,
+            field.name,
+            strawberry.field(default=None, graphql_type=float | None),
+        )
+    for field in comparable:
+        setattr(
+            Values,
+            field.name,
+            strawberry.field(default=None, graphql_type=field.type | None),
+        )
+
+    Aggregate.count = strawberry.field(default=0, graphql_type=int)
+
+    # GraphQL types need at least one field, skip empty groups
+    numbers_type = values_type = None
+    if numeric:
+        numbers_type = strawberry.type(name=f"{cls.__name__}AggregateNumbers")(
+            Numbers,
+        )
+        Aggregate.sum = strawberry.field(
+            default=None,
+            graphql_type=numbers_type | None,
+        )
+        Aggregate.avg = strawberry.field(
+            default=None,
+            graphql_type=numbers_type | None,
+        )
+    if comparable:
+        values_type = strawberry.type(name=f"{cls.__name__}AggregateValues")(
+            Values,
+        )
+        Aggregate.min = strawberry.field(
+            default=None,
+            graphql_type=values_type | None,
+        )
+        Aggregate.max = strawberry.field(
+            default=None,
+            graphql_type=values_type | None,
+        )
+
+    aggregate_type = strawberry.type(name=f"{cls.__name__}Aggregate")(
+        Aggregate,
+    )
+    cls.__aggregate_types__ = (aggregate_type, numbers_type, values_type)
+    return aggregate_type
+
+
+def build_aggregate(cls: "Graphemy", values: dict | None) -> object:
+    """
+    Instantiate the `<Model>Aggregate` type from computed aggregates.
+
+    Args:
+        cls (Graphemy): The aggregated Graphemy model.
+        values (dict | None): The aggregates returned by get_aggregates, or
+            None if no row matched.
+
+    Returns:
+        object: An instance of the model's aggregate type.
+    """
+    get_aggregate_type(cls)
+    aggregate_type, numbers_type, values_type = cls.__aggregate_types__
+    if not values:
+        return aggregate_type(count=0)
+
+    kwargs = {"count": values["count"]}
+    if numbers_type:
+        kwargs["sum"] = numbers_type(**values["sum"])
+        kwargs["avg"] = numbers_type(**values["avg"])
+    if values_type:
+        kwargs["min"] = values_type(**values["min"])
+        kwargs["max"] = values_type(**values["max"])
+    return aggregate_type(**kwargs)
+
+
+def get_aggregate_dl(
+    field_attribute: Callable,
+    returned_class_name: str,
+) -> Callable:
+    """
+    Creates the DataLoader function computing the aggregates of the rows of a
+    list relationship, for every parent in a batch.
+
+    Args:
+        field_attribute (Callable): The Dl resolver of the list relationship.
+        returned_class_name (str): The name of the related Graphemy model.
+
+    Returns:
+        Callable: A function that can be registered as a DataLoader in the
+        GraphQL context.
+    """
+
+    async def aggregate_func(
+        keys: list[tuple],
+        context: dict | None = None,
+    ) -> list[dict | None]:
+        """
+        Aggregates the related rows of each key with a GROUP BY statement.
+        """
+        model = Setup.classes[returned_class_name]
+        return await get_aggregates(
+            model,
+            keys,
+            key_id=field_attribute.target,
+            context=context,
+            conditions=get_loader_conditions(model, context),
+        )
+
+    aggregate_func.__name__ = field_attribute.aggregate_name
+    return aggregate_func
+
+
+def get_aggregate_resolvers(
+    field_attribute: Callable,
+) -> tuple[Callable, Callable]:
+    """
+    Constructs the resolvers of the `<relation>Count` and `<relation>Aggregate`
+    fields of a list relationship, both batched by its aggregate DataLoader.
+
+    Args:
+        field_attribute (Callable): The Dl resolver of the list relationship.
+
+    Returns:
+        tuple[Callable, Callable]: The count and aggregate resolvers.
+    """
+    extracted_type = field_attribute.dl
+
+    async def count_func(
+        self: "Graphemy",
+        info: Info,
+        where: Annotated[
+            f"{extracted_type}Filter",
+            strawberry.lazy("graphemy.router"),
+        ]
+        | None = None,
+    ) -> int:
+        """
+        Counts the related items, optionally filtered.
+        """
+        result = await info.context[field_attribute.aggregate_name].load(
+            field_attribute.resolve_value(self),
+            where,
+        )
+        return result["count"] if result else 0
+
+    async def aggregate_func(
+        self: "Graphemy",
+        info: Info,
+        where: Annotated[
+            f"{extracted_type}Filter",
+            strawberry.lazy("graphemy.router"),
+        ]
+        | None = None,
+    ) -> Annotated[
+        f"{extracted_type}Aggregate",
+        strawberry.lazy("graphemy.router"),
+    ]:
+        """
+        Aggregates the related items, optionally filtered.
+        """
+        result = await info.context[field_attribute.aggregate_name].load(
+            field_attribute.resolve_value(self),
+            where,
+        )
+        return build_aggregate(Setup.classes[extracted_type], result)
+
+    count_func.__name__ = f"{field_attribute.__name__}_count"
+    aggregate_func.__name__ = f"{field_attribute.__name__}_aggregate"
+    return count_func, aggregate_func
+
+
+def get_computed_function(
+    model_name: str,
+    name: str,
+    field_type: type,
+) -> Callable:
+    """
+    Constructs the resolver of a Computed field.
+
+    The value is loaded with the row when the field was requested before the
+    row's statement ran (see request_computed). Rows loaded without it, e.g.
+    from a loader cache or a compiled tree, load it by primary key through
+    the field's DataLoader.
+
+    Args:
+        model_name (str): The name of the Graphemy model owning the field.
+        name (str): The name of the Computed field.
+        field_type (type): The annotated type of the field.
+
+    Returns:
+        Callable: An asynchronous Strawberry resolver.
+    """
+
+    async def computed_func(self: "Graphemy", info: Info) -> field_type:
+        """
+        Resolves the computed value of the row.
+        """
+        if name in self.__dict__:
+            return self.__dict__[name]
+        keys = [getattr(self, key) for key in get_primary_keys(type(self))]
+        return await info.context[f"cmp_{model_name}_{name}"].load(
+            keys if len(keys) > 1 else keys[0],
+        )
+
+    computed_func.__name__ = name
+    return computed_func
+
+
+def get_computed_dl(model_name: str, name: str) -> Callable:
+    """
+    Creates the DataLoader function loading a Computed field of rows by
+    primary key, with one statement per batch.
+
+    Args:
+        model_name (str): The name of the Graphemy model owning the field.
+        name (str): The name of the Computed field.
+
+    Returns:
+        Callable: A function that can be registered as a DataLoader in the
+        GraphQL context.
+    """
+
+    async def computed_dl(
+        keys: list[tuple],
+        context: dict | None = None,
+    ) -> list:
+        """
+        Selects the computed value of each primary key.
+        """
+        model = Setup.classes[model_name]
+        return await get_computed_values(model, name, keys, context)
+
+    computed_dl.__name__ = f"cmp_{model_name}_{name}"
+    return computed_dl
+
+
+def get_batch_dl(
+    model_name: str,
+    loader_name: str,
+    batch_function: Callable,
+) -> Callable:
+    """
+    Creates the DataLoader function of a batch field (see batch_field),
+    calling the batch function once with the rows of every key.
+
+    Args:
+        model_name (str): The name of the Graphemy model owning the field.
+        loader_name (str): The name of the DataLoader.
+        batch_function (Callable): The function computing the values of a
+            list of rows.
+
+    Returns:
+        Callable: A function that can be registered as a DataLoader in the
+        GraphQL context.
+    """
+
+    async def batch_dl(keys: list[tuple], context: dict | None = None) -> list:
+        """
+        Computes the values of the rows of the batch, in order.
+        """
+        model = Setup.classes[model_name]
+        rows = [context["batch_rows"][(model, key[0])] for key in keys]
+        values = batch_function(rows, context)
+        if isawaitable(values):
+            values = await values
+        return list(values)
+
+    batch_dl.__name__ = loader_name
+    return batch_dl
+
+
 def get_path(path: "Path") -> tuple:
     """
     Recursively extracts the entire GraphQL path into a tuple for logging or
@@ -258,7 +817,11 @@ def get_dl_function(
     else:
         dl_target_name = "_".join(dl_field_value.target)
 
-    data_loader_name = f"dl_{extracted_type}_{dl_target_name}"
+    # Relationships loading other rows for the same keys get a suffix
+    data_loader_name = (
+        f"dl_{extracted_type}_{dl_target_name}"
+        f"{dl_field_value.get_loader_suffix(field_name)}"
+    )
 
     # Set up the return type. We use Strawberry's lazy annotation for cyclical imports.
     # For example, "MyClassSchema" might be built in graphemy.router.
@@ -316,6 +879,13 @@ def get_dl_function(
             Loads multiple related items, optionally filtered, ordered, and paginated.
             """
             key_values = _resolve_value(self)
+            if Setup.classes[extracted_type].__computed__:
+                request_computed(
+                    Setup.classes[extracted_type],
+                    get_selections(info.selected_fields),
+                    order_by,
+                    info.context,
+                )
             result = await info.context[data_loader_name].load(
                 key_values,
                 where,
@@ -323,10 +893,13 @@ def get_dl_function(
 
             # Apply multiple sort if specified
             if order_by:
+                target = Setup.classes[extracted_type]
                 result = multiple_sort(
-                    Setup.classes[extracted_type],
+                    target,
                     result,
                     order_by,
+                    nulls_last=Setup.engine[target.__enginename__].dialect.name
+                    in nulls_last_dialects,
                 )
 
             # Store total count in the request state if offset/limit is used
@@ -359,6 +932,13 @@ def get_dl_function(
             Loads a single related item (or None if not found).
             """
             key_values = _resolve_value(self)
+            if Setup.classes[extracted_type].__computed__:
+                request_computed(
+                    Setup.classes[extracted_type],
+                    get_selections(info.selected_fields),
+                    None,
+                    info.context,
+                )
             result = await info.context[data_loader_name].load(
                 key_values,
                 where,
@@ -369,11 +949,25 @@ def get_dl_function(
     loader_func.__name__ = field_name
     loader_func.dl = extracted_type
     loader_func.many = is_list_field
-    loader_func.target = dl_field_value.target
-    loader_func.source = dl_field_value.source
-    loader_func.foreign_key = dl_field_value.foreign_key
+    for attribute in (
+        "target",
+        "source",
+        "foreign_key",
+        "prefetch",
+        "recursive",
+        "max_depth",
+        "through",
+        "through_source",
+        "through_target",
+        "statement",
+        "direct",
+        "loader_options",
+        "to_strawberry_kwargs",
+    ):
+        setattr(loader_func, attribute, getattr(dl_field_value, attribute))
+    loader_func.resolve_value = _resolve_value
     loader_func.dl_name = data_loader_name
-    loader_func.to_strawberry_kwargs = dl_field_value.to_strawberry_kwargs
+    loader_func.aggregate_name = f"agg_{extracted_type}_{dl_target_name}"
 
     return loader_func
 
@@ -400,36 +994,36 @@ def get_query(cls: "Graphemy") -> StrawberryField:
         """Dynamic input class for ordering fields."""
 
     # Populate Filter and OrderBy with model fields
-    for field_name, field_type in cls.__annotations__.items():
-        # Add ordering for each field
-        setattr(
-            OrderBy,
-            field_name,
-            strawberry.field(default=None, graphql_type=Order | None),
-        )
-
-        # If the field is annotated as a Union that includes None, extract the non-None type
-        if get_origin(field_type) is UnionType:
-            non_none_type = next(
-                t for t in get_args(field_type) if t is not type(None)
+    for field in get_fields_metadata(cls).values():
+        # Add ordering for each sortable field
+        if field.sortable:
+            setattr(
+                OrderBy,
+                field.name,
+                strawberry.field(default=None, graphql_type=Order | None),
             )
-        else:
-            non_none_type = field_type
+
+        if not field.filterable:
+            continue
 
         # Use existing filter models if available, else use a list-based filter
-        filter_model = (
-            filter_models.get(non_none_type.__name__)
-            if hasattr(non_none_type, "__name__")
-            and non_none_type.__name__ in filter_models
-            else list[non_none_type]
-        )
+        filter_model = filter_models.get(field.type_name, list[field.type])
+        if field.name in cls.__searchable__:
+            filter_model = SearchStringFilter
 
         setattr(
             Filter,
-            field_name,
+            field.name,
             strawberry.field(default=None, graphql_type=filter_model | None),
         )
 
+    # Searchable models can be sorted by the relevance of their search filters
+    if cls.__searchable__:
+        OrderBy.search_rank = strawberry.field(
+            default=None,
+            graphql_type=Order | None,
+        )
+
     # Logical operators for complex filtering
     Filter.AND = strawberry.field(
         default=None,
@@ -444,10 +1038,40 @@ def get_query(cls: "Graphemy") -> StrawberryField:
         graphql_type=list[Filter] | None,
     )
 
+    # Relationships in the same database filter on their related rows
+    for field_attribute in cls.__dict__.values():
+        if (
+            not hasattr(field_attribute, "dl")
+            or field_attribute.cross_engine
+            or not field_attribute.direct
+        ):
+            continue
+        setattr(
+            Filter,
+            field_attribute.__name__,
+            strawberry.field(
+                default=None,
+                graphql_type=Annotated[
+                    f"{field_attribute.dl}RelationFilter",
+                    strawberry.lazy("graphemy.router"),
+                ]
+                | None,
+                name=field_attribute.to_strawberry_kwargs.get("name"),
+            ),
+        )
+
     # Create Strawberry input types
     filter_input = strawberry.input(name=f"{cls.__name__}Filter")(Filter)
     order_by_input = strawberry.input(name=f"{cls.__name__}OrderBy")(OrderBy)
 
+    @strawberry.input(name=f"{cls.__name__}RelationFilter")
+    class RelationFilter:
+        """Input class matching some, none or every related row."""
+
+        some: filter_input | None = None
+        none: filter_input | None = None
+        every: filter_input | None = None
+
     async def query_function(
         info: Info,
         where: filter_input | None = None,
@@ -463,15 +1087,68 @@ def get_query(cls: "Graphemy") -> StrawberryField:
         if not await Setup.has_permission(cls, info.context, "query"):
             return []
 
+        selections = get_selections(info.selected_fields)
+        request_computed(cls, selections, order_by, info.context)
+
+        # In single statement mode, the selected relationships are compiled
+        # with the root rows into one JSON query
+        tree = (
+            plan_tree(cls, selections, info.context)
+            if Setup.single_statement
+            else []
+        )
+
+        # Otherwise, selected to-one relationships are joined to the root rows
+        joins = [] if tree else plan_joins(cls, selections, info.context)
+
         # Fetch results (and total count) from a general-purpose database operation
         result, total_count = await get_all(
             cls,
             where,
-            Setup.query_filter(cls, info.context),
+            Setup.get_query_filter(cls, info.context),
             order_by,
             offset,
             limit,
+            context=info.context,
+            joins=[(join.entity, join.onclause) for join in joins],
+            tree=tree,
         )
+        if tree:
+            result = prime_tree(cls, result, tree, info.context)
+        if joins:
+            result = prime_joins(joins, result, info.context)
+
+        # Share the root rows with the loaders keyed on their unique keys
+        prime_loaders(cls, result, info.context)
+
+        # Load the relationships of the root rows with subqueries of the root
+        # statement instead of sending their keys back to the database. The
+        # subqueries must see the same rows as the root query, so replicas
+        # read in turn fall back to key lists
+        if (
+            Setup.subquery_loads
+            and not tree
+            and result
+            and Setup.reads_primary(cls.__enginename__, info.context)
+        ):
+            await subquery_relationships(
+                cls,
+                result,
+                selections,
+                get_root_query(
+                    cls,
+                    where,
+                    Setup.get_query_filter(cls, info.context),
+                    sort=order_by,
+                    offset=offset,
+                    limit=limit,
+                    context=info.context,
+                ),
+                info.context,
+            )
+
+        # Eagerly load the selected relationships that should be joined in memory
+        await prefetch_relationships(cls, result, selections, info.context)
 
         # Store the total count in request state if it's provided
         if total_count is not None:
@@ -490,6 +1167,83 @@ def get_query(cls: "Graphemy") -> StrawberryField:
         ),
         filter_input,
         order_by_input,
+        RelationFilter,
+    )
+
+
+def get_aggregate_query(
+    cls: "Graphemy",
+    filter_input: type,
+) -> StrawberryField:
+    """
+    Constructs the `<model>Aggregate` root query field of a Graphemy model,
+    computing the count, sum, average, minimum and maximum of its rows in the
+    database, optionally grouped by columns.
+
+    Args:
+        cls (Graphemy): The Graphemy model for which to build the field.
+        filter_input (type): The `<Model>Filter` input of the model's query.
+
+    Returns:
+        StrawberryField: A Strawberry field returning one aggregate per group.
+    """
+    aggregate_type = get_aggregate_type(cls)
+    values_type = cls.__aggregate_types__[2]
+    _, comparable = get_aggregate_fields(cls)
+
+    # Columns the rows can be grouped by
+    column_enum = strawberry.enum(
+        Enum(
+            f"{cls.__name__}Column",
+            {to_camel_case(field.name): field.name for field in comparable},
+        ),
+    )
+
+    class AggregateGroup:
+        """Dynamic type for the aggregates of a group of rows."""
+
+    AggregateGroup.group = strawberry.field(
+        default=None,
+        graphql_type=values_type | None,
+    )
+    AggregateGroup.aggregate = strawberry.field(
+        default=None,
+        graphql_type=aggregate_type,
+    )
+    group_type = strawberry.type(name=f"{cls.__name__}AggregateGroup")(
+        AggregateGroup,
+    )
+
+    async def aggregate_function(
+        info: Info,
+        where: filter_input | None = None,
+        group_by: list[column_enum] | None = None,
+    ) -> list[group_type]:
+        """
+        Aggregates the rows matching the filter with a single GROUP BY statement.
+        """
+        # Check permissions
+        if not await Setup.has_permission(cls, info.context, "query"):
+            return []
+
+        groups = await get_grouped_aggregates(
+            cls,
+            where,
+            Setup.get_query_filter(cls, info.context),
+            group_by=[column.value for column in group_by or []],
+            context=info.context,
+        )
+        return [
+            group_type(
+                group=values_type(**group) if group else None,
+                aggregate=build_aggregate(cls, aggregates),
+            )
+            for group, aggregates in groups
+        ]
+
+    return strawberry.field(
+        aggregate_function,
+        permission_classes=[Setup.get_auth(cls, "query")],
     )
 
 
@@ -524,12 +1278,13 @@ def get_put_mutation(cls: "Graphemy") -> StrawberryField:
     input_schema = strawberry.input(name=f"{cls.__name__}Input")(InputData)
 
     async def mutation_function(
+        info: Info,
         params: input_schema,
     ) -> cls.__strawberry_schema__:
         """
         Upserts an item in the database, inserting if it doesn't exist or updating if it does.
         """
-        return await put_item(cls, params, primary_keys)
+        return await put_item(cls, params, primary_keys, info.context)
 
     # Return a Strawberry mutation
     return strawberry.mutation(
@@ -571,12 +1326,13 @@ def get_delete_mutation(cls: "Graphemy") -> StrawberryField:
     )
 
     async def mutation_function(
+        info: Info,
         params: input_schema,
     ) -> cls.__strawberry_schema__:
         """
         Deletes an item from the database by its primary key, returning the deleted item.
         """
-        return await delete_item(cls, params, primary_keys)
+        return await delete_item(cls, params, primary_keys, info.context)
 
     # Return a Strawberry mutation
     return strawberry.mutation(
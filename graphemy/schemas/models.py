@@ -30,6 +30,22 @@ class StringFilter:
     like: str | None = None
 
 
+@strawberry.input
+class SearchStringFilter:
+    """
+    Filter options for searchable string fields (see `Graphemy.__searchable__`).
+
+    Fields:
+        in_: Accepts a list of possible values (similar to SQL 'IN' operator).
+        like: Allows pattern matching (similar to SQL 'LIKE' operator).
+        search: Full-text search terms, matched through the column's index.
+    """
+
+    in_: list[str] | None = strawberry.field(name="in", default=None)
+    like: str | None = None
+    search: str | None = None
+
+
 @strawberry.input
 class IntFilter:
     """
@@ -0,0 +1,756 @@
+import asyncio
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from sqlalchemy import and_, select
+from sqlalchemy.inspection import inspect
+from sqlalchemy.orm import aliased
+from sqlalchemy.sql import Select
+from sqlalchemy.sql.elements import ColumnElement
+from strawberry.types.nodes import FragmentSpread, InlineFragment, Selection
+from strawberry.utils.str_converters import to_camel_case
+
+from graphemy.database.compiler import json_dialects
+from graphemy.database.operations import get_subquery_condition
+from graphemy.database.utils import get_identity
+from graphemy.dl import GraphemyDataLoader
+from graphemy.setup import Setup
+
+if TYPE_CHECKING:
+    from graphemy.models import Graphemy
+
+
+@dataclass
+class JoinPlan:
+    """
+    A to-one relationship folded into a root query as a LEFT JOIN.
+
+    Attributes:
+        field (Callable): The Dl resolver of the joined relationship.
+        entity (Any): The aliased target model added to the root select.
+        onclause (ColumnElement): The join condition between parent and target.
+        parent (int): The position of the parent entity in each result row
+            (0 is the root model, n is the n-th joined entity).
+    """
+
+    field: Callable
+    entity: object
+    onclause: ColumnElement
+    parent: int
+
+
+@dataclass
+class TreePlan:
+    """
+    A relationship compiled into the single JSON statement of a root query.
+
+    Attributes:
+        field (Callable): The Dl resolver of the relationship.
+        model (Graphemy): The target model of the relationship.
+        children (list[TreePlan]): The relationships nested under it.
+    """
+
+    field: Callable
+    model: "Graphemy"
+    children: list["TreePlan"]
+
+
+def get_selections(selections: list[Selection]) -> list[Selection]:
+    """
+    Flatten the sub-selections of the first selected field, expanding
+    fragments, so they can be matched against model fields by name.
+
+    Args:
+        selections (list[Selection]): The selected fields of a resolver
+            (usually `info.selected_fields`).
+
+    Returns:
+        list[Selection]: The fields selected below the resolver's field.
+    """
+    if not selections:
+        return []
+    return flatten_selections(selections[0].selections)
+
+
+def flatten_selections(selections: list[Selection]) -> list[Selection]:
+    """
+    Expand fragment spreads and inline fragments into their fields.
+
+    Args:
+        selections (list[Selection]): A list of GraphQL selections.
+
+    Returns:
+        list[Selection]: Only field selections.
+    """
+    fields = []
+    for selection in selections:
+        if isinstance(selection, FragmentSpread | InlineFragment):
+            fields.extend(flatten_selections(selection.selections))
+        else:
+            fields.append(selection)
+    return fields
+
+
+def get_dl_fields(model: "Graphemy") -> dict[str, Callable]:
+    """
+    Map the GraphQL names of a model's Dl fields to their resolvers.
+
+    The mapping is cached on the model class (`__dl_fields__`).
+
+    Args:
+        model (Graphemy): The Graphemy model owning the Dl fields.
+
+    Returns:
+        dict[str, Callable]: Dl resolvers keyed by GraphQL field name.
+    """
+    dl_fields = model.__dict__.get("__dl_fields__")
+    if dl_fields is None:
+        dl_fields = {
+            attr.to_strawberry_kwargs.get("name")
+            or to_camel_case(attr.__name__): attr
+            for attr in model.__dict__.values()
+            if hasattr(attr, "dl")
+        }
+        model.__dl_fields__ = dl_fields
+    return dl_fields
+
+
+def request_computed(
+    model: "Graphemy",
+    selections: list[Selection],
+    sort: list | None,
+    context: dict | None,
+) -> None:
+    """
+    Record the Computed fields of a model selected or sorted on in the
+    request, so the statements loading its rows project them.
+
+    The loaders of a tick run once every resolver of the tick has requested
+    its rows, so the fields requested by all of them are projected.
+
+    Args:
+        model (Graphemy): The model of the selected rows.
+        selections (list[Selection]): The fields selected on the rows.
+        sort (list | None): The sort instructions of the rows.
+        context (dict | None): The GraphQL context of the current request.
+    """
+    computed_fields = context.get("computed_fields") if context else None
+    if not model.__computed__ or computed_fields is None:
+        return
+    names = {
+        computed.to_strawberry_kwargs.get("name") or to_camel_case(name): name
+        for name, computed in model.__computed__.items()
+    }
+    requested = {
+        names[selection.name]
+        for selection in selections
+        if selection.name in names
+    }
+    requested.update(
+        field
+        for s in sort or []
+        for field, order in vars(s).items()
+        if order is not None and field in model.__computed__
+    )
+    if requested:
+        computed_fields.setdefault(model.__name__, set()).update(requested)
+
+
+def can_prime(loader: GraphemyDataLoader | None) -> bool:
+    """
+    Decide whether rows fetched outside of a DataLoader's own load function
+    may be primed into it.
+
+    The loader must be allowed and cached, and no loader filter may be set,
+    since the batch and SQL loader filters only run inside load functions.
+
+    Args:
+        loader (GraphemyDataLoader | None): The loader to prime.
+
+    Returns:
+        bool: True if the loader can be primed.
+    """
+    return bool(
+        loader
+        and not loader.denied
+        and loader.cache
+        and not Setup.dl_batch_filter
+        and not Setup.dl_sql_filter,
+    )
+
+
+def is_unfiltered(model: "Graphemy", context: dict) -> bool:
+    """
+    Check that the rows of a model loaded by relationships aren't restricted
+    by its query filter, so rows fetched by a join may be handed over to the
+    model's loaders.
+
+    Args:
+        model (Graphemy): The model loaded by the relationship.
+        context (dict): The GraphQL context of the current request.
+
+    Returns:
+        bool: True if loaders of the model return every matching row.
+    """
+    return (
+        not Setup.query_filter_loads
+        or Setup.get_query_filter(model, context) is True
+    )
+
+
+def get_unique_loaders(model: "Graphemy") -> list[tuple[str, str | list[str]]]:
+    """
+    List the DataLoaders that load a model by a unique key: its primary key
+    or a unique column. Each of those loaders can answer a load with any
+    already fetched row.
+
+    The list is cached on the model class (`__unique_loaders__`).
+
+    Args:
+        model (Graphemy): The model loaded by the DataLoaders.
+
+    Returns:
+        list[tuple[str, str | list[str]]]: (DataLoader name, target) pairs.
+    """
+    loaders = model.__dict__.get("__unique_loaders__")
+    if loaders is None:
+        primary_keys = {key.name for key in inspect(model).primary_key}
+        unique_columns = {c.name for c in model.__table__.columns if c.unique}
+        targets = {}
+        for cls in Setup.classes.values():
+            for field in get_dl_fields(cls).values():
+                if field.dl != model.__name__ or not field.direct:
+                    continue
+                columns = (
+                    field.target
+                    if isinstance(field.target, list)
+                    else [field.target]
+                )
+                if set(columns) == primary_keys or (
+                    len(columns) == 1 and columns[0] in unique_columns
+                ):
+                    targets[field.dl_name] = field.target
+        loaders = list(targets.items())
+        model.__unique_loaders__ = loaders
+    return loaders
+
+
+def prime_loaders(
+    model: "Graphemy",
+    rows: list["Graphemy"],
+    context: dict | None,
+) -> None:
+    """
+    Prime the request's DataLoaders keyed on a unique key of a model with
+    rows of that model loaded by any path, so a later relationship pointing
+    back at those rows doesn't query them again.
+
+    Args:
+        model (Graphemy): The model of the rows.
+        rows (list[Graphemy]): The loaded rows.
+        context (dict | None): The GraphQL context holding the request's loaders.
+    """
+    if not context or not rows:
+        return
+    for dl_name, target in get_unique_loaders(model):
+        loader = context.get(dl_name)
+        if not can_prime(loader):
+            continue
+        loader.prime_many(
+            {
+                GraphemyDataLoader.get_key(
+                    [getattr(row, t) for t in target]
+                    if isinstance(target, list)
+                    else getattr(row, target),
+                ): [row]
+                for row in rows
+            },
+        )
+
+
+def should_prefetch(field: Callable, selection: Selection) -> bool:
+    """
+    Decide whether a selected Dl field is loaded eagerly by the root query.
+
+    Only selections without arguments (filters, sort or pagination) can be
+    prefetched, since their results are shared with every parent row. `Dl.prefetch` wins over the router's
+    `prefetch_joins` flag, which only applies to cross-engine relationships.
+
+    Args:
+        field (Callable): The Dl resolver of the selected field.
+        selection (Selection): The selected field.
+
+    Returns:
+        bool: True if the relationship should be prefetched.
+    """
+    if selection.arguments:
+        return False
+    if field.prefetch is not None:
+        return field.prefetch
+    return Setup.prefetch_joins and getattr(field, "cross_engine", False)
+
+
+async def prefetch_relationships(
+    model: "Graphemy",
+    rows: list["Graphemy"],
+    selections: list[Selection],
+    context: dict,
+) -> None:
+    """
+    Eagerly load the selected relationships of root query rows, level by
+    level, priming the request's DataLoaders with the results.
+
+    At each nesting level, the keys of every prefetched relationship are
+    collected from all parent rows and loaded with one call per loader, all
+    loaders running concurrently (one batch per engine). The results are
+    joined to their parents in memory through the loader caches, so the
+    resolvers find them without waiting for a new DataLoader tick.
+
+    Args:
+        model (Graphemy): The model of the root rows.
+        rows (list[Graphemy]): The rows returned by the root query.
+        selections (list[Selection]): The fields selected on the root rows.
+        context (dict): The GraphQL context holding the request's loaders.
+    """
+    level = [(model, rows, selections)]
+    while level:
+        tasks = []
+        children = []
+        for parent_model, parent_rows, parent_selections in level:
+            dl_fields = get_dl_fields(parent_model)
+            for selection in parent_selections:
+                field = dl_fields.get(selection.name)
+                loader = context.get(field.dl_name) if field else None
+                if not loader or not should_prefetch(field, selection):
+                    continue
+                tasks.append(
+                    loader.prefetch(
+                        [field.resolve_value(row) for row in parent_rows],
+                    ),
+                )
+                children.append(
+                    (
+                        Setup.classes[field.dl],
+                        flatten_selections(selection.selections),
+                    ),
+                )
+
+        # Load every relationship of this level concurrently
+        results = await asyncio.gather(*tasks)
+
+        level = [
+            (child_model, [row for value in values for row in value or []], s)
+            for (child_model, s), values in zip(children, results, strict=True)
+            if values
+        ]
+
+
+def can_subquery(
+    field: Callable,
+    selection: Selection,
+    context: dict,
+) -> bool:
+    """
+    Decide whether a selected Dl field can be loaded with a subquery of its
+    parents' statement.
+
+    The relationship must be direct (see Dl.direct), unfiltered, on the same
+    engine as its parent and link plain columns. Its loader must be allowed
+    and cached, since the loaded rows are handed over by priming it.
+
+    Args:
+        field (Callable): The Dl resolver of the selected field.
+        selection (Selection): The selected field.
+        context (dict): The GraphQL context holding the request's loaders.
+
+    Returns:
+        bool: True if the relationship can be loaded with a subquery.
+    """
+    if (
+        selection.arguments.get("where")
+        or getattr(field, "cross_engine", True)
+        or not field.direct
+    ):
+        return False
+
+    loader = context.get(field.dl_name)
+    if not loader or loader.denied or not loader.cache:
+        return False
+
+    sources = (
+        field.source if isinstance(field.source, list) else [field.source]
+    )
+    return all(isinstance(s, str) and not s.startswith("_") for s in sources)
+
+
+async def subquery_relationships(
+    model: "Graphemy",
+    rows: list["Graphemy"],
+    selections: list[Selection],
+    root: Select,
+    context: dict,
+) -> None:
+    """
+    Load the selected relationships of root query rows with the root
+    statement as a subquery, level by level, priming the request's loaders.
+
+    Instead of sending the keys of every parent back to the database, each
+    relationship is loaded with `target IN (SELECT source FROM <parents>)`,
+    where the parents of a nested level are themselves selected by the
+    subquery of the level above.
+
+    Args:
+        model (Graphemy): The model of the root rows.
+        rows (list[Graphemy]): The rows returned by the root query.
+        selections (list[Selection]): The fields selected on the root rows.
+        root (Select): The statement that returned the root rows.
+        context (dict): The GraphQL context holding the request's loaders.
+    """
+    level = [(model, rows, selections, root)]
+    while level:
+        tasks = []
+        children = []
+        for parent_model, parent_rows, parent_selections, statement in level:
+            dl_fields = get_dl_fields(parent_model)
+            for selection in parent_selections:
+                field = dl_fields.get(selection.name)
+                if not field or not can_subquery(field, selection, context):
+                    continue
+                sources = (
+                    field.source
+                    if isinstance(field.source, list)
+                    else [field.source]
+                )
+                subquery = statement.with_only_columns(
+                    *[getattr(parent_model, s) for s in sources],
+                )
+                tasks.append(
+                    context[field.dl_name].prefetch(
+                        [field.resolve_value(row) for row in parent_rows],
+                        root=subquery,
+                    ),
+                )
+                target_model = Setup.classes[field.dl]
+                children.append(
+                    (
+                        target_model,
+                        flatten_selections(selection.selections),
+                        select(target_model).where(
+                            get_subquery_condition(
+                                target_model,
+                                field.target,
+                                subquery,
+                            ),
+                        ),
+                    ),
+                )
+
+        # Load every relationship of this level concurrently
+        results = await asyncio.gather(*tasks)
+
+        level = [
+            (
+                child_model,
+                [row for value in values for row in value or []],
+                s,
+                statement,
+            )
+            for (child_model, s, statement), values in zip(
+                children,
+                results,
+                strict=True,
+            )
+            if values
+        ]
+
+
+def can_join(field: Callable, selection: Selection, context: dict) -> bool:
+    """
+    Decide whether a selected Dl field can be folded into a SQL LEFT JOIN.
+
+    The relationship must be to-one, direct (see Dl.direct), unfiltered, on the
+    same engine as its parent, link plain columns and target the primary key
+    of its model (so the join never multiplies parent rows). Its loader must
+    accept primed rows (see can_prime) and the target rows must not be
+    restricted by a query filter, since the joined rows are handed over by
+    priming it.
+
+    Args:
+        field (Callable): The Dl resolver of the selected field.
+        selection (Selection): The selected field.
+        context (dict): The GraphQL context holding the request's loaders.
+
+    Returns:
+        bool: True if the relationship can be joined.
+    """
+    if (
+        field.many
+        or not field.direct
+        or getattr(field, "cross_engine", True)
+        or selection.arguments.get("where")
+    ):
+        return False
+
+    if not can_prime(context.get(field.dl_name)):
+        return False
+
+    sources = (
+        field.source if isinstance(field.source, list) else [field.source]
+    )
+    targets = (
+        field.target if isinstance(field.target, list) else [field.target]
+    )
+    if any(not isinstance(s, str) or s.startswith("_") for s in sources):
+        return False
+
+    primary_keys = {
+        key.name for key in inspect(Setup.classes[field.dl]).primary_key
+    }
+    return set(targets) == primary_keys and is_unfiltered(
+        Setup.classes[field.dl],
+        context,
+    )
+
+
+def plan_joins(
+    model: "Graphemy",
+    selections: list[Selection],
+    context: dict,
+    entity: object = None,
+    plan: list[JoinPlan] | None = None,
+) -> list[JoinPlan]:
+    """
+    Plan the LEFT JOINs replacing the selected to-one relationships of a root
+    query, following nested to-one relationships of the joined models.
+
+    Args:
+        model (Graphemy): The model owning the selected fields.
+        selections (list[Selection]): The fields selected on the model.
+        context (dict): The GraphQL context holding the request's loaders.
+        entity (object, optional): The (aliased) entity of the model in the
+            statement. Defaults to the model itself.
+        plan (list[JoinPlan] | None, optional): The plan being built.
+
+    Returns:
+        list[JoinPlan]: The joins, parents always preceding their children.
+    """
+    plan = [] if plan is None else plan
+    if not Setup.join_to_one:
+        return plan
+
+    parent = len(plan)
+    entity = model if entity is None else entity
+    dl_fields = get_dl_fields(model)
+    for selection in selections:
+        field = dl_fields.get(selection.name)
+        if not field or not can_join(field, selection, context):
+            continue
+
+        target_model = Setup.classes[field.dl]
+        alias = aliased(target_model)
+        sources = (
+            field.source if isinstance(field.source, list) else [field.source]
+        )
+        targets = (
+            field.target if isinstance(field.target, list) else [field.target]
+        )
+        plan.append(
+            JoinPlan(
+                field=field,
+                entity=alias,
+                onclause=and_(
+                    *[
+                        getattr(entity, source) == getattr(alias, target)
+                        for source, target in zip(
+                            sources,
+                            targets,
+                            strict=True,
+                        )
+                    ],
+                ),
+                parent=parent,
+            ),
+        )
+        plan_joins(
+            target_model,
+            flatten_selections(selection.selections),
+            context,
+            alias,
+            plan,
+        )
+    return plan
+
+
+def prime_joins(
+    plan: list[JoinPlan],
+    rows: list[tuple],
+    context: dict,
+) -> list["Graphemy"]:
+    """
+    Split joined result rows, priming each joined relationship's loader with
+    the row found for its parent, and return the root model instances.
+
+    Args:
+        plan (list[JoinPlan]): The joins of the root query.
+        rows (list[tuple]): Rows of (root instance, *joined instances).
+        context (dict): The GraphQL context holding the request's loaders.
+
+    Returns:
+        list[Graphemy]: The root model instances, in order.
+    """
+    primed = [{} for _ in plan]
+    for row in rows:
+        for i, join in enumerate(plan):
+            parent = row[join.parent]
+            if parent is None:
+                continue
+            key = GraphemyDataLoader.get_key(join.field.resolve_value(parent))
+            primed[i][key] = [] if row[i + 1] is None else [row[i + 1]]
+
+    for join, data in zip(plan, primed, strict=True):
+        context[join.field.dl_name].prime_many(data)
+        prime_loaders(
+            Setup.classes[join.field.dl],
+            [row for value in data.values() for row in value],
+            context,
+        )
+    return [row[0] for row in rows]
+
+
+def can_compile(field: Callable, selection: Selection, context: dict) -> bool:
+    """
+    Decide whether a selected Dl field can be compiled into the single JSON
+    statement of a root query.
+
+    The relationship must be selected without arguments, be direct (see
+    Dl.direct), live on the same engine as its parent, whose dialect must
+    provide the JSON functions (see json_dialects), and link plain columns.
+    Its loader must accept primed rows (see can_prime) and the target rows
+    must not be restricted by a query filter, since the nested rows are handed
+    over by priming it.
+
+    Args:
+        field (Callable): The Dl resolver of the selected field.
+        selection (Selection): The selected field.
+        context (dict): The GraphQL context holding the request's loaders.
+
+    Returns:
+        bool: True if the relationship can be compiled.
+    """
+    if (
+        selection.arguments
+        or getattr(field, "cross_engine", True)
+        or not field.direct
+    ):
+        return False
+
+    target = Setup.classes[field.dl]
+    if Setup.engine[target.__enginename__].dialect.name not in json_dialects:
+        return False
+
+    if not can_prime(context.get(field.dl_name)):
+        return False
+
+    sources = (
+        field.source if isinstance(field.source, list) else [field.source]
+    )
+    return all(
+        isinstance(s, str) and not s.startswith("_") for s in sources
+    ) and is_unfiltered(target, context)
+
+
+def plan_tree(
+    model: "Graphemy",
+    selections: list[Selection],
+    context: dict,
+) -> list[TreePlan]:
+    """
+    Plan the relationships of a root query compiled into one JSON statement.
+
+    Relationships that can't be compiled (and everything below them) are
+    left to their DataLoaders.
+
+    Args:
+        model (Graphemy): The model owning the selected fields.
+        selections (list[Selection]): The fields selected on the model.
+        context (dict): The GraphQL context holding the request's loaders.
+
+    Returns:
+        list[TreePlan]: The compiled relationships, with their children.
+    """
+    dl_fields = get_dl_fields(model)
+    tree = []
+    for selection in selections:
+        field = dl_fields.get(selection.name)
+        if not field or not can_compile(field, selection, context):
+            continue
+        target_model = Setup.classes[field.dl]
+        tree.append(
+            TreePlan(
+                field=field,
+                model=target_model,
+                children=plan_tree(
+                    target_model,
+                    flatten_selections(selection.selections),
+                    context,
+                ),
+            ),
+        )
+    return tree
+
+
+def prime_tree(
+    model: "Graphemy",
+    rows: list[dict],
+    tree: list[TreePlan],
+    context: dict,
+) -> list["Graphemy"]:
+    """
+    Rebuild model instances from the JSON rows of a compiled statement,
+    priming the loaders of every compiled relationship with the nested rows.
+
+    Args:
+        model (Graphemy): The model of the rows.
+        rows (list[dict]): JSON objects of columns and nested relationships.
+        tree (list[TreePlan]): The compiled relationships of the rows.
+        context (dict): The GraphQL context holding the request's loaders.
+
+    Returns:
+        list[Graphemy]: The model instances, in order.
+    """
+    instances = []
+    primed = [{} for _ in tree]
+    for row in rows:
+        nested = [row.pop(node.field.__name__) for node in tree]
+        instance = get_identity(
+            model.model_validate(row),
+            context.get("identity_map"),
+        )
+        instances.append(instance)
+        for i, (node, value) in enumerate(zip(tree, nested, strict=True)):
+            # To-one relationships are loaded as single-item lists
+            if value is None:
+                children = []
+            elif node.field.many:
+                children = value
+            else:
+                children = [value]
+            key = GraphemyDataLoader.get_key(
+                node.field.resolve_value(instance),
+            )
+            primed[i][key] = prime_tree(
+                node.model,
+                children,
+                node.children,
+                context,
+            )
+
+    for node, data in zip(tree, primed, strict=True):
+        context[node.field.dl_name].prime_many(data)
+        prime_loaders(
+            node.model,
+            [row for value in data.values() for row in value],
+            context,
+        )
+    return instances
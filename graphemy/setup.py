@@ -1,15 +1,17 @@
 from collections.abc import Callable
+from itertools import count
 from typing import TYPE_CHECKING, ClassVar
 
 import strawberry
 from sqlalchemy.engine.base import Engine
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.sql import Select
 from sqlmodel import Session
 from strawberry.permission import BasePermission
 
 if TYPE_CHECKING:
+    from .database.advisor import IndexAdvisor
     from .models import Graphemy
 
 
@@ -20,49 +22,196 @@ class Setup:
     operations.
     """
 
-    # A dictionary of named SQLAlchemy engine instances.
+    # A dictionary of named SQLAlchemy engine instances (the primaries).
     engine: dict[str, Engine] = None
 
+    # Read replicas for each named engine, used by read-only queries.
+    replicas: ClassVar[dict[str, list[Engine]]] = {}
+
+    # How a replica is picked: "round_robin" or "least_connections".
+    replica_strategy: str = "round_robin"
+
+    # If True, reads go to the primary for the rest of a request once that
+    # request has written to it (read-your-writes).
+    sticky_reads: bool = True
+
+    # If True, root queries fold selected to-one relationships into their
+    # statement as LEFT JOINs (see graphemy.schemas.planner.plan_joins).
+    join_to_one: bool = False
+
+    # Experimental: if True, root queries and their selected relationships
+    # are compiled into a single SQL statement returning JSON.
+    single_statement: bool = False
+
+    # If True, root queries prefetch cross-engine relationships in one batch
+    # per engine and join them in memory (see Dl.prefetch).
+    prefetch_joins: bool = False
+
+    # If True, the relationships of root query rows are loaded with the root
+    # statement as a subquery instead of a list of parent keys.
+    subquery_loads: bool = False
+
+    # Per engine name counters used by the round-robin strategy.
+    replica_counters: ClassVar[dict[str, count]] = {}
+
     # A function responsible for determining whether a request
     # has permission to perform certain operations.
     permission_getter: Callable
 
-    # Indicates if the configured engine is asynchronous.
+    # If True, the query filter of a model also restricts the DataLoader
+    # statements loading it as a relationship.
+    query_filter_loads: bool = True
+
+    # Optional hook receiving each whole DataLoader batch, (model, rows,
+    # context), and returning the rows to keep.
+    dl_batch_filter: Callable | None = None
+
+    # Optional hook returning a SQLAlchemy predicate, from (model, context),
+    # added to the WHERE clause of every DataLoader statement.
+    dl_sql_filter: Callable | None = None
+
+    # Lists of filter values or keys longer than this are bound as a single
+    # array parameter instead of one parameter per value (None disables it).
+    array_in_threshold: int | None = 1000
+
+    # Optional IndexAdvisor recording the columns filtered and sorted on by
+    # each statement, with its latency (see graphemy.database.advisor).
+    index_advisor: "IndexAdvisor | None" = None
+
+    # Indicates if any of the configured engines is asynchronous. Each
+    # engine is still dispatched according to its own flavor (see is_async).
     async_engine: bool = False
 
     # A dictionary to store references to Graphemy classes by name.
     classes: ClassVar[dict[str, "Graphemy"]] = {}
 
     @classmethod
-    async def execute_query(cls, query: Select, engine: Engine) -> list:
+    def reads_primary(cls, name: str, context: dict | None = None) -> bool:
+        """
+        Tell whether the reads of the current request on a named engine all go
+        to its primary, rather than to replicas picked in turn that may lag
+        differently.
+
+        Args:
+            name (str): The key name of the engine in the 'engine' dict.
+            context (dict | None, optional): The GraphQL context of the current
+                request, used to track read-your-writes stickiness.
+
+        Returns:
+            bool: True if every read runs on the primary engine.
+        """
+        return not cls.replicas.get(name) or (
+            cls.sticky_reads
+            and context is not None
+            and name in context.get("written_engines", ())
+        )
+
+    @classmethod
+    def get_engine(
+        cls,
+        name: str,
+        context: dict | None = None,
+        *,
+        write: bool = False,
+    ) -> Engine:
+        """
+        Resolve the engine to use for an operation on a named engine.
+
+        Writes always go to the primary. Reads go to one of the configured
+        replicas, unless the current request already wrote to this engine
+        and `sticky_reads` is enabled, in which case the primary is used so
+        the request can read its own writes.
+
+        Args:
+            name (str): The key name of the engine in the 'engine' dict.
+            context (dict | None, optional): The GraphQL context of the current
+                request, used to track read-your-writes stickiness.
+            write (bool, optional): Whether the operation writes data.
+
+        Returns:
+            Engine: The engine the operation should run on.
+        """
+        if write or cls.reads_primary(name, context):
+            return cls.engine[name]
+
+        replicas = cls.replicas[name]
+
+        if cls.replica_strategy == "least_connections":
+            return min(replicas, key=checked_out_connections)
+
+        counter = cls.replica_counters.setdefault(name, count())
+        return replicas[next(counter) % len(replicas)]
+
+    @staticmethod
+    def is_async(engine: Engine | AsyncEngine) -> bool:
+        """
+        Check whether an engine must be used through asynchronous sessions.
+
+        Args:
+            engine (Engine | AsyncEngine): A SQLAlchemy engine.
+
+        Returns:
+            bool: True for AsyncEngine instances, False for sync engines.
+        """
+        return isinstance(engine, AsyncEngine)
+
+    @classmethod
+    def mark_written(cls, name: str, context: dict | None) -> None:
+        """
+        Record that the current request wrote to a named engine, so that
+        subsequent reads in the same request are routed to its primary.
+
+        Args:
+            name (str): The key name of the engine that was written to.
+            context (dict | None): The GraphQL context of the current request.
+        """
+        if context is not None:
+            context.setdefault("written_engines", set()).add(name)
+
+    @classmethod
+    async def execute_query(
+        cls,
+        query: Select,
+        engine: str,
+        context: dict | None = None,
+        *,
+        scalars: bool = True,
+    ) -> list:
         """
         Execute a SQL query using either an asynchronous or synchronous
-        SQLAlchemy session, depending on the configured engine.
+        SQLAlchemy session, depending on the flavor of the resolved engine.
 
         Args:
             query (Select): The SQL query to execute.
-            engine (Engine): The key name of the engine in the 'engine' dict
-                or the actual engine object.
+            engine (str): The key name of the engine in the 'engine' dict.
+            context (dict | None, optional): The GraphQL context of the current
+                request, used to pick a replica or the primary.
+            scalars (bool, optional): Whether to return only the first entity
+                of each row. Set it to False for selects of several entities
+                or columns to get full rows. Defaults to True.
 
         Returns:
             list: A list of results from the executed query.
         """
+        # Read queries may be served by a replica
+        bind = cls.get_engine(engine, context)
 
-        # If an asynchronous engine is configured, use an AsyncSession.
-        if cls.async_engine:
+        # If the engine is asynchronous, use an AsyncSession.
+        if cls.is_async(bind):
             async_session = sessionmaker(
-                cls.engine[engine],  # Retrieve the engine by key
+                bind,
                 class_=AsyncSession,
                 expire_on_commit=False,
             )
             async with async_session() as session:
                 # Execute the provided query asynchronously
                 r = await session.execute(query)
-                return r.scalars().all()
+                return r.scalars().all() if scalars else r.all()
         else:
             # Otherwise, use a standard synchronous session
-            with Session(cls.engine[engine]) as session:
-                return session.exec(query).all()
+            with Session(bind) as session:
+                r = session.execute(query)
+                return r.scalars().all() if scalars else r.all()
 
     @classmethod
     def setup(
@@ -70,6 +219,19 @@ class Setup:
         engine: dict[str, Engine] | Engine,
         permission_getter: Callable | None = None,
         query_filter: Callable | None = None,
+        replicas: dict[str, list[Engine]] | list[Engine] | None = None,
+        replica_strategy: str = "round_robin",
+        *,
+        sticky_reads: bool = True,
+        prefetch_joins: bool = False,
+        join_to_one: bool = False,
+        single_statement: bool = False,
+        subquery_loads: bool = False,
+        dl_batch_filter: Callable | None = None,
+        dl_sql_filter: Callable | None = None,
+        query_filter_loads: bool = True,
+        array_in_threshold: int | None = 1000,
+        index_advisor: "IndexAdvisor | None" = None,
     ) -> None:
         """
         Configure the Setup class with a database engine (or engines),
@@ -77,7 +239,10 @@ class Setup:
 
         - If a single engine is passed, it is stored under 'default'.
         - If a dict of engines is passed, each key/value becomes a named engine.
-        - If the engine is async-based, 'async_engine' is set to True.
+        - Each engine may be sync or async; 'async_engine' is set to True
+          if any of them is async.
+        - If replicas are passed, reads of the matching named engine are
+          spread across them while writes keep using the primary.
 
         Args:
             engine (dict[str, Engine] | Engine):
@@ -89,6 +254,44 @@ class Setup:
                 A function used to filter queries based on conditions, such as
                 user permissions or contextual data. Defaults to a function
                 that returns True for all queries.
+            replicas (dict[str, list[Engine]] | list[Engine] | None, optional):
+                Read replicas for each named engine. A list is used for the
+                'default' engine. Defaults to None (no replicas).
+            replica_strategy (str, optional): How a replica is chosen for a
+                read, either "round_robin" or "least_connections".
+                Defaults to "round_robin".
+            sticky_reads (bool, optional): Whether reads go to the primary for
+                the rest of a request after it wrote to that engine.
+                Defaults to True.
+            prefetch_joins (bool, optional): Whether root queries prefetch
+                cross-engine relationships and join them in memory.
+                Defaults to False.
+            join_to_one (bool, optional): Whether root queries load selected
+                to-one relationships through LEFT JOINs. Defaults to False.
+            single_statement (bool, optional): Experimental. Whether root queries
+                compile their selected relationships into one SQL statement
+                returning JSON. Defaults to False.
+            subquery_loads (bool, optional): Whether the relationships of root
+                query rows are loaded with `IN (SELECT ...)` subqueries of the
+                root statement. Defaults to False.
+            dl_batch_filter (Callable | None, optional): A function receiving
+                (model, rows, context) once per DataLoader batch and returning
+                the rows to keep. Defaults to None.
+            dl_sql_filter (Callable | None, optional): A function receiving
+                (model, context) and returning a SQLAlchemy predicate added to
+                every DataLoader statement, or None. Defaults to None.
+            query_filter_loads (bool, optional): Whether the query filter also
+                restricts the relationships loaded by DataLoaders.
+                Defaults to True.
+            array_in_threshold (int | None, optional): Length above which `in`
+                lists and DataLoader keys are bound as one array parameter, or
+                None to always bind one parameter per value. Defaults to 1000.
+            index_advisor (IndexAdvisor | None, optional): An advisor recording
+                the filtered and sorted columns of every statement.
+                Defaults to None.
+
+        Raises:
+            ValueError: If an unknown replica strategy is given.
         """
         # Store the engine(s). If a single engine is passed, wrap it in a dict.
         if isinstance(engine, dict):
@@ -96,9 +299,31 @@ class Setup:
         else:
             cls.engine = {"default": engine}
 
-        # Detect if the engine is async by checking the module name
-        if engine and "async" in cls.engine["default"].__module__:
-            cls.async_engine = True
+        if replica_strategy not in {"round_robin", "least_connections"}:
+            error_text = f"Unknown replica strategy: {replica_strategy}."
+            raise ValueError(error_text)
+
+        # Store the replicas. If a single list is passed, it belongs to 'default'.
+        if isinstance(replicas, list):
+            replicas = {"default": replicas}
+        cls.replicas = replicas or {}
+        cls.replica_strategy = replica_strategy
+        cls.sticky_reads = sticky_reads
+        cls.prefetch_joins = prefetch_joins
+        cls.join_to_one = join_to_one
+        cls.single_statement = single_statement
+        cls.subquery_loads = subquery_loads
+        cls.dl_batch_filter = dl_batch_filter
+        cls.dl_sql_filter = dl_sql_filter
+        cls.query_filter_loads = query_filter_loads
+        cls.array_in_threshold = array_in_threshold
+        cls.index_advisor = index_advisor
+        cls.replica_counters = {}
+
+        # Flag whether any engine is async (each one is dispatched separately)
+        cls.async_engine = any(
+            cls.is_async(e) for e in cls.engine.values() if e is not None
+        )
 
         # Store or create a default query filter
         if query_filter:
@@ -129,6 +354,33 @@ class Setup:
 
             cls.permission_getter = permission_getter
 
+    @classmethod
+    def get_query_filter(
+        cls,
+        model: "Graphemy",
+        context: dict | None,
+    ) -> object:
+        """
+        Return the query filter predicate of a model for the current request.
+
+        The predicate is computed once per model and request, and cached in
+        the request context (`query_filters`), since it depends only on the
+        model and the requesting principal.
+
+        Args:
+            model (Graphemy): The Graphemy module/class being queried.
+            context (dict | None): The GraphQL context of the current request.
+
+        Returns:
+            object: A SQLAlchemy predicate, or True when rows aren't filtered.
+        """
+        cache = context.get("query_filters") if context is not None else None
+        if cache is None:
+            return cls.query_filter(model, context)
+        if model not in cache:
+            cache[model] = cls.query_filter(model, context)
+        return cache[model]
+
     @classmethod
     async def has_permission(
         cls,
@@ -217,3 +469,21 @@ class Setup:
                 return True
 
         return IsAuthenticated
+
+
+def checked_out_connections(engine: Engine) -> int:
+    """
+    Count the connections currently checked out from an engine's pool.
+
+    Pools that don't track checked out connections (e.g. StaticPool) count
+    as idle.
+
+    Args:
+        engine (Engine): A sync or async SQLAlchemy engine.
+
+    Returns:
+        int: The number of connections in use.
+    """
+    pool = getattr(engine, "sync_engine", engine).pool
+    checkedout = getattr(pool, "checkedout", None)
+    return checkedout() if checkedout else 0
@@ -100,3 +100,75 @@ async def test_async_delete(client_async):
     )
     assert response.status_code == 200
     assert response.json() == {"data": {"deleteUser": {"id": 1}}}
+
+
+@pytest.mark.asyncio
+async def test_mixed_engines(client_async):
+    from fastapi import FastAPI
+    from httpx import AsyncClient
+    from sqlalchemy.ext.asyncio import create_async_engine
+    from sqlmodel import Session, create_engine
+    from sqlmodel.pool import StaticPool
+
+    from graphemy import Dl, Field, Graphemy, GraphemyRouter, Setup
+
+    class Customer(Graphemy, table=True):
+        __enginename__ = "oltp"
+        __enable_put_mutation__ = True
+        id: int | None = Field(primary_key=True, default=None)
+        name: str
+        visits: list["Visit"] = Dl(source="id", target="customer_id")
+
+    class Visit(Graphemy, table=True):
+        __enginename__ = "analytics"
+        __enable_put_mutation__ = True
+        id: int | None = Field(primary_key=True, default=None)
+        customer_id: int
+
+    oltp = create_async_engine(
+        "sqlite+aiosqlite:///",
+        connect_args={"check_same_thread": False},
+    )
+    analytics = create_engine(
+        "sqlite://",
+        poolclass=StaticPool,
+        connect_args={"check_same_thread": False},
+    )
+    async with oltp.begin() as conn:
+        await conn.run_sync(Graphemy.metadata.create_all)
+    Graphemy.metadata.create_all(analytics)
+    with Session(analytics) as session:
+        session.add(Visit(customer_id=1))
+        session.commit()
+
+    app = FastAPI()
+    # No "default" engine: each model uses its own, sync or async
+    router = GraphemyRouter(engine={"oltp": oltp, "analytics": analytics})
+    app.include_router(router, prefix="/graphql")
+    assert not Setup.is_async(Setup.engine["analytics"])
+    assert Setup.is_async(Setup.engine["oltp"])
+
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        response = await client.post(
+            "http://test/graphql",
+            json={
+                "query": """mutation {
+                    putCustomer(params: {name: "Some Name"}) { id }
+                    putVisit(params: {customerId: 1}) { id }
+                }""",
+            },
+        )
+        assert response.json() == {
+            "data": {"putCustomer": {"id": 1}, "putVisit": {"id": 2}},
+        }
+        response = await client.post(
+            "http://test/graphql",
+            json={"query": "query { customers { name visits { id } } }"},
+        )
+    assert response.json() == {
+        "data": {
+            "customers": [
+                {"name": "Some Name", "visits": [{"id": 1}, {"id": 2}]},
+            ],
+        },
+    }
@@ -146,3 +146,130 @@ def test_dl_filter(client_auth):
             ],
         },
     }
+
+
+def test_query_filter_loads(client_auth):
+    from sqlalchemy import event
+
+    from examples.tutorial.auth import main
+
+    statements = []
+
+    def record(_conn, _cursor, statement, *_args):
+        statements.append(statement)
+
+    event.listen(main.engine, "before_cursor_execute", record)
+    response = client_auth.post(
+        "/graphql",
+        json={"query": "query { owners { id resources { id } } }"},
+    )
+    event.remove(main.engine, "before_cursor_execute", record)
+    assert response.json() == {
+        "data": {"owners": [{"id": "1", "resources": [{"id": 1}, {"id": 2}]}]},
+    }
+    # The row-level rule of resources is part of the relationship statement
+    assert "resource.category IN" in statements[-1]
+
+
+def test_relation_filter_permission(client_auth):
+    # Related rows the user can't read can't be filtered on either
+    response = client_auth.post(
+        "/graphql",
+        json={
+            "query": """query MyQuery {
+                owners(where: {privates: {some: {description: {like: "Extra%"}}}}) {
+                    id
+                }
+            }""",
+        },
+    )
+    assert response.json() == {
+        "data": None,
+        "errors": [
+            {
+                "message": "Filtering on privates is not allowed.",
+                "locations": [{"line": 2, "column": 17}],
+                "path": ["owners"],
+            },
+        ],
+    }
+
+
+def test_dl_batch_and_sql_filter():
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from sqlalchemy import event
+    from sqlmodel import Session, create_engine
+    from sqlmodel.pool import StaticPool
+
+    from graphemy import Dl, Field, Graphemy, GraphemyRouter, Setup
+
+    class Vault(Graphemy, table=True):
+        id: int | None = Field(primary_key=True, default=None)
+        name: str
+        documents: list["Document"] = Dl(source="id", target="vault_id")
+
+    class Document(Graphemy, table=True):
+        id: int | None = Field(primary_key=True, default=None)
+        vault_id: int
+        level: int
+        title: str
+
+    engine = create_engine(
+        "sqlite://",
+        poolclass=StaticPool,
+        connect_args={"check_same_thread": False},
+    )
+    Graphemy.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add(Vault(name="A"))
+        session.add(Vault(name="B"))
+        session.add(Document(vault_id=1, level=1, title="Public"))
+        session.add(Document(vault_id=1, level=3, title="Secret"))
+        session.add(Document(vault_id=2, level=1, title="Draft"))
+        session.add(Document(vault_id=2, level=2, title="Internal"))
+        session.commit()
+
+    statements = []
+    event.listen(
+        engine,
+        "before_cursor_execute",
+        lambda _conn, _cursor, statement, *_args: statements.append(statement),
+    )
+
+    batches = []
+
+    def dl_batch_filter(model, rows, _context):
+        batches.append((model.__name__, len(rows)))
+        return [row for row in rows if not row.title.startswith("D")]
+
+    def dl_sql_filter(model, _context):
+        if model.__name__ == "Document":
+            return model.level < 3
+        return None
+
+    app = FastAPI()
+    router = GraphemyRouter(
+        engine=engine,
+        dl_batch_filter=dl_batch_filter,
+        dl_sql_filter=dl_sql_filter,
+    )
+    app.include_router(router, prefix="/graphql")
+    client = TestClient(app)
+    response = client.post(
+        "/graphql",
+        json={"query": "query { vaults { name documents { title } } }"},
+    )
+    assert response.json() == {
+        "data": {
+            "vaults": [
+                {"name": "A", "documents": [{"title": "Public"}]},
+                {"name": "B", "documents": [{"title": "Internal"}]},
+            ],
+        },
+    }
+    # The secret document is never fetched, the batch is filtered once
+    assert "document.level <" in statements[-1]
+    assert batches == [("Document", 3)]
+    Setup.setup(engine)
+
@@ -145,3 +145,601 @@ def test_strawberry_class():
             ],
         },
     }
+
+
+def test_fields_metadata():
+    from datetime import date
+
+    from graphemy import Field, Graphemy
+    from graphemy.database.utils import get_fields_metadata, multiple_sort
+
+    class Event(Graphemy, table=True):
+        id: int | None = Field(primary_key=True, default=None)
+        name: str
+        day: date | None
+
+    metadata = get_fields_metadata(Event)
+    assert list(metadata) == ["id", "name", "day"]
+    assert metadata["day"].type is date
+    assert metadata["day"].nullable
+    assert not metadata["name"].nullable
+    assert metadata["name"].column is Event.name
+    # The metadata is computed once and reused
+    assert get_fields_metadata(Event) is metadata
+
+    class Sort:
+        def __init__(self, **kwargs):
+            self.__dict__.update(kwargs)
+
+    class Desc:
+        value = "desc"
+
+    events = [
+        Event(id=1, name="a", day=date(2020, 1, 1)),
+        Event(id=2, name="b", day=date(2021, 1, 1)),
+    ]
+    result = multiple_sort(Event, events, [Sort(day=Desc(), name=None)])
+    assert [e.id for e in result] == [2, 1]
+
+
+def test_auto_indexes_and_advisor():
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from sqlalchemy import inspect
+    from sqlmodel import Session, create_engine
+    from sqlmodel.pool import StaticPool
+
+    from graphemy import Dl, Field, Graphemy, GraphemyRouter, Setup
+
+    class Publisher(Graphemy, table=True):
+        id: int | None = Field(primary_key=True, default=None)
+        name: str
+        magazines: list["Magazine"] = Dl(source="id", target="publisher_id")
+
+    class Magazine(Graphemy, table=True):
+        id: int | None = Field(primary_key=True, default=None)
+        publisher_id: int
+        title: str
+        issue: int = Field(index=True)
+        publisher: "Publisher" = Dl(source="publisher_id", target="id")
+
+    engine = create_engine(
+        "sqlite://",
+        poolclass=StaticPool,
+        connect_args={"check_same_thread": False},
+    )
+    app = FastAPI()
+    router = GraphemyRouter(engine=engine, auto_indexes=True, index_advisor=True)
+    app.include_router(router, prefix="/graphql")
+    Graphemy.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add(Publisher(name="P"))
+        session.add(Magazine(publisher_id=1, title="A", issue=1))
+        session.commit()
+
+    # List targets are indexed, primary keys already are
+    assert {index["name"] for index in inspect(engine).get_indexes("magazine")} == {
+        "ix_magazine_issue",
+        "ix_magazine_publisher_id",
+    }
+    assert inspect(engine).get_indexes("publisher") == []
+
+    client = TestClient(app)
+    response = client.post(
+        "/graphql",
+        json={
+            "query": """query {
+                magazines(where: {title: {like: "A%"}, issue: {in: [1]}}, orderBy: {title: asc}) {
+                    title
+                }
+                publishers { magazines { title } }
+            }""",
+        },
+    )
+    assert response.json()["data"]["magazines"] == [{"title": "A"}]
+
+    # Only the unindexed column is reported
+    report = Setup.index_advisor.report()
+    assert [(entry["model"], entry["column"]) for entry in report] == [
+        ("Magazine", "title"),
+    ]
+    assert report[0]["queries"] == 1
+    assert report[0]["statement"] == (
+        "CREATE INDEX ix_magazine_title ON magazine (title)"
+    )
+    Setup.setup(engine)
+
+
+def test_recursive_relationships():
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from sqlalchemy import event
+    from sqlmodel import Session, create_engine
+    from sqlmodel.pool import StaticPool
+
+    from graphemy import Dl, Field, Graphemy, GraphemyRouter, Setup
+
+    class Category(Graphemy, table=True):
+        id: int | None = Field(primary_key=True, default=None)
+        parent_id: int | None = None
+        name: str
+        descendants: list["Category"] = Dl(
+            source="id",
+            target="parent_id",
+            recursive=True,
+        )
+        children_and_grandchildren: list["Category"] = Dl(
+            source="id",
+            target="parent_id",
+            recursive=True,
+            max_depth=2,
+        )
+        ancestors: list["Category"] = Dl(
+            source="parent_id",
+            target="id",
+            recursive=True,
+        )
+
+    engine = create_engine(
+        "sqlite://",
+        poolclass=StaticPool,
+        connect_args={"check_same_thread": False},
+    )
+    Graphemy.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add(Category(name="root"))
+        session.add(Category(name="a", parent_id=1))
+        session.add(Category(name="b", parent_id=1))
+        session.add(Category(name="a1", parent_id=2))
+        session.add(Category(name="a1x", parent_id=4))
+        session.commit()
+
+    app = FastAPI()
+    app.include_router(GraphemyRouter(engine=engine), prefix="/graphql")
+    client = TestClient(app)
+
+    statements = []
+
+    def count(*_args):
+        statements.append(1)
+
+    event.listen(engine, "before_cursor_execute", count)
+    response = client.post(
+        "/graphql",
+        json={
+            "query": """query {
+                categorys(orderBy: {id: asc}) {
+                    name
+                    descendants(orderBy: {id: asc}) { name }
+                    childrenAndGrandchildren(orderBy: {id: asc}) { name }
+                    ancestors(orderBy: {id: asc}) { name }
+                }
+            }""",
+        },
+    )
+    event.remove(engine, "before_cursor_execute", count)
+
+    # One statement for the roots and one per recursive relationship
+    assert len(statements) == 4
+    root, a, b, a1, a1x = response.json()["data"]["categorys"]
+    assert [c["name"] for c in root["descendants"]] == ["a", "b", "a1", "a1x"]
+    assert [c["name"] for c in root["childrenAndGrandchildren"]] == [
+        "a",
+        "b",
+        "a1",
+    ]
+    assert [c["name"] for c in a["descendants"]] == ["a1", "a1x"]
+    assert [c["name"] for c in a1x["ancestors"]] == ["root", "a", "a1"]
+    assert b["descendants"] == []
+    assert root["ancestors"] == []
+    Setup.setup(engine)
+
+
+def test_many_to_many_through():
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from sqlalchemy import event
+    from sqlmodel import Session, create_engine
+    from sqlmodel.pool import StaticPool
+
+    from graphemy import Dl, Field, Graphemy, GraphemyRouter, Setup
+
+    class PostTag(Graphemy, table=True):
+        post_id: int = Field(primary_key=True)
+        tag_id: int = Field(primary_key=True)
+
+    class Post(Graphemy, table=True):
+        id: int | None = Field(primary_key=True, default=None)
+        title: str
+        tags: list["Tag"] = Dl(
+            source="id",
+            target="id",
+            through=PostTag,
+            through_source="post_id",
+            through_target="tag_id",
+        )
+
+    class Tag(Graphemy, table=True):
+        id: int | None = Field(primary_key=True, default=None)
+        name: str
+        posts: list["Post"] = Dl(
+            source="id",
+            target="id",
+            through="PostTag",
+            through_source="tag_id",
+            through_target="post_id",
+        )
+
+    engine = create_engine(
+        "sqlite://",
+        poolclass=StaticPool,
+        connect_args={"check_same_thread": False},
+    )
+    Graphemy.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add(Post(title="first"))
+        session.add(Post(title="second"))
+        session.add(Tag(name="python"))
+        session.add(Tag(name="sql"))
+        session.add(PostTag(post_id=1, tag_id=1))
+        session.add(PostTag(post_id=1, tag_id=2))
+        session.add(PostTag(post_id=2, tag_id=2))
+        session.commit()
+
+    app = FastAPI()
+    app.include_router(GraphemyRouter(engine=engine), prefix="/graphql")
+    client = TestClient(app)
+
+    statements = []
+
+    def count(*_args):
+        statements.append(1)
+
+    event.listen(engine, "before_cursor_execute", count)
+    response = client.post(
+        "/graphql",
+        json={
+            "query": """query {
+                posts(orderBy: {id: asc}) {
+                    title
+                    tags(orderBy: {id: asc}) {
+                        name
+                        posts(where: {title: {in: ["second"]}}) { title }
+                    }
+                }
+            }""",
+        },
+    )
+    event.remove(engine, "before_cursor_execute", count)
+
+    # One statement per level, the association rows are never loaded
+    assert len(statements) == 3
+    assert response.json()["data"]["posts"] == [
+        {
+            "title": "first",
+            "tags": [
+                {"name": "python", "posts": []},
+                {"name": "sql", "posts": [{"title": "second"}]},
+            ],
+        },
+        {
+            "title": "second",
+            "tags": [{"name": "sql", "posts": [{"title": "second"}]}],
+        },
+    ]
+    Setup.setup(engine)
+
+
+def test_computed_fields():
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from sqlalchemy import event
+    from sqlmodel import Session, create_engine
+    from sqlmodel.pool import StaticPool
+
+    from graphemy import Computed, Dl, Field, Graphemy, GraphemyRouter, Setup
+
+    class Cart(Graphemy, table=True):
+        id: int | None = Field(primary_key=True, default=None)
+        items: list["CartItem"] = Dl(source="id", target="cart_id")
+
+    class CartItem(Graphemy, table=True):
+        id: int | None = Field(primary_key=True, default=None)
+        cart_id: int
+        price: float
+        quantity: int
+        total: float = Computed(lambda cls: cls.price * cls.quantity)
+
+    engine = create_engine(
+        "sqlite://",
+        poolclass=StaticPool,
+        connect_args={"check_same_thread": False},
+    )
+    Graphemy.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add(Cart())
+        session.add(CartItem(cart_id=1, price=2.5, quantity=4))
+        session.add(CartItem(cart_id=1, price=3, quantity=1))
+        session.add(CartItem(cart_id=1, price=1, quantity=2))
+        session.commit()
+
+    app = FastAPI()
+    app.include_router(GraphemyRouter(engine=engine), prefix="/graphql")
+    client = TestClient(app)
+
+    statements = []
+
+    def record(_conn, _cursor, statement, *_args):
+        statements.append(statement)
+
+    def query(text):
+        statements.clear()
+        event.listen(engine, "before_cursor_execute", record)
+        response = client.post("/graphql", json={"query": text})
+        event.remove(engine, "before_cursor_execute", record)
+        return response.json()["data"]
+
+    # Filtered and sorted in SQL, projected with the rows
+    assert query(
+        "{ cartItems(where: {total: {gte: 2}}, orderBy: {total: desc}) { id total } }",
+    ) == {
+        "cartItems": [
+            {"id": 1, "total": 10.0},
+            {"id": 2, "total": 3.0},
+            {"id": 3, "total": 2.0},
+        ],
+    }
+    assert len(statements) == 1
+    assert "price * cart_item.quantity AS" in statements[0]
+
+    # Not projected unless selected
+    query("{ cartItems(where: {total: {gt: 2}}) { id } }")
+    assert "AS anon" not in statements[0]
+    assert "price * cart_item.quantity >" in statements[0]
+
+    # Relationships project it too, with several filters in one statement
+    assert query(
+        """{ carts {
+            big: items(where: {total: {gt: 5}}) { total }
+            sorted: items(orderBy: {total: asc}) { total }
+        } }""",
+    ) == {
+        "carts": [
+            {
+                "big": [{"total": 10.0}],
+                "sorted": [{"total": 2.0}, {"total": 3.0}, {"total": 10.0}],
+            },
+        ],
+    }
+    assert len(statements) == 2
+    Setup.setup(engine)
+
+
+def test_batch_field():
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from sqlmodel import Session, create_engine, func, select
+    from sqlmodel.pool import StaticPool
+
+    from graphemy import Dl, Field, Graphemy, GraphemyRouter, Setup, batch_field
+
+    calls = []
+
+    class Author(Graphemy, table=True):
+        id: int | None = Field(primary_key=True, default=None)
+        name: str
+        books: list["Book"] = Dl(source="id", target="author_id")
+
+        class Strawberry:
+            @batch_field
+            async def book_count(authors: list["Author"], context: dict) -> list[int]:
+                calls.append([author.id for author in authors])
+                counts = dict(
+                    await Setup.execute_query(
+                        select(Book.author_id, func.count())
+                        .where(Book.author_id.in_([a.id for a in authors]))
+                        .group_by(Book.author_id),
+                        "default",
+                        context,
+                        scalars=False,
+                    ),
+                )
+                return [counts.get(author.id, 0) for author in authors]
+
+    class Book(Graphemy, table=True):
+        id: int | None = Field(primary_key=True, default=None)
+        author_id: int
+        author: "Author" = Dl(source="author_id", target="id")
+
+    engine = create_engine(
+        "sqlite://",
+        poolclass=StaticPool,
+        connect_args={"check_same_thread": False},
+    )
+    Graphemy.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add(Author(name="A"))
+        session.add(Author(name="B"))
+        session.add(Book(author_id=1))
+        session.add(Book(author_id=1))
+        session.commit()
+
+    app = FastAPI()
+    app.include_router(GraphemyRouter(engine=engine), prefix="/graphql")
+    client = TestClient(app)
+    response = client.post(
+        "/graphql",
+        json={"query": "{ authors { name bookCount } }"},
+    )
+    assert response.json() == {
+        "data": {
+            "authors": [
+                {"name": "A", "bookCount": 2},
+                {"name": "B", "bookCount": 0},
+            ],
+        },
+    }
+    # One call for every author of the tick
+    assert calls == [[1, 2]]
+    Setup.setup(engine)
+
+
+def test_statement_relationships():
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from sqlalchemy import event
+    from sqlalchemy.orm import aliased
+    from sqlmodel import Session, create_engine, func, select
+    from sqlmodel.pool import StaticPool
+
+    from graphemy import Dl, Field, Graphemy, GraphemyRouter, Setup
+
+    def best_novels(keys):
+        ranked = (
+            select(
+                Novel,
+                func.row_number()
+                .over(partition_by=Novel.writer_id, order_by=Novel.rating.desc())
+                .label("position"),
+            )
+            .where(Novel.writer_id.in_(keys))
+            .subquery()
+        )
+        return select(aliased(Novel, ranked)).where(ranked.c.position <= 2)
+
+    class Writer(Graphemy, table=True):
+        id: int | None = Field(primary_key=True, default=None)
+        name: str
+        best: list["Novel"] = Dl(
+            source="id",
+            target="writer_id",
+            statement=best_novels,
+        )
+
+    class Novel(Graphemy, table=True):
+        id: int | None = Field(primary_key=True, default=None)
+        writer_id: int
+        title: str
+        rating: int
+
+    engine = create_engine(
+        "sqlite://",
+        poolclass=StaticPool,
+        connect_args={"check_same_thread": False},
+    )
+    Graphemy.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add(Writer(name="A"))
+        session.add(Writer(name="B"))
+        for writer_id, title, rating in [
+            (1, "a1", 3),
+            (1, "a2", 5),
+            (1, "a3", 4),
+            (2, "b1", 1),
+        ]:
+            session.add(Novel(writer_id=writer_id, title=title, rating=rating))
+        session.commit()
+
+    app = FastAPI()
+    app.include_router(GraphemyRouter(engine=engine), prefix="/graphql")
+    client = TestClient(app)
+
+    statements = []
+
+    def count(*_args):
+        statements.append(1)
+
+    event.listen(engine, "before_cursor_execute", count)
+    response = client.post(
+        "/graphql",
+        json={
+            "query": """query {
+                writers(orderBy: {id: asc}) {
+                    name
+                    best(orderBy: {rating: desc}) { title }
+                    liked: best(where: {rating: {gte: 4}}) { title }
+                }
+            }""",
+        },
+    )
+    event.remove(engine, "before_cursor_execute", count)
+
+    # One statement per filter, for every writer
+    assert len(statements) == 3
+    assert response.json()["data"]["writers"] == [
+        {
+            "name": "A",
+            "best": [{"title": "a2"}, {"title": "a3"}],
+            "liked": [{"title": "a2"}, {"title": "a3"}],
+        },
+        {"name": "B", "best": [{"title": "b1"}], "liked": []},
+    ]
+    Setup.setup(engine)
+
+
+def test_statement_relationships_not_primed():
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from sqlmodel import Session, create_engine, func, select
+    from sqlmodel.pool import StaticPool
+
+    from graphemy import Dl, Field, Graphemy, GraphemyRouter, Setup
+
+    class Poet(Graphemy, table=True):
+        id: int | None = Field(primary_key=True, default=None)
+        name: str
+        shouty: list["Poem"] = Dl(
+            source="id",
+            target="poet_id",
+            statement=lambda keys: select(
+                Poem.id,
+                Poem.poet_id,
+                func.upper(Poem.title).label("title"),
+            ).where(Poem.poet_id.in_(keys)),
+        )
+
+    class Poem(Graphemy, table=True):
+        id: int | None = Field(primary_key=True, default=None)
+        poet_id: int
+        title: str
+        reviews: list["PoemReview"] = Dl(source="id", target="poem_id")
+
+    class PoemReview(Graphemy, table=True):
+        id: int | None = Field(primary_key=True, default=None)
+        poem_id: int
+        poem: "Poem" = Dl(source="poem_id", target="id")
+
+    engine = create_engine(
+        "sqlite://",
+        poolclass=StaticPool,
+        connect_args={"check_same_thread": False},
+    )
+    Graphemy.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add(Poet(name="A"))
+        session.add(Poem(poet_id=1, title="quiet"))
+        session.add(PoemReview(poem_id=1))
+        session.commit()
+
+    app = FastAPI()
+    app.include_router(GraphemyRouter(engine=engine), prefix="/graphql")
+    client = TestClient(app)
+    response = client.post(
+        "/graphql",
+        json={
+            "query": """query {
+                poets {
+                    shouty { title reviews { poem { title } } }
+                }
+            }""",
+        },
+    )
+    # Derived rows are not cached as the poems loaded by their primary key
+    assert response.json()["data"]["poets"] == [
+        {
+            "shouty": [
+                {"title": "QUIET", "reviews": [{"poem": {"title": "quiet"}}]},
+            ],
+        },
+    ]
+    Setup.setup(engine)
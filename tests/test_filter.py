@@ -266,4 +266,35 @@ def test_not(client_data):
       }
     ]
   }
-}
\ No newline at end of file
+}
+
+
+def test_query_relation_filter(client_data):
+    response = client_data.post(
+        "/graphql",
+        json={
+            "query": """query MyQuery {
+                            some: students (where: {courses: {some: {course: {some: {name: {like: "Phys%"}}}}}}){
+                                id
+                                }
+                            none: students (where: {courses: {none: {courseId: {in: 2}}}}){
+                                id
+                                }
+                            every: students (where: {courses: {every: {courseId: {in: 1}}}}){
+                                id
+                                }
+                            grades (where: {studentCourse: {some: {studentId: {in: 2}}}}){
+                                grade
+                                }
+                            }""",
+        },
+    )
+    assert response.status_code == 200
+    assert response.json() == {
+        "data": {
+            "some": [{"id": 1}, {"id": 2}],
+            "none": [{"id": 3}],
+            "every": [{"id": 3}],
+            "grades": [{"grade": 8.0}],
+        },
+    }
@@ -138,3 +138,301 @@ def test_multi_key(client_data):
             ],
         },
     }
+
+
+def test_join_to_one(client_data):
+    from sqlalchemy import event
+
+    from examples.tutorial.relationship import main
+    from graphemy import Setup
+
+    # Same as GraphemyRouter(join_to_one=True)
+    Setup.join_to_one = True
+    statements = []
+
+    def count(*_args, **_kwargs):
+        statements.append(1)
+
+    event.listen(main.engine, "before_cursor_execute", count)
+    response = client_data.post(
+        "/graphql",
+        json={
+            "query": """query MyQuery {
+  courses {
+    name
+    teacher {
+      name
+      school { name }
+    }
+  }
+}""",
+        },
+    )
+    event.remove(main.engine, "before_cursor_execute", count)
+    assert response.status_code == 200
+    assert response.json() == {
+        "data": {
+            "courses": [
+                {
+                    "name": "Mathematics",
+                    "teacher": {
+                        "name": "Some Teacher",
+                        "school": {"name": "Some School"},
+                    },
+                },
+                {
+                    "name": "Physics",
+                    "teacher": {
+                        "name": "Some Teacher",
+                        "school": {"name": "Some School"},
+                    },
+                },
+            ],
+        },
+    }
+    # Both levels of to-one relationships are joined to the root statement
+    assert len(statements) == 1
+    Setup.join_to_one = False
+
+
+def test_filter_groups_union(client_data):
+    from sqlalchemy import event
+
+    from examples.tutorial.relationship import main
+
+    statements = []
+
+    def count(_conn, _cursor, statement, *_args, **_kwargs):
+        statements.append(statement)
+
+    event.listen(main.engine, "before_cursor_execute", count)
+    response = client_data.post(
+        "/graphql",
+        json={
+            "query": """query MyQuery {
+  teachers {
+    math: courses(where: {name: {in: ["Mathematics"]}}) { name }
+    physics: courses(where: {name: {like: "Phy%"}}) { name }
+    none: courses(where: {name: {in: ["History"]}}) { name }
+  }
+}""",
+        },
+    )
+    event.remove(main.engine, "before_cursor_execute", count)
+    assert response.status_code == 200
+    assert response.json() == {
+        "data": {
+            "teachers": [
+                {
+                    "math": [{"name": "Mathematics"}],
+                    "physics": [{"name": "Physics"}],
+                    "none": [],
+                },
+            ],
+        },
+    }
+    # The three filter groups are loaded with a single UNION ALL statement
+    assert len(statements) == 2
+    assert statements[1].count("UNION ALL") == 2
+
+
+def test_relationship_aggregates(client_data):
+    from sqlalchemy import event
+
+    from examples.tutorial.relationship import main
+
+    statements = []
+
+    def count(_conn, _cursor, statement, *_args, **_kwargs):
+        statements.append(statement)
+
+    event.listen(main.engine, "before_cursor_execute", count)
+    response = client_data.post(
+        "/graphql",
+        json={
+            "query": """query MyQuery {
+  courses {
+    name
+    studentsCount
+    first: studentsCount(where: {studentId: {in: [1]}})
+  }
+}""",
+        },
+    )
+    event.remove(main.engine, "before_cursor_execute", count)
+    assert response.status_code == 200
+    assert response.json() == {
+        "data": {
+            "courses": [
+                {"name": "Mathematics", "studentsCount": 3, "first": 1},
+                {"name": "Physics", "studentsCount": 2, "first": 1},
+            ],
+        },
+    }
+    # One GROUP BY statement per filter, for every course
+    assert len(statements) == 3
+    assert "GROUP BY" in statements[1]
+
+    response = client_data.post(
+        "/graphql",
+        json={
+            "query": """query MyQuery {
+  schools {
+    studentsAggregate { count min { birthDate } max { name } }
+  }
+  studentCourses(where: {studentId: {in: [1, 3]}}) {
+    graderAggregate { count sum { grade } avg { grade semester } max { grade } }
+  }
+}""",
+        },
+    )
+    assert response.status_code == 200
+    assert response.json() == {
+        "data": {
+            "schools": [
+                {
+                    "studentsAggregate": {
+                        "count": 3,
+                        "min": {"birthDate": "1998-05-12"},
+                        "max": {"name": "Some Name"},
+                    },
+                },
+            ],
+            "studentCourses": [
+                {
+                    "graderAggregate": {
+                        "count": 1,
+                        "sum": {"grade": 10.0},
+                        "avg": {"grade": 10.0, "semester": 1.0},
+                        "max": {"grade": 10.0},
+                    },
+                },
+                {
+                    "graderAggregate": {
+                        "count": 1,
+                        "sum": {"grade": 9.0},
+                        "avg": {"grade": 9.0, "semester": 1.0},
+                        "max": {"grade": 9.0},
+                    },
+                },
+                {
+                    "graderAggregate": {
+                        "count": 0,
+                        "sum": None,
+                        "avg": None,
+                        "max": None,
+                    },
+                },
+            ],
+        },
+    }
+
+
+def test_root_aggregates(client_data):
+    response = client_data.post(
+        "/graphql",
+        json={
+            "query": """query MyQuery {
+  gradesAggregate(where: {semester: {in: [1]}}) {
+    group { courseId }
+    aggregate { count sum { grade } avg { grade } }
+  }
+  byCourse: gradesAggregate(groupBy: [courseId]) {
+    group { courseId }
+    aggregate { count min { grade } max { grade } }
+  }
+  studentsAggregate(where: {name: {like: "None%"}}) {
+    aggregate { count max { birthDate } }
+  }
+}""",
+        },
+    )
+    assert response.status_code == 200
+    assert response.json() == {
+        "data": {
+            "gradesAggregate": [
+                {
+                    "group": None,
+                    "aggregate": {
+                        "count": 3,
+                        "sum": {"grade": 27.0},
+                        "avg": {"grade": 9.0},
+                    },
+                },
+            ],
+            "byCourse": [
+                {
+                    "group": {"courseId": 1},
+                    "aggregate": {
+                        "count": 2,
+                        "min": {"grade": 8.0},
+                        "max": {"grade": 10.0},
+                    },
+                },
+                {
+                    "group": {"courseId": 2},
+                    "aggregate": {
+                        "count": 1,
+                        "min": {"grade": 9.0},
+                        "max": {"grade": 9.0},
+                    },
+                },
+            ],
+            "studentsAggregate": [
+                {"aggregate": {"count": 0, "max": None}},
+            ],
+        },
+    }
+
+
+def test_array_in(client_data):
+    from sqlalchemy import event
+
+    from graphemy import Setup
+
+    statements = []
+
+    def record(_conn, _cursor, statement, parameters, *_args):
+        statements.append((statement, parameters))
+
+    event.listen(Setup.engine["default"], "before_cursor_execute", record)
+    Setup.array_in_threshold = 1
+    response = client_data.post(
+        "/graphql",
+        json={
+            "query": """query MyQuery {
+  students(where: {id: {in: [1, 3]}}) {
+    id
+    courses { courseId grader { grade } }
+  }
+}""",
+        },
+    )
+    # Statements binding other values are not served from the cache
+    other = client_data.post(
+        "/graphql",
+        json={"query": "query { students(where: {id: {in: [1, 2]}}) { id } }"},
+    )
+    Setup.array_in_threshold = 1000
+    event.remove(Setup.engine["default"], "before_cursor_execute", record)
+    assert other.json() == {"data": {"students": [{"id": 1}, {"id": 2}]}}
+    assert response.json() == {
+        "data": {
+            "students": [
+                {
+                    "id": 1,
+                    "courses": [
+                        {"courseId": 1, "grader": [{"grade": 10.0}]},
+                        {"courseId": 2, "grader": [{"grade": 9.0}]},
+                    ],
+                },
+                {"id": 3, "courses": [{"courseId": 1, "grader": []}]},
+            ],
+        },
+    }
+    # Each list of values or keys is bound as a single JSON array
+    assert all("json_each" in statement for statement, _ in statements)
+    assert len(statements) == 4
+    assert statements[0][1][0] == "[1, 3]"
+    assert statements[1][1][0] == "[1, 3]"
+    assert set(statements[2][1][:2]) == {"[1, 1, 3]", "[1, 2, 1]"}
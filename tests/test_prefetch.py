@@ -0,0 +1,371 @@
+def test_prefetch_cross_engine():
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from sqlalchemy import event
+    from sqlmodel import Session, create_engine
+    from sqlmodel.pool import StaticPool
+
+    from graphemy import Dl, Field, Graphemy, GraphemyRouter, Setup
+
+    class Store(Graphemy, table=True):
+        id: int | None = Field(primary_key=True, default=None)
+        name: str
+        sales: list["Sale"] = Dl(source="id", target="store_id")
+
+    class Sale(Graphemy, table=True):
+        __enginename__ = "warehouse"
+        id: int | None = Field(primary_key=True, default=None)
+        store_id: int
+        amount: int
+        store: "Store" = Dl(source="store_id", target="id")
+
+    def new_engine():
+        engine = create_engine(
+            "sqlite://",
+            poolclass=StaticPool,
+            connect_args={"check_same_thread": False},
+        )
+        Graphemy.metadata.create_all(engine)
+        return engine
+
+    engines = {"default": new_engine(), "warehouse": new_engine()}
+    with Session(engines["default"]) as session:
+        session.add(Store(name="A"))
+        session.add(Store(name="B"))
+        session.commit()
+    with Session(engines["warehouse"]) as session:
+        session.add(Sale(store_id=1, amount=10))
+        session.add(Sale(store_id=1, amount=20))
+        session.add(Sale(store_id=2, amount=30))
+        session.commit()
+
+    statements = []
+    for name, engine in engines.items():
+        event.listen(
+            engine,
+            "before_cursor_execute",
+            lambda *_args, name=name, **_kwargs: statements.append(name),
+        )
+
+    app = FastAPI()
+    router = GraphemyRouter(engine=engines, prefetch_joins=True)
+    app.include_router(router, prefix="/graphql")
+    client = TestClient(app)
+    response = client.post(
+        "/graphql",
+        json={
+            "query": """query {
+                stores {
+                    name
+                    sales { amount store { name } }
+                }
+            }""",
+        },
+    )
+    assert response.json() == {
+        "data": {
+            "stores": [
+                {
+                    "name": "A",
+                    "sales": [
+                        {"amount": 10, "store": {"name": "A"}},
+                        {"amount": 20, "store": {"name": "A"}},
+                    ],
+                },
+                {"name": "B", "sales": [{"amount": 30, "store": {"name": "B"}}]},
+            ],
+        },
+    }
+    # One statement per level, each level loaded in a single batch; the
+    # stores of the sales were already loaded by the root query
+    assert statements == ["default", "warehouse"]
+    Setup.setup(engines["default"])
+
+
+def test_prefetch_primes_loader():
+    import asyncio
+
+    from graphemy.dl import GraphemyDataLoader
+
+    calls = []
+
+    async def load_fn(keys):
+        calls.append(keys)
+        return [[k[0] * 10] for k in keys]
+
+    async def run():
+        loader = GraphemyDataLoader(load_fn=load_fn)
+        assert await loader.prefetch([1, 2, 2]) == [[10], [20]]
+        # Cached keys are not loaded again
+        assert await loader.prefetch([1]) == []
+        return await loader.load(2)
+
+    assert asyncio.run(run()) == [20]
+    assert calls == [[(1, None, None, None, None), (2, None, None, None, None)]]
+
+    # Keys are loaded in batches of at most max_batch_size
+    calls.clear()
+    loader = GraphemyDataLoader(load_fn=load_fn, max_batch_size=2)
+    assert asyncio.run(loader.prefetch([1, 2, 3])) == [[10], [20], [30]]
+    assert [len(keys) for keys in calls] == [2, 1]
+
+
+def test_prime_loaders():
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from sqlalchemy import event
+    from sqlmodel import Session, create_engine
+    from sqlmodel.pool import StaticPool
+
+    from graphemy import Dl, Field, Graphemy, GraphemyRouter
+    from graphemy.dl import get_saved_loads
+
+    class Country(Graphemy, table=True):
+        id: int | None = Field(primary_key=True, default=None)
+        code: str = Field(unique=True)
+        cities: list["City"] = Dl(source="id", target="country_id")
+
+    class City(Graphemy, table=True):
+        id: int | None = Field(primary_key=True, default=None)
+        country_id: int
+        country_code: str
+        name: str
+        country: "Country" = Dl(source="country_id", target="id")
+        country_by_code: "Country" = Dl(source="country_code", target="code")
+
+    engine = create_engine(
+        "sqlite://",
+        poolclass=StaticPool,
+        connect_args={"check_same_thread": False},
+    )
+    Graphemy.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add(Country(code="BR"))
+        session.add(Country(code="PT"))
+        session.add(City(country_id=1, country_code="BR", name="Recife"))
+        session.add(City(country_id=1, country_code="BR", name="Natal"))
+        session.add(City(country_id=2, country_code="PT", name="Porto"))
+        session.commit()
+
+    statements = []
+    event.listen(
+        engine,
+        "before_cursor_execute",
+        lambda *_args, **_kwargs: statements.append(1),
+    )
+
+    contexts = []
+
+    async def get_context(_request, _response):
+        contexts.append({})
+        return contexts[-1]
+
+    app = FastAPI()
+    router = GraphemyRouter(engine=engine, context_getter=get_context)
+    app.include_router(router, prefix="/graphql")
+    client = TestClient(app)
+    response = client.post(
+        "/graphql",
+        json={
+            "query": """query {
+                countrys {
+                    code
+                    cities { name country { code } countryByCode { code } }
+                }
+            }""",
+        },
+    )
+    assert response.json() == {
+        "data": {
+            "countrys": [
+                {
+                    "code": "BR",
+                    "cities": [
+                        {
+                            "name": "Recife",
+                            "country": {"code": "BR"},
+                            "countryByCode": {"code": "BR"},
+                        },
+                        {
+                            "name": "Natal",
+                            "country": {"code": "BR"},
+                            "countryByCode": {"code": "BR"},
+                        },
+                    ],
+                },
+                {
+                    "code": "PT",
+                    "cities": [
+                        {
+                            "name": "Porto",
+                            "country": {"code": "PT"},
+                            "countryByCode": {"code": "PT"},
+                        },
+                    ],
+                },
+            ],
+        },
+    }
+    # Countries are loaded once, by the root query
+    assert len(statements) == 2
+    assert get_saved_loads(contexts[0]) == {
+        "dl_Country_id": 3,
+        "dl_Country_code": 3,
+    }
+
+
+def test_identity_map():
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from sqlmodel import Session, create_engine
+    from sqlmodel.pool import StaticPool
+
+    from graphemy import Dl, Field, Graphemy, GraphemyRouter
+
+    class Album(Graphemy, table=True):
+        id: int | None = Field(primary_key=True, default=None)
+        title: str
+        tracks: list["Track"] = Dl(source="id", target="album_id")
+
+    class Track(Graphemy, table=True):
+        id: int | None = Field(primary_key=True, default=None)
+        album_id: int
+        name: str
+
+    engine = create_engine(
+        "sqlite://",
+        poolclass=StaticPool,
+        connect_args={"check_same_thread": False},
+    )
+    Graphemy.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add(Album(title="One"))
+        session.add(Track(album_id=1, name="Intro"))
+        session.add(Track(album_id=1, name="Outro"))
+        session.commit()
+
+    loaded = []
+
+    def dl_filter(data, _context):
+        loaded.extend(data)
+        return data
+
+    app = FastAPI()
+    router = GraphemyRouter(engine=engine, dl_filter=dl_filter, identity_map=True)
+    app.include_router(router, prefix="/graphql")
+    client = TestClient(app)
+    response = client.post(
+        "/graphql",
+        json={
+            "query": """query {
+                albums {
+                    all: tracks { name }
+                    intro: tracks(where: {name: {like: "In%"}}) { name }
+                }
+            }""",
+        },
+    )
+    assert response.json() == {
+        "data": {
+            "albums": [
+                {
+                    "all": [{"name": "Intro"}, {"name": "Outro"}],
+                    "intro": [{"name": "Intro"}],
+                },
+            ],
+        },
+    }
+    # The row loaded by both filter groups is hydrated once
+    intro = [track for track in loaded if track.name == "Intro"]
+    assert len(intro) == 2
+    assert intro[0] is intro[1]
+
+
+def test_loader_options():
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from sqlalchemy import event
+    from sqlmodel import Session, create_engine
+    from sqlmodel.pool import StaticPool
+
+    from graphemy import Dl, Field, Graphemy, GraphemyRouter
+    from graphemy.dl import LRUCache
+
+    class Genre(Graphemy, table=True):
+        id: int | None = Field(primary_key=True, default=None)
+        name: str
+        films: list["Film"] = Dl(
+            source="id",
+            target="genre_id",
+            max_batch_size=1,
+            cache=False,
+        )
+
+    class Film(Graphemy, table=True):
+        id: int | None = Field(primary_key=True, default=None)
+        genre_id: int
+        title: str
+        genre: "Genre" = Dl(source="genre_id", target="id")
+
+    engine = create_engine(
+        "sqlite://",
+        poolclass=StaticPool,
+        connect_args={"check_same_thread": False},
+    )
+    Graphemy.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add(Genre(name="Drama"))
+        session.add(Genre(name="Comedy"))
+        session.add(Film(genre_id=1, title="A"))
+        session.add(Film(genre_id=2, title="B"))
+        session.commit()
+
+    statements = []
+    event.listen(
+        engine,
+        "before_cursor_execute",
+        lambda *_args, **_kwargs: statements.append(1),
+    )
+
+    contexts = []
+
+    async def get_context(_request, _response):
+        contexts.append({})
+        return contexts[-1]
+
+    app = FastAPI()
+    router = GraphemyRouter(
+        engine=engine,
+        context_getter=get_context,
+        dl_cache_size=10,
+    )
+    app.include_router(router, prefix="/graphql")
+    client = TestClient(app)
+    response = client.post(
+        "/graphql",
+        json={"query": "query { genres { name films { title } } }"},
+    )
+    assert response.json() == {
+        "data": {
+            "genres": [
+                {"name": "Drama", "films": [{"title": "A"}]},
+                {"name": "Comedy", "films": [{"title": "B"}]},
+            ],
+        },
+    }
+    # One batch per genre
+    assert len(statements) == 3
+    films = contexts[0]["dl_Film_genre_id"]
+    assert films.max_batch_size == 1
+    assert not films.cache
+    genre = contexts[0]["dl_Genre_id"]
+    assert genre.cache
+    assert isinstance(genre.cache_map, LRUCache)
+
+    cache = LRUCache(2)
+    cache.set(1, "a")
+    cache.set(2, "b")
+    cache.get(1)
+    cache.set(3, "c")
+    assert cache.get(2) is None
+    assert cache.get(1) == "a"
@@ -0,0 +1,80 @@
+def test_replicas():
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from sqlmodel import Session, create_engine
+    from sqlmodel.pool import StaticPool
+
+    from graphemy import Dl, Field, Graphemy, GraphemyRouter, Setup
+
+    class Author(Graphemy, table=True):
+        id: int | None = Field(primary_key=True, default=None)
+        name: str
+        books: list["Book"] = Dl(source="id", target="author_id")
+
+    class Book(Graphemy, table=True):
+        id: int | None = Field(primary_key=True, default=None)
+        title: str
+        author_id: int
+
+    def new_engine(name: str):
+        engine = create_engine(
+            "sqlite://",
+            poolclass=StaticPool,
+            connect_args={"check_same_thread": False},
+        )
+        Graphemy.metadata.create_all(engine)
+        with Session(engine) as session:
+            session.add(Author(id=1, name=name))
+            session.commit()
+        return engine
+
+    primary = new_engine("primary")
+    replicas = [new_engine("replica 1"), new_engine("replica 2")]
+
+    app = FastAPI()
+    router = GraphemyRouter(
+        engine=primary,
+        replicas=replicas,
+        enable_put_mutations=True,
+    )
+    app.include_router(router, prefix="/graphql")
+    client = TestClient(app)
+
+    # Reads are spread across the replicas
+    names = [
+        client.post(
+            "/graphql",
+            json={"query": "query { authors { name } }"},
+        ).json()["data"]["authors"][0]["name"]
+        for _ in range(2)
+    ]
+    assert sorted(names) == ["replica 1", "replica 2"]
+
+    # After a write, the request reads from the primary
+    response = client.post(
+        "/graphql",
+        json={
+            "query": """mutation {
+                a: putBook(params: {id: 1, title: "Book", authorId: 1}) {
+                    title
+                }
+                b: putAuthor(params: {id: 1, name: "primary"}) {
+                    name
+                    books { title }
+                }
+            }""",
+        },
+    )
+    assert response.json() == {
+        "data": {
+            "a": {"title": "Book"},
+            "b": {"name": "primary", "books": [{"title": "Book"}]},
+        },
+    }
+
+    # Writes never reach the replicas
+    assert Setup.get_engine("default", write=True) is primary
+    assert Setup.get_engine("default", {"written_engines": {"default"}}) is (
+        primary
+    )
+    Setup.setup(primary)
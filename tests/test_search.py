@@ -0,0 +1,67 @@
+def test_search():
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from sqlmodel import Session, create_engine
+    from sqlmodel.pool import StaticPool
+
+    from graphemy import Field, Graphemy, GraphemyRouter, Setup
+    from graphemy.database.search import rebuild_search_index
+
+    class Article(Graphemy, table=True):
+        __searchable__ = ["title", "body"]
+        __enable_put_mutation__ = True
+        __enable_delete_mutation__ = True
+        id: int | None = Field(primary_key=True, default=None)
+        title: str
+        body: str
+
+    engine = create_engine(
+        "sqlite://",
+        poolclass=StaticPool,
+        connect_args={"check_same_thread": False},
+    )
+    Graphemy.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add(Article(title="Graphs", body="graph databases and graphs"))
+        session.add(Article(title="Cooking", body="a graph of recipes"))
+        session.commit()
+    # Rows written outside mutations are indexed again explicitly
+    with engine.begin() as connection:
+        rebuild_search_index(Article, connection)
+
+    app = FastAPI()
+    app.include_router(GraphemyRouter(engine=engine), prefix="/graphql")
+    client = TestClient(app)
+
+    def search(terms):
+        response = client.post(
+            "/graphql",
+            json={
+                "query": """query MyQuery($terms: String) {
+                    articles(where: {body: {search: $terms}}, orderBy: {searchRank: desc}) {
+                        title
+                    }
+                }""",
+                "variables": {"terms": terms},
+            },
+        )
+        return [article["title"] for article in response.json()["data"]["articles"]]
+
+    # The article mentioning graphs twice ranks first
+    assert search("graphs OR graph") == ["Graphs", "Cooking"]
+    assert search("recipes") == ["Cooking"]
+
+    # Mutations keep the index in sync
+    client.post(
+        "/graphql",
+        json={
+            "query": """mutation {
+                putArticle(params: {id: 2, title: "Cooking", body: "soups"}) { id }
+                deleteArticle(params: {id: 1}) { id }
+            }""",
+        },
+    )
+    assert search("recipes") == []
+    assert search("graphs OR graph") == []
+    assert search("soups") == ["Cooking"]
+    Setup.setup(engine)
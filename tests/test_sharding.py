@@ -0,0 +1,174 @@
+def test_sharding():
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from sqlmodel import Session, create_engine, select
+    from sqlmodel.pool import StaticPool
+
+    from graphemy import Dl, Field, Graphemy, GraphemyRouter, Setup
+
+    class Tenant(Graphemy, table=True):
+        id: int | None = Field(primary_key=True, default=None)
+        name: str
+        invoices: list["Invoice"] = Dl(source="id", target="tenant_id")
+
+    class Invoice(Graphemy, table=True):
+        __shard_key__ = "tenant_id"
+        __shards__ = ["shard_0", "shard_1"]
+        __enable_put_mutation__ = True
+        id: int = Field(primary_key=True)
+        tenant_id: int
+        total: int
+
+        @classmethod
+        def get_shard(cls, value: int) -> str:
+            return f"shard_{value % 2}"
+
+    def new_engine():
+        engine = create_engine(
+            "sqlite://",
+            poolclass=StaticPool,
+            connect_args={"check_same_thread": False},
+        )
+        Graphemy.metadata.create_all(engine)
+        return engine
+
+    engines = {"default": new_engine(), "shard_0": new_engine()}
+    engines["shard_1"] = new_engine()
+    with Session(engines["default"]) as session:
+        session.add(Tenant(id=1, name="Odd"))
+        session.add(Tenant(id=2, name="Even"))
+        session.commit()
+
+    app = FastAPI()
+    router = GraphemyRouter(engine=engines)
+    app.include_router(router, prefix="/graphql")
+    client = TestClient(app)
+
+    for i, (tenant, total) in enumerate([(1, 30), (2, 10), (1, 20), (2, 40)]):
+        client.post(
+            "/graphql",
+            json={
+                "query": f"""mutation {{
+                    putInvoice(params: {{
+                        id: {i + 1}, tenantId: {tenant}, total: {total}
+                    }}) {{ id }}
+                }}""",
+            },
+        )
+
+    # Rows were written to the shard owning their tenant
+    with Session(engines["shard_1"]) as session:
+        assert [i.id for i in session.exec(select(Invoice))] == [1, 3]
+
+    # Root queries merge every shard, respecting order and pagination
+    response = client.post(
+        "/graphql",
+        json={
+            "query": """query {
+                invoices(orderBy: {total: desc}, offset: 1, limit: 2) {
+                    total
+                }
+            }""",
+        },
+    )
+    assert response.json() == {
+        "data": {
+            "invoices": [{"total": 30}, {"total": 20}],
+            "invoicesCount": 4,
+        },
+    }
+
+    # Filtering on the shard key only queries the owning shard
+    response = client.post(
+        "/graphql",
+        json={"query": "query { invoices(where: {tenantId: {in: [2]}}) { id } }"},
+    )
+    assert response.json() == {"data": {"invoices": [{"id": 2}, {"id": 4}]}}
+
+    # A filter matching no shard returns no rows
+    response = client.post(
+        "/graphql",
+        json={"query": "query { invoices(where: {tenantId: {in: []}}) { id } }"},
+    )
+    assert response.json() == {"data": {"invoices": []}}
+
+    # Relationship loads split their keys by shard
+    response = client.post(
+        "/graphql",
+        json={"query": "query { tenants { name invoices { total } } }"},
+    )
+    assert response.json() == {
+        "data": {
+            "tenants": [
+                {"name": "Odd", "invoices": [{"total": 30}, {"total": 20}]},
+                {"name": "Even", "invoices": [{"total": 10}, {"total": 40}]},
+            ],
+        },
+    }
+    Setup.setup(engines["default"])
+
+
+def test_sharding_sort_nulls_and_datetimes():
+    from datetime import datetime
+
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from sqlmodel import Session, create_engine
+    from sqlmodel.pool import StaticPool
+
+    from graphemy import Field, Graphemy, GraphemyRouter, Setup
+
+    class Payment(Graphemy, table=True):
+        __shard_key__ = "account_id"
+        __shards__ = ["shard_0", "shard_1"]
+        id: int = Field(primary_key=True)
+        account_id: int
+        paid_at: datetime | None
+
+        @classmethod
+        def get_shard(cls, value: int) -> str:
+            return f"shard_{value % 2}"
+
+    def new_engine():
+        engine = create_engine(
+            "sqlite://",
+            poolclass=StaticPool,
+            connect_args={"check_same_thread": False},
+        )
+        Graphemy.metadata.create_all(engine)
+        return engine
+
+    engines = {"default": new_engine(), "shard_0": new_engine()}
+    engines["shard_1"] = new_engine()
+    # Payments of the same day only differ by their time
+    payments = [
+        (1, 1, datetime(2024, 5, 1, 9)),
+        (2, 2, None),
+        (3, 1, datetime(2024, 5, 1, 18)),
+        (4, 2, datetime(2024, 5, 1, 12)),
+        (5, 1, None),
+    ]
+    for payment_id, account_id, paid_at in payments:
+        with Session(engines[Payment.get_shard(account_id)]) as session:
+            session.add(
+                Payment(id=payment_id, account_id=account_id, paid_at=paid_at),
+            )
+            session.commit()
+
+    app = FastAPI()
+    router = GraphemyRouter(engine=engines)
+    app.include_router(router, prefix="/graphql")
+    client = TestClient(app)
+
+    # NULLs sort first ascending and last descending, as in SQLite
+    for order, expected in [("asc", [2, 5, 1, 4, 3]), ("desc", [3, 4, 1, 2, 5])]:
+        response = client.post(
+            "/graphql",
+            json={
+                "query": f"""query {{
+                    payments(orderBy: [{{paidAt: {order}}}, {{id: asc}}]) {{ id }}
+                }}""",
+            },
+        )
+        assert [p["id"] for p in response.json()["data"]["payments"]] == expected
+    Setup.setup(engines["default"])
@@ -0,0 +1,108 @@
+def test_single_statement():
+    from datetime import date
+
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from sqlalchemy import event
+    from sqlmodel import Session, create_engine
+    from sqlmodel.pool import StaticPool
+
+    from graphemy import Dl, Field, Graphemy, GraphemyRouter, Setup
+
+    class Library(Graphemy, table=True):
+        id: int | None = Field(primary_key=True, default=None)
+        name: str
+        shelves: list["Shelf"] = Dl(source="id", target="library_id")
+
+    class Shelf(Graphemy, table=True):
+        id: int | None = Field(primary_key=True, default=None)
+        library_id: int
+        label: str
+        library: "Library" = Dl(source="library_id", target="id")
+        volumes: list["Volume"] = Dl(source="id", target="shelf_id")
+
+    class Volume(Graphemy, table=True):
+        id: int | None = Field(primary_key=True, default=None)
+        shelf_id: int
+        published: date
+
+    engine = create_engine(
+        "sqlite://",
+        poolclass=StaticPool,
+        connect_args={"check_same_thread": False},
+    )
+    Graphemy.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add(Library(name="Central"))
+        session.add(Library(name="Empty"))
+        session.add(Shelf(library_id=1, label="A"))
+        session.add(Shelf(library_id=1, label="B"))
+        session.add(Volume(shelf_id=1, published=date(2020, 1, 2)))
+        session.commit()
+
+    statements = []
+    event.listen(
+        engine,
+        "before_cursor_execute",
+        lambda *_args, **_kwargs: statements.append(1),
+    )
+
+    app = FastAPI()
+    router = GraphemyRouter(engine=engine, single_statement=True)
+    app.include_router(router, prefix="/graphql")
+    client = TestClient(app)
+    response = client.post(
+        "/graphql",
+        json={
+            "query": """query {
+                librarys(orderBy: {name: asc}) {
+                    name
+                    shelves {
+                        label
+                        library { name }
+                        volumes { published }
+                    }
+                }
+            }""",
+        },
+    )
+    assert response.json() == {
+        "data": {
+            "librarys": [
+                {
+                    "name": "Central",
+                    "shelves": [
+                        {
+                            "label": "A",
+                            "library": {"name": "Central"},
+                            "volumes": [{"published": "2020-01-02"}],
+                        },
+                        {
+                            "label": "B",
+                            "library": {"name": "Central"},
+                            "volumes": [],
+                        },
+                    ],
+                },
+                {"name": "Empty", "shelves": []},
+            ],
+        },
+    }
+    # The whole tree is loaded by a single statement
+    assert len(statements) == 1
+
+    # Relationships with arguments are still resolved by their loaders
+    response = client.post(
+        "/graphql",
+        json={
+            "query": """query {
+                librarys(where: {name: {in: ["Central"]}}) {
+                    shelves(where: {label: {in: ["B"]}}) { label }
+                }
+            }""",
+        },
+    )
+    assert response.json() == {
+        "data": {"librarys": [{"shelves": [{"label": "B"}]}]},
+    }
+    Setup.setup(engine)
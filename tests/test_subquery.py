@@ -0,0 +1,85 @@
+def test_subquery_loads():
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from sqlalchemy import event
+    from sqlmodel import Session, create_engine
+    from sqlmodel.pool import StaticPool
+
+    from graphemy import Dl, Field, Graphemy, GraphemyRouter, Setup
+
+    class Team(Graphemy, table=True):
+        id: int | None = Field(primary_key=True, default=None)
+        name: str
+        players: list["Player"] = Dl(source="id", target="team_id")
+
+    class Player(Graphemy, table=True):
+        id: int | None = Field(primary_key=True, default=None)
+        team_id: int
+        name: str
+        goals: list["Goal"] = Dl(source="id", target="player_id")
+
+    class Goal(Graphemy, table=True):
+        id: int | None = Field(primary_key=True, default=None)
+        player_id: int
+        minute: int
+
+    engine = create_engine(
+        "sqlite://",
+        poolclass=StaticPool,
+        connect_args={"check_same_thread": False},
+    )
+    Graphemy.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add(Team(name="A"))
+        session.add(Team(name="B"))
+        session.add(Team(name="C"))
+        session.add(Player(team_id=1, name="Ann"))
+        session.add(Player(team_id=2, name="Bob"))
+        session.add(Player(team_id=3, name="Cid"))
+        session.add(Goal(player_id=1, minute=10))
+        session.add(Goal(player_id=2, minute=20))
+        session.add(Goal(player_id=3, minute=30))
+        session.commit()
+
+    statements = []
+    event.listen(
+        engine,
+        "before_cursor_execute",
+        lambda _conn, _cursor, statement, parameters, *_args: statements.append(
+            (statement, parameters),
+        ),
+    )
+
+    app = FastAPI()
+    router = GraphemyRouter(engine=engine, subquery_loads=True)
+    app.include_router(router, prefix="/graphql")
+    client = TestClient(app)
+    response = client.post(
+        "/graphql",
+        json={
+            "query": """query {
+                teams(where: {name: {in: ["A", "B"]}}, orderBy: {name: desc}, limit: 1) {
+                    name
+                    players { name goals { minute } }
+                }
+            }""",
+        },
+    )
+    assert response.json()["data"] == {
+        "teams": [
+            {"name": "B", "players": [{"name": "Bob", "goals": [{"minute": 20}]}]},
+        ],
+        "teamsCount": 2,
+    }
+    # Root count and rows, then one statement per level
+    assert len(statements) == 4
+    players, goals = statements[2:]
+    assert "IN (SELECT team.id" in players[0]
+    assert "IN (SELECT player.id" in goals[0]
+    # Rows sorting equally fall on the same page in every statement
+    assert "ORDER BY team.name DESC, team.id ASC" in statements[1][0]
+    assert "ORDER BY team.name DESC, team.id ASC" in players[0]
+    # Parent keys are not sent back as parameters
+    assert 2 not in players[1]
+    assert 2 not in goals[1]
+    Setup.setup(engine)